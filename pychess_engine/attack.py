@@ -1,6 +1,8 @@
 from pychess_engine.constants import Pieces, Colors, Squares
-from pychess_engine.globals import PieceKnight, PieceKing, PieceRookQueen, PieceBishopQueen, PieceCol
-from pychess_engine.validate import SqOnBoard, SideValid, PieceValidEmpty
+from pychess_engine.globals import PieceRookQueen, PieceBishopQueen, PieceCol, PieceVal, Sq120ToSq64, Sq64ToSq120, KnightAttacks, KingAttacks, PawnAttacks, setMask
+from pychess_engine.globals import RookMasks, BishopMasks, RookAttacks, BishopAttacks
+from pychess_engine.bitboards import PopBit
+from pychess_engine.validate import SqOnBoard, SideValid
 from pychess_engine.debug import _assert_condition
 
 # Knight Direction
@@ -35,50 +37,172 @@ def is_sqaure_attacked(square: int, side: int, board) -> bool:
     _assert_condition(SideValid(side))
     _assert_condition(board._check_board())
     
-    # checking for pawns
+    sq64 = Sq120ToSq64[square]
+    pieceBB = board.pieceBB
+    
+    # pawns, knights and kings, a pawn of `side` attacks the square if a pawn of the other side standing on it would attack the pawn
     if(side == Colors.WHITE):
-        if(board.pieces[square - 11] == Pieces.wP or board.pieces[square - 9] == Pieces.wP): # -9 -11 for white pieces, 
+        if(PawnAttacks[Colors.BLACK][sq64] & pieceBB[Pieces.wP] or KnightAttacks[sq64] & pieceBB[Pieces.wN] or KingAttacks[sq64] & pieceBB[Pieces.wK]):
             return True
     else:
-        if(board.pieces[square + 11] == Pieces.bP or board.pieces[square + 9] == Pieces.bP): # +9 and +11 for black pawns
-            return True
-        
-    # checking for knights
-    for i in range(0, 8): # looping on each square there can be a knight attacking
-        pce = board.pieces[square + knight_direction[i]]
-        if(PieceValidEmpty(pce) and PieceKnight[pce] and PieceCol[pce] == side):
+        if(PawnAttacks[Colors.WHITE][sq64] & pieceBB[Pieces.bP] or KnightAttacks[sq64] & pieceBB[Pieces.bN] or KingAttacks[sq64] & pieceBB[Pieces.bK]):
             return True
         
-    # rooks, queens
-    for i in range(0, 4):
-        dir = rook_direction[i]
-        t_sq = square + dir
-        pce = board.pieces[t_sq]
-        while(pce != Squares.OFFBOARD): # for moving pieces, till they reach the board end
-            if(pce != Pieces.EMPTY):
-                if(PieceRookQueen[pce] and PieceCol[pce] == side):
-                    return True
-                break #if it hits another piece
-            t_sq += dir
-            pce = board.pieces[t_sq]
-            
-    # bishops, queens
-    for i in range(0, 4):
-        dir = bishop_direction[i]
-        t_sq = square + dir
-        pce = board.pieces[t_sq]
-        while(pce != Squares.OFFBOARD): # for moving pieces, till they reach the board end
-            if(pce != Pieces.EMPTY):
-                if(PieceBishopQueen[pce] and PieceCol[pce] == side):
-                    return True
-                break #if it hits another piece
-            t_sq += dir
-            pce = board.pieces[t_sq]
-            
-    # kings
-    for i in range(0, 8):
-        pce = board.pieces[square + king_direction[i]]
-        if(PieceValidEmpty(pce) and PieceKing[pce] and PieceCol[pce] == side):
-            return True
+    # rooks, bishops and queens, one lookup for each kind of slider
+    occupancy = board.colourBB[Colors.BOTH]
+    if(side == Colors.WHITE):
+        rooksQueens = pieceBB[Pieces.wR] | pieceBB[Pieces.wQ]
+        bishopsQueens = pieceBB[Pieces.wB] | pieceBB[Pieces.wQ]
+    else:
+        rooksQueens = pieceBB[Pieces.bR] | pieceBB[Pieces.bQ]
+        bishopsQueens = pieceBB[Pieces.bB] | pieceBB[Pieces.bQ]
+    if(rooksQueens and RookAttacks[sq64][occupancy & RookMasks[sq64]] & rooksQueens):
+        return True
+    if(bishopsQueens and BishopAttacks[sq64][occupancy & BishopMasks[sq64]] & bishopsQueens):
+        return True
             
-    return False
\ No newline at end of file
+    return False
+
+def get_pins_and_checkers(board, side: int) -> tuple[dict, list]:
+    """
+    Finds the pieces of `side` pinned to their king, and the opposite pieces giving check to it,
+    by looking up the knight and pawn attacks of the king square and walking once along every slider direction
+    an opposite slider could come from.
+
+    Args:
+        board (Board): The current board state.
+        side (int): The color of the king (e.g., `Colors.WHITE` or `Colors.BLACK`).
+
+    Returns:
+        dict: Pinned pieces, square of the pinned piece -> direction from the king towards the pinner.
+        list: Checking pieces as (square, direction) tuples, the direction from the king towards a sliding checker, 0 for pawns and knights.
+    """
+    _assert_condition(SideValid(side))
+    _assert_condition(board._check_board())
+    
+    king = board.king_square[side]
+    pieces = board.pieces
+    pinned = {}
+    checkers = []
+    
+    # pawns and knights
+    king64 = Sq120ToSq64[king]
+    if(side == Colors.WHITE):
+        attackers = PawnAttacks[Colors.WHITE][king64] & board.pieceBB[Pieces.bP] | KnightAttacks[king64] & board.pieceBB[Pieces.bN]
+    else:
+        attackers = PawnAttacks[Colors.BLACK][king64] & board.pieceBB[Pieces.wP] | KnightAttacks[king64] & board.pieceBB[Pieces.wN]
+    while(attackers):
+        sq64, attackers = PopBit(attackers)
+        checkers.append((Sq64ToSq120[sq64], 0))
+    
+    # sliders, the first own piece on a ray is pinned if the next piece is an opposite slider moving along that ray
+    if(side == Colors.WHITE):
+        rooksQueens = board.pieceBB[Pieces.bR] | board.pieceBB[Pieces.bQ]
+        bishopsQueens = board.pieceBB[Pieces.bB] | board.pieceBB[Pieces.bQ]
+    else:
+        rooksQueens = board.pieceBB[Pieces.wR] | board.pieceBB[Pieces.wQ]
+        bishopsQueens = board.pieceBB[Pieces.wB] | board.pieceBB[Pieces.wQ]
+    for sliders, directions, rays in ((PieceRookQueen, rook_direction, RookAttacks[king64][0] & rooksQueens), (PieceBishopQueen, bishop_direction, BishopAttacks[king64][0] & bishopsQueens)):
+        if(not rays): # no opposite slider on any of these rays from the king, seen through an empty board
+            continue
+        for dir in directions:
+            t_sq = king + dir
+            blocker = Squares.NO_SQ
+            pce = pieces[t_sq]
+            while(pce != Squares.OFFBOARD):
+                if(pce != Pieces.EMPTY):
+                    if(PieceCol[pce] == side):
+                        if(blocker != Squares.NO_SQ): # two own pieces on the ray, nothing is pinned
+                            break
+                        blocker = t_sq
+                    else:
+                        if(sliders[pce]):
+                            if(blocker == Squares.NO_SQ):
+                                checkers.append((t_sq, dir))
+                            else:
+                                pinned[blocker] = dir
+                        break
+                t_sq += dir
+                pce = pieces[t_sq]
+                
+    return pinned, checkers
+
+def attackers_to(board, sq64: int, occupancy: int) -> int:
+    """
+    Finds the pieces of both sides attacking a square, the sliders seen through the given occupancy
+    (pieces taken out of it uncover the sliders behind them).
+
+    Args:
+        board (Board): The current board state.
+        sq64 (int): The 64 based square.
+        occupancy (int): Bitboard of the squares blocking the sliders.
+
+    Returns:
+        int: Bitboard of the attackers, pieces missing from `occupancy` included.
+    """
+    pieceBB = board.pieceBB
+    rooksQueens = pieceBB[Pieces.wR] | pieceBB[Pieces.bR] | pieceBB[Pieces.wQ] | pieceBB[Pieces.bQ]
+    bishopsQueens = pieceBB[Pieces.wB] | pieceBB[Pieces.bB] | pieceBB[Pieces.wQ] | pieceBB[Pieces.bQ]
+    return (PawnAttacks[Colors.BLACK][sq64] & pieceBB[Pieces.wP] | PawnAttacks[Colors.WHITE][sq64] & pieceBB[Pieces.bP]
+            | KnightAttacks[sq64] & (pieceBB[Pieces.wN] | pieceBB[Pieces.bN])
+            | KingAttacks[sq64] & (pieceBB[Pieces.wK] | pieceBB[Pieces.bK])
+            | RookAttacks[sq64][occupancy & RookMasks[sq64]] & rooksQueens
+            | BishopAttacks[sq64][occupancy & BishopMasks[sq64]] & bishopsQueens)
+
+def static_exchange(board, move: int) -> int:
+    """
+    Static exchange evaluation (SEE), the material won or lost by a move once both sides have
+    captured back on its target square for as long as it pays off, always with their least valuable attacker.
+    Pieces are taken off the occupancy as they capture, uncovering the sliders behind them (x-rays).
+    Pins and checks are ignored.
+
+    Args:
+        board (Board): The current board state, the move is not made.
+        move (int): The encoded move (a capture, but any move of the side to move works).
+
+    Returns:
+        int: Material balance of the exchange for the side making the move, in `PieceVal` units.
+    """
+    from_square = move & 0x7F
+    to_square = (move >> 7) & 0x7F
+    _assert_condition(SqOnBoard(from_square))
+    _assert_condition(SqOnBoard(to_square))
+    
+    from64 = Sq120ToSq64[from_square]
+    to64 = Sq120ToSq64[to_square]
+    pieceBB = board.pieceBB
+    colourBB = board.colourBB
+    
+    occupancy = colourBB[Colors.BOTH] ^ setMask[from64]
+    captured = (move >> 14) & 0xF
+    promoted = (move >> 20) & 0xF
+    gain = [PieceVal[captured]]
+    if(move & 0x40000): # en passant, the captured pawn isn't on the target square
+        gain[0] = PieceVal[Pieces.wP]
+        occupancy ^= setMask[to64 - 8 if board.side == Colors.WHITE else to64 + 8]
+    onSquare = board.pieces[from_square] # the piece standing on the square, next to be captured
+    if(promoted):
+        gain[0] += PieceVal[promoted] - PieceVal[Pieces.wP]
+        onSquare = promoted
+        
+    attackers = attackers_to(board, to64, occupancy) & occupancy
+    side = board.side ^ 1
+    while(True):
+        sideAttackers = attackers & colourBB[side]
+        if(not sideAttackers):
+            break
+        first = Pieces.wP if side == Colors.WHITE else Pieces.bP
+        for pce in range(first, first + 6): # least valuable attacker first, pawns to king
+            bb = sideAttackers & pieceBB[pce]
+            if(bb):
+                break
+        gain.append(PieceVal[onSquare] - gain[-1]) # the score of the side if it captures and the exchange ends there
+        occupancy ^= bb & -bb
+        attackers = attackers_to(board, to64, occupancy) & occupancy # the sliders behind it joined
+        onSquare = pce
+        side ^= 1
+        
+    # going back, every side either captures or stops the exchange, whichever is better for it
+    for index in range(len(gain) - 1, 0, -1):
+        gain[index - 1] = -max(-gain[index - 1], gain[index])
+    return gain[0]
@@ -0,0 +1,198 @@
+from itertools import islice
+from pychess_engine.constants import Colors, Pieces
+from pychess_engine.globals import PceChar, PieceVal, PieceCol, PiecePhase, MAX_PHASE, PceSqTableMg, PceSqTableEg, Sq64ToSq120
+from pychess_engine.globals import FileMasks, IsolatedMasks, PassedMasks, SupportMasks, ShieldMasks, PawnAttacks, setMask
+from pychess_engine.globals import PassedPawnMg, PassedPawnEg, IsolatedPawnMg, IsolatedPawnEg, DoubledPawnMg, DoubledPawnEg, BackwardPawnMg, BackwardPawnEg, PawnShieldMg
+
+try: # numpy is optional, only the batch evaluation needs it
+    import numpy as np
+except ImportError:
+    np = None
+
+BATCH_SIZE = 4096 # positions encoded and evaluated together, streams of FENs are read in batches of this size
+
+PieceIndex = {char: piece for piece, char in enumerate(PceChar) if piece != Pieces.EMPTY} # FEN letter -> piece (wP = 1, ... bK = 12)
+
+_tables = None # the evaluation tables as arrays, built by `_build_tables()` on first use
+
+def _require_numpy() -> None:
+    if(np is None):
+        raise ImportError("batch evaluation needs numpy, install it with `pip install numpy`")
+
+def _mask_matrix(masks: list):
+    """
+    Turns 64 bitboards indexed by square into a (64, 64) matrix, row `sq` holds the squares of `masks[sq]`,
+    so `pawns @ matrix.T` counts the pawns in the mask of every square for a whole batch at once.
+    """
+    matrix = np.zeros((64, 64))
+    for sq64 in range(0, 64):
+        for t_sq64 in range(0, 64):
+            if(masks[sq64] & setMask[t_sq64]):
+                matrix[sq64, t_sq64] = 1
+    return matrix
+
+def _build_tables() -> dict:
+    """
+    Builds the arrays of the evaluation from the tables of `globals` (`initialize()` has to have filled them),
+    the piece rows are signed, + for white and - for black, so a single product gives the white minus black score.
+    """
+    material = np.zeros(12)
+    phase = np.zeros(12)
+    pceSqMg = np.zeros((12, 64))
+    pceSqEg = np.zeros((12, 64))
+    for piece in range(Pieces.wP, Pieces.bK + 1):
+        sign = 1 if PieceCol[piece] == Colors.WHITE else -1
+        material[piece - 1] = sign * PieceVal[piece]
+        phase[piece - 1] = PiecePhase[piece]
+        for sq64 in range(0, 64):
+            pceSqMg[piece - 1, sq64] = sign * PceSqTableMg[piece][Sq64ToSq120[sq64]]
+            pceSqEg[piece - 1, sq64] = sign * PceSqTableEg[piece][Sq64ToSq120[sq64]]
+
+    tables = {
+        "material": material,
+        "phase": phase,
+        "pceSqMg": pceSqMg.reshape(12 * 64),
+        "pceSqEg": pceSqEg.reshape(12 * 64),
+    }
+    isolated = _mask_matrix(IsolatedMasks) # the same for both sides
+    for col in (Colors.WHITE, Colors.BLACK):
+        front = [PassedMasks[col][sq64] & FileMasks[sq64 & 7] for sq64 in range(0, 64)]
+        stopAttacks = [0] * 64 # squares of the enemy pawns attacking the square in front of a pawn
+        shield2 = [0] * 64
+        for sq64 in range(0, 64):
+            stop64 = sq64 + 8 if col == Colors.WHITE else sq64 - 8
+            if(stop64 >= 0 and stop64 < 64):
+                stopAttacks[sq64] = PawnAttacks[col][stop64]
+            shield2[sq64] = (ShieldMasks[col][sq64] << 8 if col == Colors.WHITE else ShieldMasks[col][sq64] >> 8) & ((1 << 64) - 1)
+        relRank = np.array([sq64 >> 3 if col == Colors.WHITE else 7 - (sq64 >> 3) for sq64 in range(0, 64)])
+        tables[col] = {
+            "front": _mask_matrix(front),
+            "isolated": isolated,
+            "passed": _mask_matrix(PassedMasks[col]),
+            "support": _mask_matrix(SupportMasks[col]),
+            "stopAttacks": _mask_matrix(stopAttacks),
+            "shield": _mask_matrix(ShieldMasks[col]),
+            "shield2": _mask_matrix(shield2),
+            "passedMg": np.array(PassedPawnMg, dtype=np.float64)[relRank],
+            "passedEg": np.array(PassedPawnEg, dtype=np.float64)[relRank],
+        }
+    return tables
+
+def encode_fens(fens: list):
+    """
+    Encodes positions into piece occupancy planes, only the piece placement and side to move of the FENs are read.
+
+    Args:
+        fens (list): FEN strings.
+
+    Returns:
+        ndarray: (N, 12, 64) uint8 array, `planes[n, piece - 1, sq64]` is 1 if the piece (wP = 1, ... bK = 12) is on the 64 based square.
+        ndarray: (N,) uint8 array with the side to move of every position (0 - `WHITE`, 1 - `BLACK`).
+    """
+    _require_numpy()
+    planes = np.zeros((len(fens), 12, 64), dtype=np.uint8)
+    sides = np.zeros(len(fens), dtype=np.uint8)
+    for index, fen in enumerate(fens):
+        fields = fen.split()
+        rank = 7
+        file = 0
+        for char in fields[0]:
+            if(char == "/"):
+                rank -= 1
+                file = 0
+            elif(char.isdigit()):
+                file += int(char)
+            else:
+                planes[index, PieceIndex[char] - 1, rank * 8 + file] = 1
+                file += 1
+        sides[index] = Colors.BLACK if len(fields) > 1 and fields[1] == "b" else Colors.WHITE
+    return planes, sides
+
+def _pawn_scores(own, enemy, kings, tables: dict):
+    """
+    Pawn structure and pawn shield scores of one side for a batch, the same terms as `evaluate_pawn_structure`
+    and `Board._pawn_shield`, counted for every square at once with the mask matrices.
+
+    Returns:
+        ndarray: Middlegame scores of the side.
+        ndarray: Endgame scores of the side.
+    """
+    doubled = own * (own @ tables["front"].T > 0)
+    passed = own * (1 - doubled) * (enemy @ tables["passed"].T == 0)
+    isolated = own * (own @ tables["isolated"].T == 0)
+    backward = own * (1 - isolated) * (own @ tables["support"].T == 0) * (enemy @ tables["stopAttacks"].T > 0)
+
+    doubledCount = doubled.sum(axis=1)
+    isolatedCount = isolated.sum(axis=1)
+    backwardCount = backward.sum(axis=1)
+    shield = (kings * (own @ tables["shield"].T)).sum(axis=1) * PawnShieldMg[0] + (kings * (own @ tables["shield2"].T)).sum(axis=1) * PawnShieldMg[1]
+
+    mg = doubledCount * DoubledPawnMg + passed @ tables["passedMg"] + isolatedCount * IsolatedPawnMg + backwardCount * BackwardPawnMg + shield
+    eg = doubledCount * DoubledPawnEg + passed @ tables["passedEg"] + isolatedCount * IsolatedPawnEg + backwardCount * BackwardPawnEg
+    return mg, eg
+
+def evaluate_planes(planes, sides):
+    """
+    Evaluates a batch of encoded positions, with the same score as `Board.evaluate_position` gives each of them.
+
+    Args:
+        planes (ndarray): (N, 12, 64) piece occupancy planes, see `encode_fens`.
+        sides (ndarray): (N,) side to move of every position.
+
+    Returns:
+        ndarray: (N,) int64 array of evaluation scores from the side to move's point of view.
+    """
+    global _tables
+    _require_numpy()
+    if(_tables is None):
+        _tables = _build_tables()
+    count = planes.shape[0]
+    flat = np.asarray(planes, dtype=np.float64).reshape(count, 12 * 64)
+    pieceCount = flat.reshape(count, 12, 64).sum(axis=2)
+
+    material = pieceCount @ _tables["material"]
+    phase = np.minimum(pieceCount @ _tables["phase"], MAX_PHASE) # promotions can take the phase above the start position
+    mg = flat @ _tables["pceSqMg"]
+    eg = flat @ _tables["pceSqEg"]
+
+    whitePawns = flat[:, (Pieces.wP - 1) * 64 : Pieces.wP * 64]
+    blackPawns = flat[:, (Pieces.bP - 1) * 64 : Pieces.bP * 64]
+    whiteKing = flat[:, (Pieces.wK - 1) * 64 : Pieces.wK * 64]
+    blackKing = flat[:, (Pieces.bK - 1) * 64 : Pieces.bK * 64]
+    whiteMg, whiteEg = _pawn_scores(whitePawns, blackPawns, whiteKing, _tables[Colors.WHITE])
+    blackMg, blackEg = _pawn_scores(blackPawns, whitePawns, blackKing, _tables[Colors.BLACK])
+    mg += whiteMg - blackMg
+    eg += whiteEg - blackEg
+
+    tapered = np.rint(mg * phase + eg * (MAX_PHASE - phase)).astype(np.int64)
+    score = np.rint(material).astype(np.int64) + np.sign(tapered) * (np.abs(tapered) // MAX_PHASE) # rounding towards 0, like `evaluate_position`
+    return np.where(np.asarray(sides) == Colors.WHITE, score, -score)
+
+def evaluate_batch(positions, sides=None, batch_size: int = BATCH_SIZE):
+    """
+    Evaluates many positions at once, the pieces are encoded into (N, 12, 64) occupancy planes and the material,
+    piece-square and pawn structure scores are computed as matrix products over the whole batch.
+    The scores are the same `Board.evaluate_position` gives, the tables have to be initialized (`initialize()`, done by `Engine()`).
+
+    Args:
+        positions: A list or any iterable (e.g. the lines of a file) of FEN strings, or (N, 12, 64) planes already encoded with `encode_fens`.
+        sides (optional): Side to move of every position, needed when `positions` are encoded planes.
+        batch_size (int, optional): Number of FENs encoded and evaluated together, `BATCH_SIZE` by default.
+
+    Returns:
+        ndarray: (N,) int64 array of evaluation scores from the side to move's point of view, in the order of the positions.
+    """
+    _require_numpy()
+    if(isinstance(positions, np.ndarray)):
+        return evaluate_planes(positions, sides)
+
+    scores = []
+    fens = iter(positions)
+    while(True):
+        batch = list(islice(fens, batch_size))
+        if(not batch):
+            break
+        batch = [fen for fen in batch if fen.strip()] # blank lines of a file
+        if(batch):
+            scores.append(evaluate_planes(*encode_fens(batch)))
+    return np.concatenate(scores) if scores else np.zeros(0, dtype=np.int64)
@@ -2,13 +2,6 @@ from pychess_engine.globals import Sq120ToSq64, setMask, clearMask
 from pychess_engine.helper import FR2SQ
 from pychess_engine.constants import Ranks, Files
 
-bitTable = [
-  63, 30, 3, 32, 25, 41, 22, 33, 15, 50, 42, 13, 11, 53, 19, 34, 61, 29, 2,
-  51, 21, 43, 45, 10, 18, 47, 1, 54, 9, 57, 0, 35, 62, 31, 40, 4, 49, 5, 52,
-  26, 60, 6, 23, 44, 46, 27, 56, 16, 7, 39, 48, 24, 59, 14, 12, 55, 38, 28,
-  58, 20, 37, 17, 36, 8
-  ]
-
 def print_bit_board(bb):
     shiftMe = 1
     sq = 0
@@ -32,11 +25,9 @@ def CountBits(b):
     return r
         
 def PopBit(bb): 
-    b = bb ^ (bb - 1)
-    fold = ((b & 0xffffffff) ^ (b >> 32))
-    bb = bb & (bb- 1)
-    return bitTable[((fold * 0x783a9b23)%4294967296) >> 26], bb # Modulo 2**32 to keep number in range
-
+    lsb = bb & -bb # isolating the least significant bit
+    return lsb.bit_length() - 1, bb ^ lsb # index of the bit, and the board without it
+    
 def SetBit(bb, sq):
     bb |= setMask[sq]
     return bb
@@ -2,15 +2,16 @@ from pychess_engine.constants import *
 from pychess_engine.undo import UNDO
 from pychess_engine.globals import *
 from pychess_engine.debug import _assert_condition, DEBUG
-from pychess_engine.hashkeys import PositionKey
+from pychess_engine import hashkeys
 from pychess_engine.bitboards import SetBit, PopBit, CountBits, ClearBit
 from pychess_engine.validate import SqOnBoard, PieceValid, SideValid
 from pychess_engine.attack import is_sqaure_attacked
-from pychess_engine.move import MOVE, MOVELIST
-from pychess_engine.pvtable import PVTABLE
+from pychess_engine.move import MOVE, MOVELIST, MOVEPICKER, NOMOVE, FROMSQ, TOSQ, CAPTURED, PROMOTED
+from pychess_engine.pvtable import HASHTABLE
+from pychess_engine.pawns import PAWNHASHTABLE, evaluate_pawn_structure
+from pychess_engine.evalcache import EVALCACHE
 from pychess_engine.helper import FR2SQ
 
-counter = 0
 class Board:
     """
     Representing the game board for a chess game. Handles
@@ -20,6 +21,8 @@ class Board:
     Attributes:
         pieces (list): A list representing on which square we have which piece indexed by squares (0 - 119)
         pawns(list): list of pawn bitboards indexed by colors (0 - `WHITE`, 1 -`BLACK` , 2 - `BOTH` )
+        pieceBB(list): occupancy bitboard of every piece type indexed by piece (0 - `EMPTY`, 1 - `wP`, ... 12 - `bK`)
+        colourBB(list): occupancy bitboards indexed by colors (0 - `WHITE`, 1 -`BLACK` , 2 - `BOTH` )
         king_square(list): representing sqaure on which king is placed indexed by colors `WHITE` & `BLACK`
         side(int): Side to move (0 - `WHITE`, 1 - `BLACK`)
         enPas(int): EnPassant Square
@@ -27,23 +30,35 @@ class Board:
         ply(int): depth of search in current game (number of half moves)
         hisPly(int): History of half moves in game
         castlePerm(int): Castle Permission (`15<1111>` - All Castles Possible, `14<1110> - White can't castle King Side`, ...)
-        posKey(PositionKey): Unique Position Key for each position
+        posKey(int): Unique Position Key (Zobrist hash) for each position
+        pawnKey(int): Zobrist hash of the pawns only, kept up to date like `posKey`, the key of the pawn structure hash table
         pceNum(list): Total Number of a particular piece indexed by piece number (0 - `EMPTY`, 1 - `wP`, ... 12 - `bK`)
         bigPce(list): Number big pieces i.e Non-Pawn pieces (Queens, rooks, bishops, knights) indexed by colors (0 - `WHITE` , 1 - `BLACK`)
         majPce(list): Number of major pieces (Queens, Rooks) indexed by colors (0 - `WHITE` , 1 - `BLACK`)
         minPce(list): Number of minor pieces (Knights, Bishops) indexed by colors (0 - `WHITE` , 1 - `BLACK`)
         material(list): Total material value for each side indexed by colors (0 - `WHITE` , 1 - `BLACK`)
+        pceSqMg(list): Running middlegame piece-square score for each side indexed by colors (0 - `WHITE` , 1 - `BLACK`), kept up to date like `material`
+        pceSqEg(list): Running endgame piece-square score for each side indexed by colors (0 - `WHITE` , 1 - `BLACK`)
+        phase(int): Game phase, the `PiecePhase` of all the pieces on the board (`MAX_PHASE` at the start, 0 with only kings and pawns)
         history(list of UNDO()): Storing Past Positions
+        keyCount(dict): Number of times each position key occurs in `history`, kept up to date by `make_move` and `take_move` for the repetition check
         pList(list of list): piece list specifying a square of a particular piece indexed by [pieceType][kth piece]example, pList[wN][0] = E1; adds a white knight on e1
-        PvTable(PVTABLE): principal variation table
-        PvArray(list): principal variation array
-        searchHistory(list of MOVE()): for heuristics, indexed by [pieceType][BoardSquare]
-        searchKillers(list of MOVE()): for heuristics, stores 2 recent moves which caused the beta cutoff which aren't captures
+        HashTable(HASHTABLE): transposition table, storing score, depth, bound and best move of searched positions
+        PawnHashTable(PAWNHASHTABLE): pawn structure scores of the pawn structures evaluated so far, indexed by `pawnKey`
+        EvalCache(EVALCACHE): evaluation scores of the positions evaluated so far, indexed by `posKey`
+        Nnue(NNUE): network evaluating the positions instead of the tables, its accumulator kept up to date with the pieces, None by default
+        PvArray(list): principal variation array (encoded moves)
+        searchHistory(list of int): for heuristics, indexed by [pieceType][BoardSquare]
+        searchKillers(list of int): for heuristics, stores 2 recent moves which caused the beta cutoff which aren't captures
+        moveLists(list of MOVELIST()): preallocated move list for every ply, reused by perft and move validation
+        movePickers(list of MOVEPICKER()): preallocated staged move picker for every ply, used by the search
             
     """
     def __init__(self):
         self.pieces = [0] * BRD_SQ_NUM
         self.pawns = [0] * 3  # pawn bitboards
+        self.pieceBB = [0] * 13 # bitboard of every piece type
+        self.colourBB = [0] * 3 # bitboard of all white, all black and all pieces
         self.king_square = [0] * 2 # position of king (0 - WHITE, 1 - BLACK)
         self.side = 0 # Side to move (0 for white, 1 for black)
         self.enPas = -1 # En passant square (-1 means no en passant square)
@@ -52,7 +67,9 @@ class Board:
         self.hisPly = 0 # history of half moves in game
         self.castlePerm = 0
 
-        self.posKey = PositionKey() # Unique Position key for each Position
+        self.posKey = 0 # Unique Position key for each Position
+        self.pawnKey = 0 # Zobrist hash of the pawns only
+        self.keyCount = {} # position key -> occurrences in the history
 
         self.pceNum = [0] * 13  # Total Number of pieces (Like pceNum[1] = 6 means we have 6 white pawns)
         self.bigPce = [0] * 2  # Number of non-pawn big pieces (Queens, rooks, bishops, knights)
@@ -60,19 +77,28 @@ class Board:
         self.minPce = [0] * 2  # Number of minor pieces (Bishops and Knights)
         
         self.material = [0] * 2 # Material Value of Pieces  
+        self.pceSqMg = [0] * 2 # Piece-Square Value of Pieces in the middlegame
+        self.pceSqEg = [0] * 2 # and in the endgame
+        self.phase = 0 # game phase, blending the two
         
         self.history = [UNDO() for _ in range(MAXGAMEMOVES)]
         self.pList = [[0 for _ in range(10)] for _ in range(13)] #piece list, pList[wN][0] = E1; adds a white knight on e1
         
-        self.PvTable = PVTABLE()
-        self.PvArray = [MOVE()] * MAXDEPTH
+        self.HashTable = HASHTABLE()
+        self.PawnHashTable = PAWNHASHTABLE()
+        self.EvalCache = EVALCACHE()
+        self.Nnue = None
+        self.PvArray = [NOMOVE] * MAXDEPTH
         
         #needed for move ordering
         # searchHistory[13][120] indexed by piece type and board square, everytime a move improves by alpha we reset all the values stored in this array to 0, 
         # when a piece beats alpha for that piece type and TOSQ we increment by 1
-        self.searchHistory = [[MOVE() for _ in range(BRD_SQ_NUM)] for _ in range(13)] 
+        self.searchHistory = [[0 for _ in range(BRD_SQ_NUM)] for _ in range(13)] 
         
-        self.searchKillers = [[MOVE() for _ in range(MAXDEPTH)] for _ in range(2)] # searchKillers[2][MAXDEPTH], stores 2 recent moves which caused the beta cutoff which aren't captures
+        self.searchKillers = [[NOMOVE for _ in range(MAXDEPTH)] for _ in range(2)] # searchKillers[2][MAXDEPTH], stores 2 recent moves which caused the beta cutoff which aren't captures
+        
+        self.moveLists = [MOVELIST() for _ in range(MAXDEPTH)] # one move list per ply, so generating moves doesn't allocate a new list at every node
+        self.movePickers = [MOVEPICKER() for _ in range(MAXDEPTH)]
         
     def reset_board(self) -> None:
         """Resetting the board to initial state"""
@@ -88,11 +114,16 @@ class Board:
             self.majPce[i] = 0
             self.minPce[i] = 0
             self.material[i] = 0
+            self.pceSqMg[i] = 0
+            self.pceSqEg[i] = 0
             self.pawns[i] = 0
         self.pawns[2] = 0
+        for i in range(0, 3):
+            self.colourBB[i] = 0
         
         for i in range(0, 13):
             self.pceNum[i] = 0
+            self.pieceBB[i] = 0
             
         self.king_square[Colors.WHITE] = Squares.NO_SQ
         self.king_square[Colors.BLACK] = Squares.NO_SQ
@@ -105,9 +136,10 @@ class Board:
         self.hisPly = 0
         
         self.castlePerm = 0
-        self.posKey = PositionKey()
-        
-        self.legal_moves = MOVELIST()
+        self.posKey = 0
+        self.pawnKey = 0
+        self.keyCount.clear()
+        self.phase = 0
 
     def print_board(self) -> None:
         """
@@ -133,7 +165,7 @@ class Board:
         
         print(f"Castle: {'K' if self.castlePerm & Castling.WKCA else '-'} {'Q' if self.castlePerm & Castling.WQCA else '-'} {'k' if self.castlePerm & Castling.BKCA else '-'} {'q' if self.castlePerm & Castling.BQCA else '-'} ")
         
-        print(hex(self.posKey.key))
+        print(hex(self.posKey))
 
     def _update_list_material(self) -> None:
         """
@@ -152,6 +184,14 @@ class Board:
                 if(PieceMaj[piece]):
                     self.majPce[colour] += 1
                 self.material[colour] += PieceVal[piece] # adding the value of material
+                self.pceSqMg[colour] += PceSqTableMg[piece][sq]
+                self.pceSqEg[colour] += PceSqTableEg[piece][sq]
+                self.phase += PiecePhase[piece]
+                
+                # setting the occupancy bits
+                self.pieceBB[piece] |= setMask[Sq120ToSq64[sq]]
+                self.colourBB[colour] |= setMask[Sq120ToSq64[sq]]
+                self.colourBB[Colors.BOTH] |= setMask[Sq120ToSq64[sq]]
                 
                 #Piece List --> pList[wP][pceNum]; example, there's our first white Pawn on e4, pList[wP][0] = E4
                 
@@ -259,10 +299,49 @@ class Board:
             _assert_condition(file >= Files.A and file <= Files.H)
             _assert_condition(rank >= Ranks.R1 and rank <= Ranks.R8)
             self.enPas = FR2SQ(file, rank)
-        self.posKey._generate_key(self) #generating the hashkey
+        self.posKey = hashkeys.generate_pos_key(self) #generating the hashkey
+        self.pawnKey = hashkeys.generate_pawn_key(self)
         self._update_list_material()
+        if(self.Nnue is not None):
+            self.Nnue._refresh(self)
         return True
 
+    def get_fen(self) -> str:
+        """
+        Generates the FEN (Forsyth-Edwards Notation) string of the current board state.
+
+        Returns:
+            str: The FEN string of the position.
+        """
+        rows = []
+        for rank in range(Ranks.R8, Ranks.R1 - 1, -1):
+            row = ""
+            empty = 0
+            for file in range(Files.A, Files.H + 1):
+                piece = self.pieces[FR2SQ(file, rank)]
+                if(piece == Pieces.EMPTY):
+                    empty += 1
+                    continue
+                if(empty):
+                    row += str(empty)
+                    empty = 0
+                row += PceChar[piece]
+            if(empty):
+                row += str(empty)
+            rows.append(row)
+            
+        castle = ""
+        castle += "K" if self.castlePerm & Castling.WKCA else ""
+        castle += "Q" if self.castlePerm & Castling.WQCA else ""
+        castle += "k" if self.castlePerm & Castling.BKCA else ""
+        castle += "q" if self.castlePerm & Castling.BQCA else ""
+        
+        enPas = "-"
+        if(self.enPas != Squares.NO_SQ):
+            enPas = FileChar[FilesBrd[self.enPas]] + RankChar[RanksBrd[self.enPas]]
+            
+        return f"{'/'.join(rows)} {SideChar[self.side]} {castle or '-'} {enPas} {self.fiftyMove} {self.hisPly // 2 + 1}"
+
     def _check_board(self) -> bool:
         """
         Verifies the consistency and integrity of the current board state.
@@ -280,6 +359,11 @@ class Board:
         t_majPce = [0,0]
         t_minPce = [0,0]
         t_material = [0,0]
+        t_pceSqMg = [0,0]
+        t_pceSqEg = [0,0]
+        t_phase = 0
+        t_pieceBB = [0] * 13
+        t_colourBB = [0, 0, 0]
         
         t_pawns = [0, 0, 0]
         t_pawns[Colors.WHITE] = self.pawns[Colors.WHITE]
@@ -309,6 +393,12 @@ class Board:
                     t_majPce[colour] += 1
                 
                 t_material[colour] += PieceVal[t_piece]
+                t_pceSqMg[colour] += PceSqTableMg[t_piece][sq120]
+                t_pceSqEg[colour] += PceSqTableEg[t_piece][sq120]
+                t_phase += PiecePhase[t_piece]
+                t_pieceBB[t_piece] |= setMask[sq64]
+                t_colourBB[colour] |= setMask[sq64]
+                t_colourBB[Colors.BOTH] |= setMask[sq64]
             
         for t_piece in range(Pieces.wP, Pieces.bK+1):
             _assert_condition(t_pceNum[t_piece] == self.pceNum[t_piece], message="Piece Number Not Matched!") #checking if the piece number on the board is equal to the piece num we calculated
@@ -339,6 +429,16 @@ class Board:
             
         _assert_condition(t_material[Colors.WHITE] == self.material[Colors.WHITE] and t_material[Colors.BLACK] == self.material[Colors.BLACK], message="Material Value Not Matched!!")
         
+        _assert_condition(t_pceSqMg == self.pceSqMg and t_pceSqEg == self.pceSqEg, message="Piece-Square Value Not Matched!!")
+        
+        _assert_condition(t_phase == self.phase, message="Game Phase Not Matched!!")
+        
+        _assert_condition(t_pieceBB == self.pieceBB and t_colourBB == self.colourBB, message="Occupancy Bitboards and actual Board not Matched!!")
+        
+        _assert_condition(hashkeys.generate_pos_key(self) == self.posKey, message="Position Key not Matched!!")
+        
+        _assert_condition(hashkeys.generate_pawn_key(self) == self.pawnKey, message="Pawn Key not Matched!!")
+        
         _assert_condition(t_minPce[Colors.WHITE] == self.minPce[Colors.WHITE] and t_minPce[Colors.BLACK] == self.minPce[Colors.BLACK], message="Number of Min Pieces not Matched!!")
         
         _assert_condition(t_majPce[Colors.WHITE] == self.majPce[Colors.WHITE] and t_majPce[Colors.BLACK] == self.majPce[Colors.BLACK], message="Number of Maj Pieces not Matched!!")
@@ -365,11 +465,21 @@ class Board:
         pce = self.pieces[square]
         _assert_condition(PieceValid(pce))
         
-        self.posKey._hash_piece(piece=pce, square=square)
+        self.posKey ^= hashkeys.PieceKeys[pce * BRD_SQ_NUM + square]
         
         col = PieceCol[pce] # getting the color of the piece
         self.pieces[square] = Pieces.EMPTY # making that square empty
         self.material[col] -= PieceVal[pce] # subtracting its value
+        self.pceSqMg[col] -= PceSqTableMg[pce][square]
+        self.pceSqEg[col] -= PceSqTableEg[pce][square]
+        self.phase -= PiecePhase[pce]
+        
+        sq64 = Sq120ToSq64[square]
+        if(self.Nnue is not None):
+            self.Nnue._clear_piece(pce, sq64)
+        self.pieceBB[pce] &= clearMask[sq64]
+        self.colourBB[col] &= clearMask[sq64]
+        self.colourBB[Colors.BOTH] &= clearMask[sq64]
         
         if(PieceBig[pce]): # if its a non-pawn piece
             self.bigPce[col] -= 1
@@ -378,6 +488,7 @@ class Board:
             else: # if its a minor piece (knights , bishops)
                 self.minPce[col] -= 1
         else: # if its a pawn
+            self.pawnKey ^= hashkeys.PieceKeys[pce * BRD_SQ_NUM + square]
             self.pawns[col] = ClearBit(self.pawns[col], Sq120ToSq64[square]) # bitboard, sq64
             self.pawns[Colors.BOTH] = ClearBit(self.pawns[Colors.BOTH], Sq120ToSq64[square])
 
@@ -408,7 +519,7 @@ class Board:
         _assert_condition(SqOnBoard(square))
         
         col = PieceCol[piece]
-        self.posKey._hash_piece(piece=piece, square=square)
+        self.posKey ^= hashkeys.PieceKeys[piece * BRD_SQ_NUM + square]
         
         self.pieces[square] = piece
         
@@ -419,10 +530,21 @@ class Board:
             else:
                 self.minPce[col] += 1
         else: 
+            self.pawnKey ^= hashkeys.PieceKeys[piece * BRD_SQ_NUM + square]
             self.pawns[col] = SetBit(self.pawns[col], Sq120ToSq64[square])
             self.pawns[Colors.BOTH] = SetBit(self.pawns[Colors.BOTH], Sq120ToSq64[square])
             
         self.material[col] += PieceVal[piece] #updating the material value
+        self.pceSqMg[col] += PceSqTableMg[piece][square]
+        self.pceSqEg[col] += PceSqTableEg[piece][square]
+        self.phase += PiecePhase[piece]
+        
+        sq64 = Sq120ToSq64[square]
+        if(self.Nnue is not None):
+            self.Nnue._add_piece(piece, sq64)
+        self.pieceBB[piece] |= setMask[sq64]
+        self.colourBB[col] |= setMask[sq64]
+        self.colourBB[Colors.BOTH] |= setMask[sq64]
         self.pList[piece][self.pceNum[piece]] = square # setting the pce on pList
         self.pceNum[piece] += 1
 
@@ -442,17 +564,24 @@ class Board:
         
         t_PieceIndex = False
         
-        self.posKey._hash_piece(piece=pce, square=from_square)
+        self.posKey ^= hashkeys.PieceKeys[pce * BRD_SQ_NUM + from_square] ^ hashkeys.PieceKeys[pce * BRD_SQ_NUM + to_square]
         self.pieces[from_square] = Pieces.EMPTY
-        
-        self.posKey._hash_piece(piece=pce, square=to_square)
         self.pieces[to_square] = pce
         
+        self.pceSqMg[col] += PceSqTableMg[pce][to_square] - PceSqTableMg[pce][from_square]
+        self.pceSqEg[col] += PceSqTableEg[pce][to_square] - PceSqTableEg[pce][from_square]
+        
+        if(self.Nnue is not None):
+            self.Nnue._move_piece(pce, Sq120ToSq64[from_square], Sq120ToSq64[to_square])
+        moveMask = setMask[Sq120ToSq64[from_square]] | setMask[Sq120ToSq64[to_square]] # clearing the from bit and setting the to bit in one go
+        self.pieceBB[pce] ^= moveMask
+        self.colourBB[col] ^= moveMask
+        self.colourBB[Colors.BOTH] ^= moveMask
+        
         if(not PieceBig[pce]): # if its a pawn
-            self.pawns[col] = ClearBit(self.pawns[col], Sq120ToSq64[from_square])
-            self.pawns[Colors.BOTH] = ClearBit(self.pawns[Colors.BOTH], Sq120ToSq64[from_square])
-            self.pawns[col] = SetBit(self.pawns[col], Sq120ToSq64[to_square])
-            self.pawns[Colors.BOTH] = SetBit(self.pawns[Colors.BOTH], Sq120ToSq64[to_square])
+            self.pawnKey ^= hashkeys.PieceKeys[pce * BRD_SQ_NUM + from_square] ^ hashkeys.PieceKeys[pce * BRD_SQ_NUM + to_square]
+            self.pawns[col] ^= moveMask
+            self.pawns[Colors.BOTH] ^= moveMask
             
         for index in range(0, self.pceNum[pce]):
             if(self.pList[pce][index] == from_square):
@@ -469,39 +598,33 @@ class Board:
         """
         _assert_condition(self._check_board())
         
+        nnue = self.Nnue
+        self.Nnue = None # the accumulator before the move is popped off its stack, the pieces moving back don't need to update it
+        
         # resetting the counters
         self.hisPly -= 1
         self.ply -= 1
         
         move = self.history[self.hisPly].move # getting the move from the history
-        fromSq = move.FROMSQ()
-        toSq = move.TOSQ()
+        fromSq = FROMSQ(move)
+        toSq = TOSQ(move)
         
         _assert_condition(SqOnBoard(fromSq))
         _assert_condition(SqOnBoard(toSq))
         
-        if(self.enPas != Squares.NO_SQ):
-            self.posKey._hash_enPas(enPas=self.enPas)
-        self.posKey._hash_castle(castlePerm=self.castlePerm) # hashing out the current castle Perm
-        
         self.castlePerm = self.history[self.hisPly].castlePerm # retreiving back the previous castlePerm
         self.fiftyMove = self.history[self.hisPly].fiftyMove
         self.enPas = self.history[self.hisPly].enPas
         
-        if(self.enPas != Squares.NO_SQ):
-            self.posKey._hash_enPas(enPas=self.enPas)
-        self.posKey._hash_castle(castlePerm=self.castlePerm) # hashing in the new castle permission
-        
         self.side ^= 1 #changing back the side
-        self.posKey._hash_side()
         
-        if(move.move & MOVE.FLAG_EP): # if it was an enPas capture, then we add back the pieces
+        if(move & MOVE.FLAG_EP): # if it was an enPas capture, then we add back the pieces
             if(self.side == Colors.WHITE):
                 self._add_piece(toSq-10, Pieces.bP)
             else:
                 self._add_piece(toSq+10, Pieces.wP)
                 
-        elif(move.move & MOVE.FLAG_CA): # if it was a castle move
+        elif(move & MOVE.FLAG_CA): # if it was a castle move
             if(toSq == Squares.C1):
                 self._move_piece(Squares.D1, Squares.A1) # moving back the rook
             elif(toSq == Squares.C8):
@@ -519,31 +642,42 @@ class Board:
         if(PieceKing[self.pieces[fromSq]]):
             self.king_square[self.side] = fromSq # moving back the king
             
-        captured = move.CAPTURED()
+        captured = CAPTURED(move)
         if(captured != Pieces.EMPTY):
             _assert_condition(PieceValid(captured))
             self._add_piece(toSq, captured) # adding back the captured piece
             
-        prPce = move.PROMOTED()
+        prPce = PROMOTED(move)
         if(prPce != Pieces.EMPTY): #  ! explanation is needed
             _assert_condition(PieceValid(prPce) and not PiecePawn[prPce])
             self._clear_piece(fromSq)
             toAdd = Pieces.wP if PieceCol[prPce] == Colors.WHITE else Pieces.bP
             self._add_piece(fromSq, toAdd)
         
+        self.posKey = self.history[self.hisPly].posKey # the pieces hashed themselves back, but the stored key also covers side, castling and en passant
+        self._uncount_key(self.posKey)
+        
+        if(nnue is not None):
+            nnue._pop()
+            self.Nnue = nnue
+        
         _assert_condition(self._check_board())
 
-    def make_move(self, move: MOVE) -> bool:
+    def make_move(self, move: int, legal: bool = False) -> bool:
         """
         Executes a move on the board, updating game state and validating legality.
         
+        Args:
+            move (int): The encoded move to make.
+            legal (bool): True if the move is known to be legal (from the legal move generator), skipping the check test.
+        
         Returns:
             bool: False if the move results in check against the moving side (illegal), True otherwise.
 
         """
         _assert_condition(self._check_board())
-        fromSq = move.FROMSQ()
-        toSq = move.TOSQ()
+        fromSq = FROMSQ(move)
+        toSq = TOSQ(move)
         side = self.side
         
         _assert_condition(SqOnBoard(fromSq))
@@ -552,14 +686,17 @@ class Board:
         _assert_condition(PieceValid(self.pieces[fromSq]))
         
         # storing the move in history, before changing any posKey, we store the posKey in history
-        self.history[self.hisPly].posKey = self.posKey.copy() # history array contains the objects of class UNDO()
+        self.history[self.hisPly].posKey = self.posKey # history array contains the objects of class UNDO()
+        self.keyCount[self.posKey] = self.keyCount.get(self.posKey, 0) + 1
+        if(self.Nnue is not None):
+            self.Nnue._push() # take_move gets the accumulator back from the stack
         
-        if(move.move & MOVE.FLAG_EP): # if its an enpassant capture
+        if(move & MOVE.FLAG_EP): # if its an enpassant capture
             if(side == Colors.WHITE):
                 self._clear_piece(toSq-10) # capturing the black pawn
             else:
                 self._clear_piece(toSq+10) # capturing the white pawn
-        elif(move.move & MOVE.FLAG_CA): # if its an castle MOVE
+        elif(move & MOVE.FLAG_CA): # if its an castle MOVE
             if(toSq == Squares.C1):
                 self._move_piece(Squares.A1, Squares.D1)
             elif(toSq == Squares.C8):
@@ -572,9 +709,9 @@ class Board:
                 _assert_condition(False)
                 
         if(self.enPas != Squares.NO_SQ):
-            self.posKey._hash_enPas(enPas=self.enPas)
+            self.posKey ^= hashkeys.PieceKeys[self.enPas]
         
-        self.posKey._hash_castle(castlePerm=self.castlePerm) # hashing out the castle permission
+        self.posKey ^= hashkeys.CastleKeys[self.castlePerm] # hashing out the castle permission
         
         self.history[self.hisPly].move = move
         self.history[self.hisPly].fiftyMove = self.fiftyMove
@@ -585,9 +722,9 @@ class Board:
         self.castlePerm &= CastlePerm[toSq] # if rook or king has moved
         self.enPas = Squares.NO_SQ
         
-        self.posKey._hash_castle(castlePerm=self.castlePerm) # hashing in the new castle permission
+        self.posKey ^= hashkeys.CastleKeys[self.castlePerm] # hashing in the new castle permission
         
-        captured = move.CAPTURED()
+        captured = CAPTURED(move)
         self.fiftyMove += 1
         
         if(captured != Pieces.EMPTY):
@@ -601,20 +738,20 @@ class Board:
         # setting up the enPas sqaure
         if(PiecePawn[self.pieces[fromSq]]): # if the piece on fromSq was a pawn
             self.fiftyMove = 0 # if its a pawn move, reset the counter
-            if(move.move & MOVE.FLAG_PS): # if it was a pawn start move
+            if(move & MOVE.FLAG_PS): # if it was a pawn start move
                 if(side == Colors.WHITE):
                     self.enPas = fromSq + 10
                     _assert_condition(RanksBrd[self.enPas] == Ranks.R3)
                 else:
                     self.enPas = fromSq - 10
                     _assert_condition(RanksBrd[self.enPas] == Ranks.R6)
-                self.posKey._hash_enPas(enPas=self.enPas) # hashing in the new enPas
+                self.posKey ^= hashkeys.PieceKeys[self.enPas] # hashing in the new enPas
         
         # finally moving the piece on the board
         self._move_piece(fromSq, toSq)
         
         # checking for promotions
-        prPce = move.PROMOTED()
+        prPce = PROMOTED(move)
         if(prPce != Pieces.EMPTY):
             _assert_condition(PieceValid(prPce) and not PiecePawn[prPce])
             
@@ -627,101 +764,190 @@ class Board:
             self.king_square[self.side] = toSq
         
         self.side ^= 1 # changing the side
-        self.posKey._hash_side()
+        self.posKey ^= hashkeys.SideKey
         
         _assert_condition(self._check_board())
         
+        if(legal):
+            if(DEBUG): # the argument of _assert_condition is always evaluated
+                _assert_condition(not is_sqaure_attacked(self.king_square[side], self.side, self), message="Illegal Move from the legal move generator!!")
+            return True
+        
         if(is_sqaure_attacked(self.king_square[side], self.side, self)): # side is the side which made the move, self.side now is now the opposite side, so we check if after making the move, the opposite side is attacking the king_square, means king is in check, then its an illegal move
             self.take_move()  # take back the move
             return False
         
         return True
 
+    def make_null_move(self) -> None:
+        """
+        Passes the turn to the opponent without moving a piece (used by null move pruning).
+        The side to move, en passant square and position key are updated and the previous state
+        is stored in the history, so the null move can be taken back with `take_null_move`.
+        Must not be made while the side to move is in check.
+        """
+        _assert_condition(self._check_board())
+        _assert_condition(not is_sqaure_attacked(self.king_square[self.side], self.side^1, self))
+        
+        self.history[self.hisPly].posKey = self.posKey
+        self.keyCount[self.posKey] = self.keyCount.get(self.posKey, 0) + 1
+        self.history[self.hisPly].move = NOMOVE
+        self.history[self.hisPly].fiftyMove = self.fiftyMove
+        self.history[self.hisPly].enPas = self.enPas
+        self.history[self.hisPly].castlePerm = self.castlePerm
+        
+        if(self.enPas != Squares.NO_SQ):
+            self.posKey ^= hashkeys.PieceKeys[self.enPas] # the en passant capture is gone after passing
+        self.enPas = Squares.NO_SQ
+        
+        self.hisPly += 1
+        self.ply += 1
+        
+        self.side ^= 1
+        self.posKey ^= hashkeys.SideKey
+        
+        _assert_condition(self._check_board())
+        
+    def take_null_move(self) -> None:
+        """
+        Takes back the null move made by `make_null_move`.
+        """
+        _assert_condition(self._check_board())
+        
+        self.hisPly -= 1
+        self.ply -= 1
+        
+        _assert_condition(self.history[self.hisPly].move == NOMOVE)
+        
+        self.castlePerm = self.history[self.hisPly].castlePerm
+        self.fiftyMove = self.history[self.hisPly].fiftyMove
+        self.enPas = self.history[self.hisPly].enPas
+        self.posKey = self.history[self.hisPly].posKey
+        self._uncount_key(self.posKey)
+        
+        self.side ^= 1
+        
+        _assert_condition(self._check_board())
+        
     def is_repetition(self) -> bool :
         """
-        Checks if the current game position has occurred before in the game history, 
-        considering only positions after the last reset of the fifty-move rule. 
-        This prevents repetition of captures and pawn moves, which are not allowed to repeat.
+        Checks if the current game position has occurred before in the game history.
+        Instead of scanning the history, the position key is looked up in `keyCount`. The key covers
+        the side to move, so only positions with the same side to move can match. Positions from before
+        a capture or a pawn move never come back, so keeping their keys in `keyCount` is harmless,
+        just like the fifty move window of a scan would skip them.
 
         Returns:
             bool: True if the current position has been seen before in the game history, 
                 indicating a repetition. False otherwise.
         """
-        global counter
-        for index in range(self.hisPly - self.fiftyMove, self.hisPly-1):
-            if(self.posKey.key == self.history[index].posKey.key):
-                _assert_condition(index >=0 and index <= MAXGAMEMOVES)
-                counter += 1
-                # print(f"{counter}")
-                return True
-            
-        return False
+        if(DEBUG):
+            _assert_condition((self.posKey in self.keyCount) == any(self.history[index].posKey == self.posKey for index in range(0, self.hisPly)), message="Repetition Key Count not Matched!!")
+        return self.posKey in self.keyCount
     
+    def _uncount_key(self, key: int) -> None:
+        """
+        Removes one occurrence of a position key from `keyCount`, when its position is taken off the history.
+
+        Args:
+            key (int): The position key.
+        """
+        count = self.keyCount[key] - 1
+        if(count):
+            self.keyCount[key] = count
+        else:
+            del self.keyCount[key]
+        
     def evaluate_position(self) -> int:
+        """
+        Evaluates the current position (see `_evaluate`), looking it up in the evaluation cache first if it is enabled.
+
+        Returns:
+            int: The evaluation score of the position from the side to move's point of view.
+        """
+        cache = self.EvalCache
+        if(not cache.enabled):
+            return self._evaluate()
+        
+        found, score = cache._probe_eval_entry(self.posKey)
+        if(found):
+            if(DEBUG):
+                _assert_condition(score == self._evaluate(), message="Eval Cache Entry Not Matched!!")
+            return score
+        score = self._evaluate()
+        cache._store_eval_entry(self.posKey, score)
+        return score
+        
+    def _evaluate(self) -> int:
         """
         Evaluates the current position on the chessboard by calculating the material balance 
-        and piece-specific scores based on their positions. The evaluation takes into account 
-        the current side (white or black) and adds or subtracts scores based on piece placement 
-        using pre-defined evaluation tables for pawns, knights, bishops, and rooks. The final score 
-        is positive for white and negative for black.
+        and piece-specific scores based on their positions. The middlegame and endgame piece-square
+        scores are blended by the game phase (tapered evaluation), all of them are running totals kept
+        up to date by `_add_piece`, `_clear_piece` and `_move_piece`, so the evaluation doesn't loop over the pieces.
+        The pawn structure (passed, isolated, doubled and backward pawns) comes from the pawn hash table,
+        the pawns in front of the kings (pawn shield) only count in the middlegame.
+        The final score is positive for white and negative for black.
+        With a network loaded (`Nnue`), the network scores the position instead.
 
         Returns:
-            int: The evaluation score of the position. Positive for white's advantage, negative for black's advantage.
-        """
-        pce = 0
-        score = self.material[Colors.WHITE] - self.material[Colors.BLACK]
-        
-        pce=Pieces.wP
-        for pceNum in range(0, self.pceNum[pce]): # traversing all the white pawns
-            sq = self.pList[pce][pceNum] # getting the 120 based square on which the piece is
-            _assert_condition(SqOnBoard(sq))
-            score += PawnTable[Sq120ToSq64[sq]]
-        
-        pce=Pieces.bP
-        for pceNum in range(0, self.pceNum[pce]): # traversing all the black pawns
-            sq = self.pList[pce][pceNum] # getting the 120 based square on which the piece is
-            _assert_condition(SqOnBoard(sq))
-            score -= PawnTable[Mirror64[Sq120ToSq64[sq]]] # mirroring the square for black
-            
-        pce=Pieces.wN
-        for pceNum in range(0, self.pceNum[pce]): # traversing all the white knights
-            sq = self.pList[pce][pceNum] # getting the 120 based square on which the piece is
-            _assert_condition(SqOnBoard(sq))
-            score += KnightTable[Sq120ToSq64[sq]]
-        
-        pce=Pieces.bN
-        for pceNum in range(0, self.pceNum[pce]): # traversing all the black knights
-            sq = self.pList[pce][pceNum] # getting the 120 based square on which the piece is
-            _assert_condition(SqOnBoard(sq))
-            score -= KnightTable[Mirror64[Sq120ToSq64[sq]]] # mirroring the square for black
-            
-        pce=Pieces.wB
-        for pceNum in range(0, self.pceNum[pce]): # traversing all the white bishops
-            sq = self.pList[pce][pceNum] # getting the 120 based square on which the piece is
-            _assert_condition(SqOnBoard(sq))
-            score += BishopTable[Sq120ToSq64[sq]]
-        
-        pce=Pieces.bB
-        for pceNum in range(0, self.pceNum[pce]): # traversing all the black bishops
-            sq = self.pList[pce][pceNum] # getting the 120 based square on which the piece is
-            _assert_condition(SqOnBoard(sq))
-            score -= BishopTable[Mirror64[Sq120ToSq64[sq]]] # mirroring the square for black
-            
-        pce=Pieces.wR
-        for pceNum in range(0, self.pceNum[pce]): # traversing all the white rooks
-            sq = self.pList[pce][pceNum] # getting the 120 based square on which the piece is
-            _assert_condition(SqOnBoard(sq))
-            score += RookTable[Sq120ToSq64[sq]]
-        
-        pce=Pieces.bR
-        for pceNum in range(0, self.pceNum[pce]): # traversing all the black rooks
-            sq = self.pList[pce][pceNum] # getting the 120 based square on which the piece is
-            _assert_condition(SqOnBoard(sq))
-            score -= RookTable[Mirror64[Sq120ToSq64[sq]]] # mirroring the square for black
+            int: The evaluation score of the position from the side to move's point of view.
+        """
+        if(self.Nnue is not None):
+            if(DEBUG):
+                _assert_condition((self.Nnue.accumulators[self.Nnue.top] == self.Nnue._compute(self)).all(), message="NNUE Accumulator Not Matched!!")
+            return self.Nnue._evaluate(self.side)
+        
+        if(DEBUG):
+            _assert_condition([self.pceSqMg, self.pceSqEg] == self._compute_pce_sq(), message="Incremental Piece-Square Value Not Matched!!")
+        
+        phase = self.phase if self.phase < MAX_PHASE else MAX_PHASE # promotions can take the phase above the start position
+        material = self.material[Colors.WHITE] - self.material[Colors.BLACK]
+        mg = self.pceSqMg[Colors.WHITE] - self.pceSqMg[Colors.BLACK]
+        eg = self.pceSqEg[Colors.WHITE] - self.pceSqEg[Colors.BLACK]
+        
+        pawnMg, pawnEg = self.PawnHashTable._probe_pawn_entry(self)
+        if(DEBUG):
+            _assert_condition((pawnMg, pawnEg) == evaluate_pawn_structure(self.pawns[Colors.WHITE], self.pawns[Colors.BLACK]), message="Pawn Hash Entry Not Matched!!")
+        mg += pawnMg + self._pawn_shield(Colors.WHITE) - self._pawn_shield(Colors.BLACK)
+        eg += pawnEg
+        score = material + int((mg * phase + eg * (MAX_PHASE - phase)) / MAX_PHASE) # rounding towards 0, so black and white are scored alike
             
         if(self.side == Colors.WHITE):
             return score
         else:
             return -score # negating the score for black (because we are calculating score based on white, lets say black's score is better than our score value will be -ve because score = whiteMaterial - blackMaterial and later on we are subtracting for black and adding for white)
         
+    def _pawn_shield(self, col: int) -> int:
+        """
+        Scores the own pawns right in front of a king, 1 and 2 ranks ahead of it on its file and the next ones.
+
+        Args:
+            col (int): Color of the king.
+
+        Returns:
+            int: Middlegame pawn shield score of that side.
+        """
+        king64 = Sq120ToSq64[self.king_square[col]]
+        shield = ShieldMasks[col][king64]
+        pawns = self.pawns[col]
+        shield2 = shield << 8 if col == Colors.WHITE else shield >> 8 # the rank after, bits shifted off the board never match a pawn
+        return PawnShieldMg[0] * CountBits(shield & pawns) + PawnShieldMg[1] * CountBits(shield2 & pawns)
+
+    def _compute_pce_sq(self) -> list:
+        """
+        Recomputes the middlegame and endgame piece-square scores of both sides from the piece lists, used to verify the running `pceSqMg` and `pceSqEg` totals.
+
+        Returns:
+            list: Middlegame and endgame piece-square scores, each indexed by colors (0 - `WHITE` , 1 - `BLACK`).
+        """
+        pceSqMg = [0, 0]
+        pceSqEg = [0, 0]
+        for pce in range(Pieces.wP, Pieces.bK + 1):
+            for pceNum in range(0, self.pceNum[pce]):
+                sq = self.pList[pce][pceNum] # getting the 120 based square on which the piece is
+                _assert_condition(SqOnBoard(sq))
+                pceSqMg[PieceCol[pce]] += PceSqTableMg[pce][sq]
+                pceSqEg[PieceCol[pce]] += PceSqTableEg[pce][sq]
+        return [pceSqMg, pceSqEg]
+        
     
\ No newline at end of file
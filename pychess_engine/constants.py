@@ -5,6 +5,9 @@ MAXGAMEMOVES = 2048
 MAXPOSITIONMOVES = 256
 MAXDEPTH = 64
 
+INFINITE = 30000
+MATE = 29000
+
 Piece = namedtuple("Piece", ['EMPTY', 'wP', 'wN', 'wB','wR', 'wQ', 'wK', 'bP', 'bN', 'bB', 'bR', 'bQ', 'bK'])
 Pieces = Piece(0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12)
 
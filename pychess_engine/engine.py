@@ -5,7 +5,10 @@ from pychess_engine.fens import START_FEN
 from pychess_engine.misc import GetTimeMs, ReadInput
 from pychess_engine.helper import execution_time
 from pychess_engine.search import Search
-from pychess_engine.perft import PerftTest
+from pychess_engine.smp import SMPSEARCH, MAX_THREADS
+from pychess_engine.perft import PerftTest, PerftDivide
+from pychess_engine.batcheval import evaluate_batch
+from pychess_engine.nnue import NNUE
 
 class EngineControls:
     """
@@ -24,6 +27,11 @@ class EngineControls:
         stopped (int): Indicates if search has been manually stopped.
         fh (int): Count of fail-high occurrences during alpha-beta pruning.
         fhf (int): Count of fail-high occurrences on the first move.
+        lmr (bool): Whether late move reductions are used by the search, can be switched off to compare node counts.
+        aspiration_depth (int): Depth from which iterative deepening searches a narrow window around the previous score.
+        aspiration_windows (list): Half widths of the successive windows, the failing side is widened to the next one, and to infinity after the last.
+        completed_depth (int): Depth of the last iteration the search completed.
+        stop_event (Event): Set by the main process to stop the search of a Lazy SMP worker, None in the main process.
     """
     elo_to_depth = {
         300  : 1,
@@ -49,6 +57,15 @@ class EngineControls:
         self.fh = 0 # A "fail high" means that the evaluation of a move exceeded the beta value
         self.fhf = 0 # Fail High First refers to the situation where the first move evaluated in a position causes a fail high, This is a good sign because it means the engine is ordering its moves well. If the first move fails high, it indicates that the best move (or one of the best moves) was tried first, allowing the engine to prune the rest of the search tree early.
         
+        self.lmr = True # late move reductions
+        
+        # aspiration windows
+        self.aspiration_depth = 4
+        self.aspiration_windows = [25, 100, 400]
+        
+        self.completed_depth = 0
+        self.stop_event = None
+        
     def __str__(self):
         """
         Returns a formatted string with the current engine control settings.
@@ -75,11 +92,16 @@ class EngineControls:
         Checks if the allotted search time has expired or if an interrupt request was made.
         
         Sets the `stopped` attribute to True if the current time exceeds the stop time.
+        Lazy SMP workers don't read the input, they stop when the main process sets their `stop_event`.
         """
         if (self.timeset == True and GetTimeMs() > self.stoptime):
             self.stopped = True
             
-        ReadInput(self)
+        if(self.stop_event is not None):
+            if(self.stop_event.is_set()):
+                self.stopped = True
+        else:
+            ReadInput(self)
 
 class Engine:
     """
@@ -94,6 +116,8 @@ class Engine:
         controls (EngineControls): Manages search control settings.
         board (Board): Represents the current board state.
         search (Search): Manages search algorithms and move evaluation.
+        threads (int): Number of processes searching in parallel (Lazy SMP), 1 searches in this process only.
+        smp (SMPSEARCH): The Lazy SMP search when `threads` is more than 1, None otherwise.
 
     Methods: 
         - legal_moves() -> list: Generates a list of all legal moves from the current board state.
@@ -103,10 +127,16 @@ class Engine:
         - make_move(move: str) -> bool: Makes a move on the board if it’s legal.
         - is_move_legal(move: str) -> bool: Checks if a move is legal.
         - set_elo(elo: int) -> None: Sets the ELO rating, adjusting the search depth.
+        - set_hash_size(MB: int) -> None: Resizes the transposition table.
+        - set_threads(threads: int) -> None: Sets the number of processes searching in parallel.
+        - set_eval_cache(enabled: bool) -> None: Switches the evaluation cache on or off.
+        - load_nnue(path: str = None) -> None: Evaluates positions with a network loaded from a weights file.
         - get_elo() -> int: Returns the current ELO rating.
         - evaluate() -> int: Evaluates the current board position.
+        - evaluate_batch(positions, sides=None): Evaluates many positions at once with NumPy.
         - best_move(depth=MAXDEPTH, movestogo=30, movetime=None, increment=0, time=None) -> str: 
         Determines the best move based on search parameters and constraints.    
+        - perft_divide(depth=3, processes=1, use_cache=False) -> dict: Counts the leaf nodes below every legal move.
     
     """
     MAX_ELO = 1700
@@ -118,6 +148,8 @@ class Engine:
         self.controls = EngineControls()
         self.board = Board()
         self.search = Search(self.board, self.controls)
+        self.threads = 1
+        self.smp = None
         
         initialize()
         self.load_fen(fen=START_FEN)
@@ -130,7 +162,7 @@ class Engine:
             list: List of all possible moves (algebraic notation like e2e4) from the current position.
         """
         mlist = MOVELIST()
-        mlist.generate_all_moves(board=self.board)
+        mlist.generate_legal_moves(board=self.board)
         return mlist._get_move_list()
     
     def reset_board(self) -> None:
@@ -157,7 +189,7 @@ class Engine:
         Returns:
             str: FEN string representing the current board state.
         """
-        pass  # todo: implement
+        return self.board.get_fen()
     
     def make_move(self, move: str) -> bool:
         """
@@ -172,7 +204,9 @@ class Engine:
         enc_move = MOVE.parse_move(alpha_move=move, board=self.board)
         if(enc_move == MOVE.NOMOVE):
             return False
-        return self.board.make_move(move=enc_move) # if move is not legal it returns True
+        self.board.make_move(move=enc_move.move, legal=True) # parse_move only finds legal moves
+        self.board.ply = 0 # the move is part of the game, not of a search
+        return True
     
     def is_move_legal(self, move: str) -> bool:
         """
@@ -196,6 +230,68 @@ class Engine:
         """
         self.elo = elo
         
+    def set_hash_size(self, MB: int) -> None:
+        """
+        Resizes the transposition table used by the search, clearing its content.
+        
+        Args:
+            MB (int): Size of the transposition table in megabytes.
+        """
+        if(self.smp is not None): # the workers have to attach to the new table
+            self.smp.close()
+            self.smp = None
+        self.board.HashTable.init_hash_table(MB)
+        if(self.threads > 1):
+            self.smp = SMPSEARCH(board=self.board, workers=self.threads - 1)
+        
+    def set_threads(self, threads: int) -> None:
+        """
+        Sets the number of processes searching in parallel. With more than one, the search runs
+        Lazy SMP, `threads - 1` worker processes search alongside this one, sharing the transposition table.
+        
+        Args:
+            threads (int): Number of searching processes, usually the number of cores, kept between 1 and `MAX_THREADS`.
+        """
+        if(self.smp is not None):
+            self.smp.close()
+            self.smp = None
+        self.threads = min(MAX_THREADS, max(1, threads))
+        if(self.threads > 1):
+            self.smp = SMPSEARCH(board=self.board, workers=self.threads - 1)
+        
+    def set_eval_cache(self, enabled: bool) -> None:
+        """
+        Switches the evaluation cache on or off, the cache keeps the evaluation of the positions
+        evaluated so far by their position key. It is emptied either way.
+        
+        Args:
+            enabled (bool): Whether the evaluation is looked up in the cache first.
+        """
+        self.board.EvalCache.enabled = enabled
+        self.board.EvalCache._clear_table()
+        
+    def load_nnue(self, path: str = None) -> None:
+        """
+        Evaluates positions with an NNUE-style network instead of the piece-square tables, the network's
+        first layer is updated incrementally as pieces move. Needs numpy.
+        It can be loaded in the middle of a game, the moves played so far are replayed to fill its accumulator stack,
+        so they can still be taken back.
+        
+        Args:
+            path (str, optional): The `.npz` weights file (see `nnue.NNUE`), None goes back to the tables.
+        """
+        nnue = NNUE(path) if path is not None else None
+        self.board.Nnue = None
+        moves = [self.board.history[ply].move for ply in range(0, self.board.hisPly)]
+        for _ in moves: # back to the position the game started from
+            self.board.take_move()
+        self.board.Nnue = nnue
+        if(nnue is not None):
+            nnue._refresh(self.board)
+        for move in moves: # every move pushes the accumulator of the position before it
+            self.board.make_move(move, legal=True)
+        self.board.EvalCache._clear_table() # the cached scores are the other evaluation's
+        
     def get_elo(self) -> int:
         """
         Retrieves the current ELO rating of the engine.
@@ -214,6 +310,21 @@ class Engine:
         """
         return self.board.evaluate_position()
     
+    def evaluate_batch(self, positions, sides=None):
+        """
+        Evaluates many positions at once with the piece-square and pawn structure tables, giving the same scores
+        as loading and evaluating them one by one without a network, a network loaded with `load_nnue` is ignored.
+        The board is left untouched. Needs numpy.
+        
+        Args:
+            positions: A list or any iterable (e.g. an open file) of FEN strings, or (N, 12, 64) planes encoded with `batcheval.encode_fens`.
+            sides (optional): Side to move of every position, needed when `positions` are encoded planes.
+        
+        Returns:
+            ndarray: Evaluation score of every position, in their order.
+        """
+        return evaluate_batch(positions, sides=sides)
+    
     @execution_time
     def best_move(self, depth=None, movestogo=30, movetime=None, increment=0, time=None, display_calculation=True) -> str:
         """
@@ -255,7 +366,10 @@ class Engine:
             if(display_calculation):
                 print(self.controls)
             
-            result, score = self.search.iterative_deepening(display_calculation=display_calculation)
+            if(self.smp is not None):
+                result, score = self.smp.search(search=self.search, controls=self.controls, display_calculation=display_calculation)
+            else:
+                result, score = self.search.iterative_deepening(display_calculation=display_calculation)
         except Exception:
             print("Something went Wrong!")
         return result
@@ -263,9 +377,23 @@ class Engine:
     def print_board(self) -> None:
         self.board.print_board()
     
-    def perft_test(self, depth=3) -> None:
-        """Perft Testing"""
-        PerftTest(depth=depth, board=self.board)
+    def perft_test(self, depth=3, use_cache=False, processes=1) -> int:
+        """Perft Testing, returns the number of leaf nodes"""
+        return PerftTest(depth=depth, board=self.board, use_cache=use_cache, processes=processes)
+    
+    def perft_divide(self, depth=3, processes=1, use_cache=False) -> dict:
+        """
+        Counts the leaf nodes below every legal move of the current position.
+        
+        Args:
+            depth (int): Depth for the Perft test, at least 1.
+            processes (int): Number of worker processes the moves are spread over.
+            use_cache (bool): Whether to count transpositions once.
+            
+        Returns:
+            dict: `moves` ({move: nodes}), total `nodes`, `time_ms` and `nps`.
+        """
+        return PerftDivide(depth=depth, board=self.board, processes=processes, use_cache=use_cache)
 
     def analyze_position(self, fen, depth=4) -> int:
         
@@ -0,0 +1,68 @@
+from array import array
+from pychess_engine.debug import _assert_condition
+
+EVAL_CACHE_ENTRIES = 1 << 16 # a power of 2, the entry of a position key is its lowest bits
+
+class EVALCACHE:
+    """
+    Caches the static evaluation of positions by their position key, so transpositions and re-searches
+    (quiescence evaluates at every node) don't evaluate the same position again.
+
+    Entries live in flat arrays, entry `i` takes the key `keys[i]` and the score `scores[i]`, the score
+    from the point of view of the side to move (which the position key includes). The table has a fixed size
+    and a newly evaluated position always replaces the entry it maps to.
+
+    Attributes:
+        enabled (bool): Whether the board uses the cache, a disabled cache is left untouched.
+        numEntries (int): The number of entries available in the table, a power of 2.
+        keys (array): Position key of every entry, 0 for the empty entries.
+        scores (array): Evaluation score of every entry.
+        hit (int): Number of probes which found the position.
+        miss (int): Number of probes which didn't.
+    """
+    def __init__(self, numEntries: int = EVAL_CACHE_ENTRIES, enabled: bool = True):
+        _assert_condition(numEntries > 0 and numEntries & (numEntries - 1) == 0)
+        self.enabled = enabled
+        self.numEntries = numEntries
+        self._clear_table()
+
+    def _clear_table(self) -> None:
+        """Clears the table by resetting all entries to empty states."""
+        self.keys = array('Q', bytes(self.numEntries * 8))
+        self.scores = array('i', bytes(self.numEntries * 4))
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        """Resets the probe counters."""
+        self.hit = 0
+        self.miss = 0
+
+    def _probe_eval_entry(self, posKey: int) -> tuple[bool, int]:
+        """
+        Looks a position up in the table.
+
+        Args:
+            posKey (int): Position key of the position.
+
+        Returns:
+            bool: True if the position is in the table, False otherwise.
+            int: The stored score, only meaningful if the first value is True.
+        """
+        index = posKey & (self.numEntries - 1)
+        if(posKey and self.keys[index] == posKey): # 0 is the key of the empty entries
+            self.hit += 1
+            return True, self.scores[index]
+        self.miss += 1
+        return False, 0
+
+    def _store_eval_entry(self, posKey: int, score: int) -> None:
+        """
+        Stores the evaluation of a position, replacing whatever the entry held.
+
+        Args:
+            posKey (int): Position key of the position.
+            score (int): Evaluation score from the point of view of the side to move.
+        """
+        index = posKey & (self.numEntries - 1)
+        self.keys[index] = posKey
+        self.scores[index] = score
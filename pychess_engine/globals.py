@@ -97,7 +97,7 @@ VictimScore = [0, 100, 200, 300, 400, 500, 600, 100, 200, 300, 400, 500, 600]
 MvvLvaScores = [[VictimScore[victim] + 6 - (VictimScore[attacker] // 100) for attacker in range(0, Pieces.bK + 1)] for victim in range(0, Pieces.bK + 1)]
 
 
-# basic evaluation values, like this says pawn on e5 is worth a 20 value than a pawn on a a5
+# basic evaluation values (middlegame), like this says pawn on e5 is worth a 20 value than a pawn on a a5
 # After the computer plays many games, these values are adjusted based upon how well the pieces actually preformed on the various squares.
 # Beginners are taught that the more centralized piece is better placed, and the computer is taught this basic rules via these tables.
 PawnTable = [
@@ -147,6 +147,103 @@ RookTable = [
 0	,	0	,	5	,	10	,	10	,	5	,	0	,	0		
 ]
 
+# queens, a little better in the center but not brought out too early
+QueenTable = [
+-10	,	-5	,	-5	,	0	,	0	,	-5	,	-5	,	-10	,
+-5	,	0	,	5	,	0	,	0	,	0	,	0	,	-5	,
+-5	,	5	,	5	,	5	,	5	,	5	,	0	,	-5	,
+0	,	0	,	5	,	5	,	5	,	5	,	0	,	0	,
+0	,	0	,	5	,	5	,	5	,	5	,	0	,	-5	,
+-5	,	0	,	5	,	5	,	5	,	5	,	0	,	-5	,
+-5	,	0	,	0	,	0	,	0	,	0	,	0	,	-5	,
+-10	,	-5	,	-5	,	0	,	0	,	-5	,	-5	,	-10	
+]
+
+# kings, in the middlegame the king hides behind its pawns on the back rank
+KingTable = [
+0	,	5	,	5	,	-10	,	-10	,	0	,	10	,	5	,
+-30	,	-30	,	-30	,	-30	,	-30	,	-30	,	-30	,	-30	,
+-50	,	-50	,	-50	,	-50	,	-50	,	-50	,	-50	,	-50	,
+-70	,	-70	,	-70	,	-70	,	-70	,	-70	,	-70	,	-70	,
+-70	,	-70	,	-70	,	-70	,	-70	,	-70	,	-70	,	-70	,
+-70	,	-70	,	-70	,	-70	,	-70	,	-70	,	-70	,	-70	,
+-70	,	-70	,	-70	,	-70	,	-70	,	-70	,	-70	,	-70	,
+-70	,	-70	,	-70	,	-70	,	-70	,	-70	,	-70	,	-70		
+]
+
+# endgame evaluation values, with few pieces left pawns are worth more the closer they are to promotion,
+# and the king becomes an active piece which belongs in the center
+PawnTableEg = [
+0	,	0	,	0	,	0	,	0	,	0	,	0	,	0	,
+5	,	5	,	5	,	5	,	5	,	5	,	5	,	5	,
+10	,	10	,	10	,	10	,	10	,	10	,	10	,	10	,
+15	,	15	,	15	,	20	,	20	,	15	,	15	,	15	,
+25	,	25	,	25	,	30	,	30	,	25	,	25	,	25	,
+40	,	40	,	40	,	45	,	45	,	40	,	40	,	40	,
+60	,	60	,	60	,	60	,	60	,	60	,	60	,	60	,
+0	,	0	,	0	,	0	,	0	,	0	,	0	,	0	
+]
+
+KnightTableEg = [
+-20	,	-10	,	-5	,	-5	,	-5	,	-5	,	-10	,	-20	,
+-10	,	0	,	0	,	5	,	5	,	0	,	0	,	-10	,
+-5	,	0	,	10	,	10	,	10	,	10	,	0	,	-5	,
+-5	,	5	,	10	,	15	,	15	,	10	,	5	,	-5	,
+-5	,	5	,	10	,	15	,	15	,	10	,	5	,	-5	,
+-5	,	0	,	10	,	10	,	10	,	10	,	0	,	-5	,
+-10	,	0	,	0	,	5	,	5	,	0	,	0	,	-10	,
+-20	,	-10	,	-5	,	-5	,	-5	,	-5	,	-10	,	-20	
+]
+
+BishopTableEg = [
+-10	,	-5	,	-5	,	-5	,	-5	,	-5	,	-5	,	-10	,
+-5	,	0	,	0	,	5	,	5	,	0	,	0	,	-5	,
+-5	,	0	,	10	,	10	,	10	,	10	,	0	,	-5	,
+-5	,	5	,	10	,	15	,	15	,	10	,	5	,	-5	,
+-5	,	5	,	10	,	15	,	15	,	10	,	5	,	-5	,
+-5	,	0	,	10	,	10	,	10	,	10	,	0	,	-5	,
+-5	,	0	,	0	,	5	,	5	,	0	,	0	,	-5	,
+-10	,	-5	,	-5	,	-5	,	-5	,	-5	,	-5	,	-10	
+]
+
+RookTableEg = [
+0	,	0	,	0	,	0	,	0	,	0	,	0	,	0	,
+0	,	0	,	0	,	0	,	0	,	0	,	0	,	0	,
+0	,	0	,	0	,	0	,	0	,	0	,	0	,	0	,
+0	,	0	,	0	,	0	,	0	,	0	,	0	,	0	,
+5	,	5	,	5	,	5	,	5	,	5	,	5	,	5	,
+5	,	5	,	5	,	5	,	5	,	5	,	5	,	5	,
+15	,	15	,	15	,	15	,	15	,	15	,	15	,	15	,
+5	,	5	,	5	,	5	,	5	,	5	,	5	,	5	
+]
+
+QueenTableEg = [
+-20	,	-10	,	-10	,	-5	,	-5	,	-10	,	-10	,	-20	,
+-10	,	0	,	0	,	0	,	0	,	0	,	0	,	-10	,
+-10	,	0	,	5	,	5	,	5	,	5	,	0	,	-10	,
+-5	,	0	,	5	,	10	,	10	,	5	,	0	,	-5	,
+-5	,	0	,	5	,	10	,	10	,	5	,	0	,	-5	,
+-10	,	0	,	5	,	5	,	5	,	5	,	0	,	-10	,
+-10	,	0	,	0	,	0	,	0	,	0	,	0	,	-10	,
+-20	,	-10	,	-10	,	-5	,	-5	,	-10	,	-10	,	-20	
+]
+
+KingTableEg = [
+-50	,	-10	,	0	,	0	,	0	,	0	,	-10	,	-50	,
+-10	,	0	,	10	,	10	,	10	,	10	,	0	,	-10	,
+0	,	10	,	20	,	20	,	20	,	20	,	10	,	0	,
+0	,	10	,	20	,	40	,	40	,	20	,	10	,	0	,
+0	,	10	,	20	,	40	,	40	,	20	,	10	,	0	,
+0	,	10	,	20	,	20	,	20	,	20	,	10	,	0	,
+-10	,	0	,	10	,	10	,	10	,	10	,	0	,	-10	,
+-50	,	-10	,	0	,	0	,	0	,	0	,	-10	,	-50	
+]
+
+# game phase, every knight and bishop counts 1, every rook 2 and every queen 4, all of them together are `MAX_PHASE`.
+# the evaluation blends the middlegame and endgame scores by the phase, from the middlegame (`MAX_PHASE`) to a bare endgame (0)
+PiecePhase = [0, 0, 1, 1, 2, 4, 0, 0, 1, 1, 2, 4, 0]
+MAX_PHASE = 24
+
 # the mirror array is used to get the squares for black
 # for example, if we dealing with a2 than equivalent for black is a7 which is index 48
 Mirror64 = [
@@ -159,3 +256,36 @@ Mirror64 = [
 8	,	9	,	10	,	11	,	12	,	13	,	14	,	15	,
 0	,	1	,	2	,	3	,	4	,	5	,	6	,	7
 ]
+
+# middlegame and endgame piece-square value of every piece on every 120 based square, from the point of view of the piece's own colour (black squares are mirrored),
+# filled by `InitPceSqTable()` so the board can keep running piece-square totals without looking up `Mirror64` on every move
+PceSqTableMg = [[0] * BRD_SQ_NUM for _ in range(13)]
+PceSqTableEg = [[0] * BRD_SQ_NUM for _ in range(13)]
+
+# precomputed attack bitboards indexed by the 64 based square (`Sq120ToSq64`), filled by `InitAttackTables()`
+KnightAttacks = [0] * 64 # squares a knight attacks from a square
+KingAttacks = [0] * 64 # squares a king attacks from a square
+PawnAttacks = [[0] * 64 for _ in range(2)] # PawnAttacks[colour][sq64], squares a pawn of that colour attacks from a square
+
+# sliding attacks, filled by `slideattacks.InitSlideAttacks()`
+# RookAttacks[sq64][occupancy & RookMasks[sq64]] are the squares a rook on the square attacks with those pieces on the board
+RookMasks = [0] * 64 # squares whose occupancy changes the attacks of a rook on a square (the board edges never block)
+BishopMasks = [0] * 64 # same for the bishop
+RookAttacks = [{} for _ in range(64)]
+BishopAttacks = [{} for _ in range(64)]
+LineMasks = [{} for _ in range(64)] # LineMasks[sq64][abs(dir)], squares on the line through a square along a direction, where a piece pinned along it can move
+
+# pawn structure masks indexed by the 64 based square, filled by `InitPawnMasks()`
+FileMasks = [0] * 8 # all the squares of a file
+IsolatedMasks = [0] * 64 # the files next to a square, a pawn without own pawns there is isolated
+PassedMasks = [[0] * 64 for _ in range(2)] # PassedMasks[colour][sq64], squares in front of a pawn on its own and the next files, a pawn without enemy pawns there is passed
+SupportMasks = [[0] * 64 for _ in range(2)] # SupportMasks[colour][sq64], squares on the next files level with or behind a pawn, where own pawns can still defend it
+ShieldMasks = [[0] * 64 for _ in range(2)] # ShieldMasks[colour][sq64], the 3 squares right in front of a king, the squares 2 ranks in front are the mask shifted once more
+
+# pawn structure scores (middlegame, endgame), from the point of view of the pawn's own colour
+PassedPawnMg = [0, 5, 10, 15, 25, 40, 60, 0] # indexed by the rank of the pawn as seen from its own side
+PassedPawnEg = [0, 10, 20, 35, 60, 90, 130, 0]
+IsolatedPawnMg, IsolatedPawnEg = -10, -15
+DoubledPawnMg, DoubledPawnEg = -10, -20 # for every pawn with an own pawn in front of it on the file
+BackwardPawnMg, BackwardPawnEg = -8, -10 # can't be defended by own pawns anymore and its stop square is attacked by an enemy pawn
+PawnShieldMg = [10, 5] # middlegame only, for every own pawn 1 and 2 ranks in front of the king
@@ -1,95 +1,88 @@
+from random import Random
 from pychess_engine.constants import BRD_SQ_NUM, Pieces, Colors, Squares
 from pychess_engine.debug import _assert_condition
 from pychess_engine.helper import RAND_64
 
-class PositionKey:
-    
+ZOBRIST_SEED = 0x5EED1E55 # default seed, every process (and every run) gets the same keys
+
+# Zobrist keys, the position key is a plain int XORed with these tables in place by the board.
+# PieceKeys is flat, the key of a piece on a square is PieceKeys[piece * BRD_SQ_NUM + square],
+# the keys of the EMPTY piece (the first BRD_SQ_NUM entries) hash the en passant square.
+PieceKeys = []
+SideKey = 0
+CastleKeys = []
+Seed = ZOBRIST_SEED # seed the current tables were generated from
+
+def init_hash_keys(seed: int = ZOBRIST_SEED) -> None:
     """
-    Represents a unique key for a chessboard position, generated by hashing pieces, castling rights,
-    side to move, and en passant square. Utilizes `Zobrist hashing` to ensure efficient position lookup
-    for tasks like move repetition detection.
+    Generates the key tables from a seed. The same seed always gives the same keys, so the
+    position keys of separate processes and runs match, what sharing a transposition table
+    between processes or storing keys on disk relies on. Positions loaded before re-seeding
+    have stale keys and need to be loaded again.
 
-    class variables:
-        PieceKeys (list): Precomputed random values for pieces on each square.
-        SideKey (int): Random value representing the side to move.
-        CastleKeys (list): Random values representing castling rights.
-        
-    Attributes:
-        key (int): Unique 64-bit HashKey
+    Args:
+        seed (int, optional): Seed of the generator, `ZOBRIST_SEED` by default.
+    """
+    global PieceKeys, SideKey, CastleKeys, Seed
+    rng = Random(seed) # own generator, the module level one of `random` is left alone
+    PieceKeys = [RAND_64(rng) for _ in range(13 * BRD_SQ_NUM)]
+    SideKey = RAND_64(rng)
+    CastleKeys = [RAND_64(rng) for _ in range(16)]
+    Seed = seed
 
-    Methods:
-        _hash_piece(piece, square):
-            Updates the position key by XORing the hash for a piece on a given square.
+init_hash_keys()
 
-        _hash_castle(castlePerm):
-            Updates the position key by XORing the hash for the current castling rights.
+def generate_pos_key(board) -> int:
+    """
+    Generate a unique position key for the given board configuration.
 
-        _hash_side():
-            Updates the position key by XORing the hash for the side to move.
+    This function computes a hash key for the current board state, encoding
+    information about piece positions, castling rights, en passant square, and 
+    side to move. The key is used to uniquely represent the board state for
+    repetition and position checks in the game, the board keeps it up to date
+    incrementally after that.
 
-        _hash_enPas(enPas):
-            Updates the position key by XORing the hash for the en passant square.
+    Args:
+        board: An object representing the chess board with attributes:
 
-        _generate_key(board):
-            Generates the position key based on the board state, including pieces, side to move,
-            en passant square, and castling rights.
+    Returns:
+        int: The 64-bit position key.
     """
+    finalKey = 0
+    piece = Pieces.EMPTY
+    for sq in range(0, BRD_SQ_NUM):
+        piece = board.pieces[sq]
+        if(piece != Squares.OFFBOARD and piece != Pieces.EMPTY):
+            _assert_condition(piece >= Pieces.wP and piece <= Pieces.bK)
+            finalKey ^= PieceKeys[piece * BRD_SQ_NUM + sq]
     
-    PieceKeys = [[RAND_64() for _ in range(120)] for _ in range(13)]
-
-    SideKey = RAND_64()
-    CastleKeys = CastleKeys = [RAND_64() for _ in range(16)]
-
-    def __init__(self):
-        self.key = 0
-        
-    def copy(self):
-        new_key = PositionKey()  # Create a new instance
-        new_key.key = self.key   # Copy the internal state
-        return new_key
+    if(board.side == Colors.WHITE):
+        finalKey ^= SideKey
         
-    def _hash_piece(self, piece: int, square: int) -> None:
-        self.key ^= PositionKey.PieceKeys[piece][square]
+    if(board.enPas != Squares.NO_SQ):
+        _assert_condition(board.enPas >= 0 and board.enPas < BRD_SQ_NUM)
+        finalKey ^= PieceKeys[board.enPas]
         
-    def _hash_castle(self, castlePerm: int) -> None:
-        self.key ^= PositionKey.CastleKeys[castlePerm]
-        
-    def _hash_side(self) -> None:
-        self.key ^= PositionKey.SideKey
-        
-    def _hash_enPas(self, enPas: int) -> None:
-        self.key ^= PositionKey.PieceKeys[Pieces.EMPTY][enPas]
-        
-    def _generate_key(self, board) -> None:
-        """
-        Generate a unique position key for the given board configuration.
+    _assert_condition(board.castlePerm >= 0 and board.castlePerm <= 15)
+    finalKey ^= CastleKeys[board.castlePerm]
+    
+    return finalKey
 
-        This function computes a hash key for the current board state, encoding
-        information about piece positions, castling rights, en passant square, and 
-        side to move. The generated key is stored in the `self.key` attribute, which 
-        is used to uniquely represent the board state for repetition and position 
-        checks in the game.
+def generate_pawn_key(board) -> int:
+    """
+    Generate the pawn key of the given board, the Zobrist hash of its pawns only
+    (the same `PieceKeys` as the position key). The board keeps it up to date
+    incrementally, it indexes the pawn structure hash table.
 
-        Args:
-            board: An object representing the chess board with attributes:
+    Args:
+        board: An object representing the chess board.
 
-        """
-        finalKey = 0
-        piece = Pieces.EMPTY
-        for sq in range(0, BRD_SQ_NUM):
-            piece = board.pieces[sq]
-            if(piece != Squares.OFFBOARD and piece != Pieces.EMPTY):
-                _assert_condition(piece >= Pieces.wP and piece <= Pieces.bK)
-                finalKey ^= PositionKey.PieceKeys[piece][sq]
-        
-        if(board.side == Colors.WHITE):
-            finalKey ^= PositionKey.SideKey
-            
-        if(board.enPas != Squares.NO_SQ):
-            _assert_condition(board.enPas >= 0 and board.enPas < BRD_SQ_NUM)
-            finalKey ^= PositionKey.PieceKeys[Pieces.EMPTY][board.enPas]
-            
-        _assert_condition(board.castlePerm >= 0 and board.castlePerm <= 15)
-        finalKey ^= PositionKey.CastleKeys[board.castlePerm]
-        
-        self.key = finalKey
+    Returns:
+        int: The 64-bit pawn key, 0 without pawns on the board.
+    """
+    finalKey = 0
+    for sq in range(0, BRD_SQ_NUM):
+        piece = board.pieces[sq]
+        if(piece == Pieces.wP or piece == Pieces.bP):
+            finalKey ^= PieceKeys[piece * BRD_SQ_NUM + sq]
+    return finalKey
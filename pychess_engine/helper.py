@@ -1,15 +1,18 @@
 from random import getrandbits
 from pychess_engine.misc import GetTimeMs
 
-def RAND_64():
+def RAND_64(rng=None):
     """
     Generates a random 64-bit integer.
 
+    Args:
+        rng (random.Random, optional): Generator to draw from, for a reproducible sequence. The module level generator of `random` by default.
+
     Returns:
         int: A random 64-bit integer, typically used for hashing or 
              generating unique keys in chess board representations.
     """
-    return getrandbits(64)
+    return rng.getrandbits(64) if rng else getrandbits(64)
         
 # file rank to the square number (120 squares representation)
 def FR2SQ(f, r):
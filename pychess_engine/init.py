@@ -1,6 +1,11 @@
-from pychess_engine.constants import Ranks, Files
-from pychess_engine.globals import FilesBrd, RanksBrd, Sq64ToSq120, Sq120ToSq64, clearMask, setMask
+from pychess_engine.constants import Ranks, Files, Pieces, Colors, Squares
+from pychess_engine.globals import FilesBrd, RanksBrd, Sq64ToSq120, Sq120ToSq64, clearMask, setMask, Mirror64
+from pychess_engine.globals import PceSqTableMg, PceSqTableEg, PawnTable, KnightTable, BishopTable, RookTable, QueenTable, KingTable
+from pychess_engine.globals import PawnTableEg, KnightTableEg, BishopTableEg, RookTableEg, QueenTableEg, KingTableEg
+from pychess_engine.globals import PceDir, KnightAttacks, KingAttacks, PawnAttacks
+from pychess_engine.globals import FileMasks, IsolatedMasks, PassedMasks, SupportMasks, ShieldMasks
 from pychess_engine.helper import FR2SQ
+from pychess_engine.slideattacks import InitSlideAttacks
 
 def InitSq120To64AndSq64To120():
     sq = 0
@@ -26,8 +31,76 @@ def InitFilesRanksBrd():
             FilesBrd[sq] = file
             RanksBrd[sq] = rank     
 
+def InitPceSqTable():
+    tablesMg = {Pieces.wP: PawnTable, Pieces.wN: KnightTable, Pieces.wB: BishopTable, Pieces.wR: RookTable, Pieces.wQ: QueenTable, Pieces.wK: KingTable}
+    tablesEg = {Pieces.wP: PawnTableEg, Pieces.wN: KnightTableEg, Pieces.wB: BishopTableEg, Pieces.wR: RookTableEg, Pieces.wQ: QueenTableEg, Pieces.wK: KingTableEg}
+    for pceSqTable, tables in ((PceSqTableMg, tablesMg), (PceSqTableEg, tablesEg)):
+        for piece, table in tables.items():
+            for sq64 in range(0, 64):
+                pceSqTable[piece][Sq64ToSq120[sq64]] = table[sq64]
+                pceSqTable[piece + 6][Sq64ToSq120[sq64]] = table[Mirror64[sq64]] # same piece type for black is 6 pieces later
+            
+def InitAttackTables():
+    for sq64 in range(0, 64):
+        sq = Sq64ToSq120[sq64]
+        KnightAttacks[sq64] = 0
+        KingAttacks[sq64] = 0
+        PawnAttacks[Colors.WHITE][sq64] = 0
+        PawnAttacks[Colors.BLACK][sq64] = 0
+        # the mailbox offsets are used once here, FilesBrd tells if the target square is off the board
+        for dir in PceDir[Pieces.wN]:
+            if(FilesBrd[sq + dir] != Squares.OFFBOARD):
+                KnightAttacks[sq64] |= setMask[Sq120ToSq64[sq + dir]]
+        for dir in PceDir[Pieces.wK]:
+            if(FilesBrd[sq + dir] != Squares.OFFBOARD):
+                KingAttacks[sq64] |= setMask[Sq120ToSq64[sq + dir]]
+        for dir in (9, 11):
+            if(FilesBrd[sq + dir] != Squares.OFFBOARD):
+                PawnAttacks[Colors.WHITE][sq64] |= setMask[Sq120ToSq64[sq + dir]]
+            if(FilesBrd[sq - dir] != Squares.OFFBOARD):
+                PawnAttacks[Colors.BLACK][sq64] |= setMask[Sq120ToSq64[sq - dir]]
+
+def InitPawnMasks():
+    for file in range(Files.A, Files.H + 1):
+        FileMasks[file] = 0
+        for rank in range(Ranks.R1, Ranks.R8 + 1):
+            FileMasks[file] |= setMask[rank * 8 + file]
+    
+    for sq64 in range(0, 64):
+        file = sq64 % 8
+        rank = sq64 // 8
+        IsolatedMasks[sq64] = 0
+        for col in (Colors.WHITE, Colors.BLACK):
+            PassedMasks[col][sq64] = 0
+            SupportMasks[col][sq64] = 0
+            ShieldMasks[col][sq64] = 0
+        
+        for t_file in (file - 1, file, file + 1):
+            if(t_file < Files.A or t_file > Files.H):
+                continue
+            if(t_file != file):
+                IsolatedMasks[sq64] |= FileMasks[t_file]
+            for t_rank in range(Ranks.R1, Ranks.R8 + 1):
+                t_sq64 = t_rank * 8 + t_file
+                if(t_rank > rank):
+                    PassedMasks[Colors.WHITE][sq64] |= setMask[t_sq64]
+                elif(t_rank < rank):
+                    PassedMasks[Colors.BLACK][sq64] |= setMask[t_sq64]
+                if(t_file != file and t_rank <= rank):
+                    SupportMasks[Colors.WHITE][sq64] |= setMask[t_sq64]
+                if(t_file != file and t_rank >= rank):
+                    SupportMasks[Colors.BLACK][sq64] |= setMask[t_sq64]
+                if(t_rank == rank + 1):
+                    ShieldMasks[Colors.WHITE][sq64] |= setMask[t_sq64]
+                elif(t_rank == rank - 1):
+                    ShieldMasks[Colors.BLACK][sq64] |= setMask[t_sq64]
+
 def initialize():
     InitSq120To64AndSq64To120()
     InitBitMasks()
     InitFilesRanksBrd()
+    InitPceSqTable()
+    InitAttackTables()
+    InitPawnMasks()
+    InitSlideAttacks()
 
@@ -1,13 +1,183 @@
 from pychess_engine.globals import *
 from pychess_engine.debug import _assert_condition
 from pychess_engine.validate import SqOnBoard, PieceValid, PieceValidEmpty
-from pychess_engine.constants import Pieces, Ranks, Castling, Squares
-from pychess_engine.attack import is_sqaure_attacked
+from pychess_engine.constants import Pieces, Ranks, Castling, Squares, MAXPOSITIONMOVES
+from pychess_engine.attack import is_sqaure_attacked, get_pins_and_checkers, static_exchange
 from pychess_engine.helper import FR2SQ
+from pychess_engine.bitboards import PopBit
 
 def SQOFFBOARD(sq):
     return FilesBrd[sq] == Squares.OFFBOARD
 
+NOMOVE = 0
+
+# a move is a plain int holding the following information in 25 bits
+# FROM (square)(21 - 98)  - 7 bits
+# TO (square) - 7 bits
+# Captured Piece (0 - 12) - 4 bits
+# EnPas Capture? (0 - 1) - 1 bit
+# Pawn Start ? (0 - 1) - 1 bit
+# Promoted Piece (0 - 12) - 4 bits
+# castle move? (0 - 1) - 1 bit
+def FROMSQ(move: int) -> int:
+    return move & 0x7F
+
+def TOSQ(move: int) -> int:
+    return (move >> 7) & 0x7F
+
+def CAPTURED(move: int) -> int:
+    return (move >> 14) & 0xF
+
+def PROMOTED(move: int) -> int:
+    return (move >> 20) & 0xF
+
+def alpha_move(move: int) -> str:
+    """
+    Converts an encoded move into its algebraic notation (e.g. `e2e4`, `e7e8q`).
+
+    Args:
+        move (int): The encoded move.
+
+    Returns:
+        str: A string representing the move in algebraic notation.
+    """
+    ff = FilesBrd[move & 0x7F] # file from 
+    rf = RanksBrd[move & 0x7F] # rank from 
+    ft = FilesBrd[(move >> 7) & 0x7F] # file TO
+    rt = RanksBrd[(move >> 7) & 0x7F] # rank TO
+    
+    promoted = (move >> 20) & 0xF # promoted piece value
+    
+    if(promoted):
+        pchar = 'q'
+        if(PieceKnight[promoted]): # if promoted piece was a knight
+            pchar = 'n'
+        elif(PieceRookQueen[promoted] and not PieceBishopQueen[promoted]):
+            pchar = 'r'
+        elif(not PieceRookQueen[promoted] and PieceBishopQueen[promoted]):
+            pchar = 'b'
+        return "{}{}{}{}{}".format(chr(ord('a') + ff), chr(ord('1') + rf), chr(ord('a') + ft), chr(ord('1') + rt), pchar)
+    return "{}{}{}{}".format(chr(ord('a') + ff), chr(ord('1') + rf), chr(ord('a') + ft), chr(ord('1') + rt))
+
+def move_exists(board, move: int) -> bool:
+    """
+    Checks if a move is legal on the given board.
+
+    The move is checked against the board with `is_pseudo_legal`, then made and taken back once
+    to see that it doesn't leave the king in check, no move list is generated.
+
+    Args:
+        board(Board): The current board state on which to check if the move exists.
+        move (int): The encoded move.
+
+    Returns:
+        bool: True if the move is legal, False otherwise.
+    """
+    if(not is_pseudo_legal(board, move)):
+        return False
+    if(not board.make_move(move)):
+        return False
+    board.take_move()
+    return True
+
+def is_pseudo_legal(board, move: int) -> bool:
+    """
+    Checks a move (e.g. from the transposition table, the PV or the killers) against the board directly,
+    without generating moves: the piece on the from square, the captured piece, the flags, the path of
+    sliders and pawns, and for castling the rights, the empty squares and the attacked squares.
+    A move passing the check is one the move generator would generate for this position,
+    it may still leave the own king in check, which `Board.make_move` finds out.
+
+    Args:
+        board (Board): The current state of the chess board.
+        move (int): The encoded move.
+
+    Returns:
+        bool: True if the move is pseudo legal in the position, False otherwise.
+    """
+    if(move <= NOMOVE or move >> 25): # more than the 25 bits of a move
+        return False
+    
+    side = board.side
+    fromSq = move & 0x7F
+    toSq = (move >> 7) & 0x7F
+    if(fromSq > Squares.H8 or toSq > Squares.H8 or FilesBrd[fromSq] == Squares.OFFBOARD or FilesBrd[toSq] == Squares.OFFBOARD):
+        return False
+    pce = board.pieces[fromSq]
+    if(pce == Pieces.EMPTY or PieceCol[pce] != side):
+        return False
+    
+    captured = (move >> 14) & 0xF
+    promoted = (move >> 20) & 0xF
+    target = board.pieces[toSq]
+    if(move & MOVE.FLAG_EP):
+        return (PiecePawn[pce] and toSq == board.enPas and captured == Pieces.EMPTY and not (move & (MOVE.FLAG_PS | MOVE.FLAG_CA | MOVE.FLAG_PROM))
+                and toSq - fromSq in ((9, 11) if side == Colors.WHITE else (-9, -11)))
+    if(captured > Pieces.bK or target != captured or PieceKing[captured]): # the target square must hold exactly the captured piece
+        return False
+    if(captured != Pieces.EMPTY and PieceCol[captured] == side):
+        return False
+    
+    if(move & MOVE.FLAG_CA):
+        if(move & (MOVE.FLAG_PS | MOVE.FLAG_PROM) or captured != Pieces.EMPTY or not PieceKing[pce]):
+            return False
+        # the rook squares, the squares which have to be empty and the squares the king must not be attacked on
+        if(side == Colors.WHITE):
+            castles = {Squares.G1: (Castling.WKCA, (Squares.F1, Squares.G1), (Squares.E1, Squares.F1)),
+                       Squares.C1: (Castling.WQCA, (Squares.D1, Squares.C1, Squares.B1), (Squares.E1, Squares.D1))}
+            if(fromSq != Squares.E1):
+                return False
+        else:
+            castles = {Squares.G8: (Castling.BKCA, (Squares.F8, Squares.G8), (Squares.E8, Squares.F8)),
+                       Squares.C8: (Castling.BQCA, (Squares.D8, Squares.C8, Squares.B8), (Squares.E8, Squares.D8))}
+            if(fromSq != Squares.E8):
+                return False
+        if(toSq not in castles):
+            return False
+        perm, emptySquares, safeSquares = castles[toSq]
+        if(not board.castlePerm & perm):
+            return False
+        if(any(board.pieces[sq] != Pieces.EMPTY for sq in emptySquares)):
+            return False
+        return not any(is_sqaure_attacked(sq, side ^ 1, board) for sq in safeSquares)
+    
+    if(PiecePawn[pce]):
+        forward = 10 if side == Colors.WHITE else -10
+        lastRank = Ranks.R8 if side == Colors.WHITE else Ranks.R1
+        # a pawn reaching the last rank has to promote, to a piece of its own colour which isn't a pawn or a king
+        if(RanksBrd[toSq] == lastRank):
+            if(promoted == Pieces.EMPTY or promoted > Pieces.bK or PieceCol[promoted] != side or PiecePawn[promoted] or PieceKing[promoted]):
+                return False
+        elif(promoted != Pieces.EMPTY):
+            return False
+        
+        if(move & MOVE.FLAG_PS):
+            startRank = Ranks.R2 if side == Colors.WHITE else Ranks.R7
+            return (RanksBrd[fromSq] == startRank and toSq == fromSq + 2 * forward
+                    and board.pieces[fromSq + forward] == Pieces.EMPTY and target == Pieces.EMPTY)
+        if(captured != Pieces.EMPTY):
+            return toSq == fromSq + forward - 1 or toSq == fromSq + forward + 1
+        return toSq == fromSq + forward
+    
+    if(move & (MOVE.FLAG_PS | MOVE.FLAG_PROM)): # only pawns start or promote
+        return False
+    
+    to64 = Sq120ToSq64[toSq]
+    from64 = Sq120ToSq64[fromSq]
+    if(PieceKnight[pce]):
+        return bool(KnightAttacks[from64] & setMask[to64])
+    if(PieceKing[pce]):
+        return bool(KingAttacks[from64] & setMask[to64])
+    
+    # sliders, the target has to be on one of its lines with the squares in between empty
+    occupancy = board.colourBB[Colors.BOTH]
+    attacks = 0
+    if(PieceBishopQueen[pce]):
+        attacks |= BishopAttacks[from64][occupancy & BishopMasks[from64]]
+    if(PieceRookQueen[pce]):
+        attacks |= RookAttacks[from64][occupancy & RookMasks[from64]]
+    return bool(attacks & setMask[to64])
+
 class MOVE:
     """
     Represents a chess move with encoded properties like source square, destination square, captured piece, promotion,
@@ -31,7 +201,7 @@ class MOVE:
         CAPTURED(): Extracts and returns the captured piece code, if any.
         PROMOTED(): Extracts and returns the promotion piece code, if any.
         alpha_move() -> str: Converts the move to an algebraic notation string.
-        move_exists(board) -> bool: Checks if the move exists on a given board by generating possible moves.
+        move_exists(board) -> bool: Checks if the move is legal on a given board, without generating moves.
         parse_move(alpha_move: str, board) -> MOVE: Parses a move in algebraic notation to retrieve a matching MOVE instance.
     """
     NOMOVE = None
@@ -56,6 +226,21 @@ class MOVE:
         
     def __str__(self):
         return self.alpha_move()
+    
+    @staticmethod
+    def from_int(move: int):
+        """
+        Wraps an encoded move number into a MOVE object.
+
+        Args:
+            move (int): The encoded move.
+
+        Returns:
+            MOVE: A MOVE object holding the given move.
+        """
+        move_obj = MOVE()
+        move_obj.move = move
+        return move_obj
         
     def FROMSQ(self) -> int:
         """
@@ -64,7 +249,7 @@ class MOVE:
         Returns:
             int: The 7-bit integer representing the source square of the move.
         """
-        return self.move & 0x7F #extracting the last 7 bits from the move number
+        return FROMSQ(self.move)
     
     def TOSQ(self) -> int:
         """
@@ -73,7 +258,7 @@ class MOVE:
         Returns:
             int: The 7-bit integer representing the destination square of the move.
         """
-        return (self.move >> 7) & 0x7F # first right shift the bits to 7 and then extract the last 7 bits which represents now TO Square
+        return TOSQ(self.move)
     
     def CAPTURED(self) -> int:
         """
@@ -82,7 +267,7 @@ class MOVE:
         Returns:
             int: A 4-bit integer indicating the type of captured piece, or 0 if none.
         """    
-        return (self.move >> 14) & 0xF
+        return CAPTURED(self.move)
     
     def PROMOTED(self) -> int:
         """
@@ -91,7 +276,7 @@ class MOVE:
         Returns:
             int: A 4-bit integer representing the type of promoted piece, or 0 if no promotion occurred.
         """
-        return (self.move >> 20) & 0xF
+        return PROMOTED(self.move)
     
     def alpha_move(self) -> str:
         """
@@ -102,52 +287,19 @@ class MOVE:
         Returns:
             str: A string representing the move in standard algebraic notation.
         """
-        ff = FilesBrd[self.FROMSQ()] # file from 
-        rf = RanksBrd[self.FROMSQ()] # rank from 
-        ft = FilesBrd[self.TOSQ()] # file TO
-        rt = RanksBrd[self.TOSQ()] # rank TO
-        
-        promoted = self.PROMOTED() # promoted piece value
-        
-        if(promoted):
-            pchar = 'q'
-            if(PieceKnight[promoted]): # if promoted piece was a knight
-                pchar = 'n'
-            elif(PieceRookQueen[promoted] and not PieceBishopQueen[promoted]):
-                pchar = 'r'
-            elif(not PieceRookQueen[promoted] and PieceBishopQueen[promoted]):
-                pchar = 'b'
-            MvStr = "{}{}{}{}{}".format(chr(ord('a') + ff), chr(ord('1') + rf), chr(ord('a') + ft), chr(ord('1') + rt), pchar)
-        else:
-            MvStr = "{}{}{}{}".format(chr(ord('a') + ff), chr(ord('1') + rf), chr(ord('a') + ft), chr(ord('1') + rt))
-            
-        return MvStr
+        return alpha_move(self.move)
     
     def move_exists(self, board) -> bool:
         """
-        Checks if a move exists in the list of all generated moves for the given board.
-
-        This method generates all possible moves for the current board state and checks if
-        the move represented by this instance exists in that list.
+        Checks if the move represented by this instance is legal on the given board (see the module level `move_exists`).
 
         Args:
             board(Board): The current board state on which to check if the move exists.
 
         Returns:
-            bool: True if the move exists in the list of possible moves, False otherwise.
+            bool: True if the move is legal, False otherwise.
         """
-        mlist = MOVELIST()
-        mlist.generate_all_moves(board)
-        
-        for MoveNum in range(0, mlist.count):
-            if(not board.make_move(mlist.moves[MoveNum]) ):
-                continue
-            
-            board.take_move()
-            if(mlist.moves[MoveNum].move == self.move):
-                return True
-        
-        return False
+        return move_exists(board, self.move)
     
     @staticmethod
     def parse_move(alpha_move: str, board): 
@@ -159,7 +311,7 @@ class MOVE:
             board (Board): The current board state.
         
         Returns:
-            MOVE: The corresponding move object, or MOVE.NOMOVE if the move is invalid or not found.
+            MOVE: The corresponding move object, or MOVE.NOMOVE if the move is illegal or not found.
         """
         _assert_condition(board._check_board())
         
@@ -176,26 +328,26 @@ class MOVE:
         toSq = FR2SQ(ord(alpha_move[2]) - ord('a'), ord(alpha_move[3]) - ord('1'))
         
         _assert_condition(SqOnBoard(fromSq) and SqOnBoard(toSq))
-        list = MOVELIST()
-        list.generate_all_moves(board)
-        Move = MOVE.NOMOVE
+        mlist = MOVELIST()
+        mlist.generate_legal_moves(board)
+        Move = NOMOVE
         PromPce = Pieces.EMPTY
         
-        for MoveNum in range(0, list.count): # traversing the move list
-            Move = list.moves[MoveNum] # getting the move of MOVE()
-            if(Move.FROMSQ() == fromSq and Move.TOSQ() == toSq): # if both the to and from sqaures are same, then move is also same, provided promoted piece can be different
-                PromPce = Move.PROMOTED()
+        for MoveNum in range(0, mlist.count): # traversing the move list
+            Move = mlist.moves[MoveNum] # getting the encoded move
+            if(FROMSQ(Move) == fromSq and TOSQ(Move) == toSq): # if both the to and from sqaures are same, then move is also same, provided promoted piece can be different
+                PromPce = PROMOTED(Move)
                 if(PromPce != Pieces.EMPTY): # if there is a promotion, we need to check
                     if(PieceRookQueen[PromPce] and not PieceBishopQueen[PromPce] and alpha_move[4] == 'r'): # promoted piece is a rook
-                        return Move
+                        return MOVE.from_int(Move)
                     elif(not PieceRookQueen[PromPce] and PieceBishopQueen[PromPce] and alpha_move[4] == 'b'): # promoted piece is bishop
-                        return Move
+                        return MOVE.from_int(Move)
                     elif(PieceBishopQueen[PromPce] and PieceRookQueen[PromPce] and alpha_move[4] == 'q'): #is a queen
-                        return Move
+                        return MOVE.from_int(Move)
                     elif(PieceKnight[PromPce] and alpha_move[4] == 'n'): 
-                        return Move
+                        return MOVE.from_int(Move)
                     continue
-                return Move # else , if there was no promotion, then indeed move has matched, 
+                return MOVE.from_int(Move) # else , if there was no promotion, then indeed move has matched, 
         
         return MOVE.NOMOVE # if we didn't found the move in movelist
     
@@ -203,122 +355,206 @@ MOVE.NOMOVE = MOVE()
     
 class MOVELIST:
     """
-    A class representing a list of chess moves. This class stores a collection of MOVE objects and keeps track of the 
-    total number of moves in the list.
+    A class representing a list of chess moves. Moves are stored as encoded ints in two preallocated
+    parallel arrays (move codes and their ordering scores), so generating moves allocates no objects.
+    The board keeps one MOVELIST per ply (`Board.moveLists`) which the search and perft reuse.
 
     Attributes:
-        moves (list): A list of MOVE objects, initialized with a maximum capacity of 256.
+        moves (list): Encoded moves (int), with a maximum capacity of `MAXPOSITIONMOVES`.
+        scores (list): Move ordering score of the move at the same index.
         count (int): The total number of moves currently in the list.
 
     """
     def __init__(self):
-        self.moves = [MOVE() for _ in range(256)]
+        self.moves = [NOMOVE] * MAXPOSITIONMOVES
+        self.scores = [0] * MAXPOSITIONMOVES
         self.count = 0
         
-    def _add_quite_move(self, board, move: MOVE) -> None:
+    def _add_quite_move(self, board, move: int) -> None:
         """
         Adds a quite move (non-capture) to the move list with an associated score, considering killer and history heuristics.
         
         Args:
             board (Board): The current state of the chess board.
-            move (MOVE): The move object to be added to the move list.
+            move (int): The encoded move to be added to the move list.
         """
-        _assert_condition(SqOnBoard(move.FROMSQ()))
-        _assert_condition(SqOnBoard(move.TOSQ()))
+        _assert_condition(SqOnBoard(FROMSQ(move)))
+        _assert_condition(SqOnBoard(TOSQ(move)))
         self.moves[self.count] = move
-        self.moves[self.count].score = 0
-        if(board.searchKillers[0][board.ply].move == move.move):
-            self.moves[self.count].score = 900000
-        elif (board.searchKillers[1][board.ply].move == move.move):
-            self.moves[self.count].score = 800000
+        if(board.searchKillers[0][board.ply] == move):
+            self.scores[self.count] = 900000
+        elif (board.searchKillers[1][board.ply] == move):
+            self.scores[self.count] = 800000
         else:
-            self.moves[self.count].score = board.searchHistory[board.pieces[move.FROMSQ()]][move.TOSQ()].score
+            self.scores[self.count] = board.searchHistory[board.pieces[move & 0x7F]][(move >> 7) & 0x7F]
         self.count += 1
         
-    def _add_capture_move(self, board, move: MOVE) -> None:
+    def _add_capture_move(self, board, move: int) -> None:
         """
         Adds a capture move to the move list, with a score based on the captured and attacking pieces.
 
         Args:
             board(Board): The current state of the chess board.
-            move (MOVE): The capture move to be added to the move list.
+            move (int): The encoded capture move to be added to the move list.
         """
-        _assert_condition(SqOnBoard(move.FROMSQ()))
-        _assert_condition(SqOnBoard(move.TOSQ()))
-        _assert_condition(PieceValid(move.CAPTURED()))
+        _assert_condition(SqOnBoard(FROMSQ(move)))
+        _assert_condition(SqOnBoard(TOSQ(move)))
+        _assert_condition(PieceValid(CAPTURED(move)))
         self.moves[self.count] = move
-        self.moves[self.count].score = MvvLvaScores[move.CAPTURED()][board.pieces[move.FROMSQ()]] + 1000000 # victim , attacker
+        self.scores[self.count] = MvvLvaScores[(move >> 14) & 0xF][board.pieces[move & 0x7F]] + 1000000 # victim , attacker
         self.count += 1
         
-    def _add_enpas_move(self, board, move: MOVE) -> None:
+    def _add_enpas_move(self, board, move: int) -> None:
         """
         Adds an en passant move to the move list with a predefined score.
 
         Args:
             board (Board): The current state of the chess board.
-            move (MOVE): The en passant move to be added to the move list.
+            move (int): The encoded en passant move to be added to the move list.
         """
-        _assert_condition(SqOnBoard(move.FROMSQ()))
-        _assert_condition(SqOnBoard(move.TOSQ()))
+        _assert_condition(SqOnBoard(FROMSQ(move)))
+        _assert_condition(SqOnBoard(TOSQ(move)))
         self.moves[self.count] = move
-        self.moves[self.count].score = 105 + 1000000 # pawn takes pawn
+        self.scores[self.count] = 105 + 1000000 # pawn takes pawn
         self.count += 1
         
+    def _add_piece_move(self, board, move: int) -> None:
+        """
+        Adds a non-pawn move to the move list, as a capture move if it captures a piece and as a quiet move otherwise.
+
+        Args:
+            board (Board): The current state of the chess board.
+            move (int): The encoded move to be added to the move list.
+        """
+        if(move & MOVE.FLAG_CAP):
+            self._add_capture_move(board, move)
+        else:
+            self._add_quite_move(board, move)
+        
     def _add_white_pawn_cap_move(self, board, from_square: int, to_square: int, cap: int) -> None:
         _assert_condition(SqOnBoard(from_square))
         _assert_condition(SqOnBoard(to_square))
         _assert_condition(PieceValidEmpty(cap))
         
+        move = from_square | (to_square << 7) | (cap << 14)
         if(RanksBrd[from_square] == Ranks.R7): # if a white pawn captures something from rank 7, then it is promotion move
-            self._add_capture_move(board, MOVE(from_square, to_square,cap,Pieces.wQ, 0)) # promoted to white Queen
-            self._add_capture_move(board, MOVE(from_square, to_square,cap,Pieces.wR, 0)) # promoted to white Rook
-            self._add_capture_move(board, MOVE(from_square, to_square,cap,Pieces.wB, 0)) # promoted to white Bishop
-            self._add_capture_move(board, MOVE(from_square, to_square,cap,Pieces.wN, 0)) # promoted to white Knight
+            self._add_capture_move(board, move | (Pieces.wQ << 20)) # promoted to white Queen
+            self._add_capture_move(board, move | (Pieces.wR << 20)) # promoted to white Rook
+            self._add_capture_move(board, move | (Pieces.wB << 20)) # promoted to white Bishop
+            self._add_capture_move(board, move | (Pieces.wN << 20)) # promoted to white Knight
         else: # if it is not an promotion move
-            self._add_capture_move(board, MOVE(from_square, to_square, cap, Pieces.EMPTY, 0))
+            self._add_capture_move(board, move)
             
     def _add_white_pawn_move(self, board, from_square: int, to_square: int) -> None: # same as above, the difference is it doesn't capture any piece
         _assert_condition(SqOnBoard(from_square))
         _assert_condition(SqOnBoard(to_square))
+        
+        move = from_square | (to_square << 7)
         if(RanksBrd[from_square] == Ranks.R7): # if a white pawn captures something from rank 7, then it is promotion move
-            self._add_quite_move(board, MOVE(from_square, to_square,Pieces.EMPTY,Pieces.wQ, 0)) # promoted to white Queen
-            self._add_quite_move(board, MOVE(from_square, to_square,Pieces.EMPTY,Pieces.wR, 0)) # promoted to white Rook
-            self._add_quite_move(board, MOVE(from_square, to_square,Pieces.EMPTY,Pieces.wB, 0)) # promoted to white Bishop
-            self._add_quite_move(board, MOVE(from_square, to_square,Pieces.EMPTY,Pieces.wN, 0)) # promoted to white Knight
+            self._add_quite_move(board, move | (Pieces.wQ << 20)) # promoted to white Queen
+            self._add_quite_move(board, move | (Pieces.wR << 20)) # promoted to white Rook
+            self._add_quite_move(board, move | (Pieces.wB << 20)) # promoted to white Bishop
+            self._add_quite_move(board, move | (Pieces.wN << 20)) # promoted to white Knight
         else: # if it is not an promotion move
-            self._add_quite_move(board, MOVE(from_square, to_square, Pieces.EMPTY, Pieces.EMPTY, 0))
+            self._add_quite_move(board, move)
             
     def _add_black_pawn_cap_move(self, board, from_square: int, to_square: int, cap: int) -> None:
         _assert_condition(SqOnBoard(from_square))
         _assert_condition(SqOnBoard(to_square))
         _assert_condition(PieceValidEmpty(cap))
+        
+        move = from_square | (to_square << 7) | (cap << 14)
         if(RanksBrd[from_square] == Ranks.R2): # if a black pawn captures something from rank 2, then it is promotion move
-            self._add_capture_move(board, MOVE(from_square, to_square,cap,Pieces.bQ, 0)) # promoted to black Queen
-            self._add_capture_move(board, MOVE(from_square, to_square,cap,Pieces.bR, 0)) # promoted to black Rook
-            self._add_capture_move(board, MOVE(from_square, to_square,cap,Pieces.bB, 0)) # promoted to black Bishop
-            self._add_capture_move(board, MOVE(from_square, to_square,cap,Pieces.bN, 0)) # promoted to black Knight
+            self._add_capture_move(board, move | (Pieces.bQ << 20)) # promoted to black Queen
+            self._add_capture_move(board, move | (Pieces.bR << 20)) # promoted to black Rook
+            self._add_capture_move(board, move | (Pieces.bB << 20)) # promoted to black Bishop
+            self._add_capture_move(board, move | (Pieces.bN << 20)) # promoted to black Knight
         else: # if it is not an promotion move
-            self._add_capture_move(board, MOVE(from_square, to_square, cap, Pieces.EMPTY, 0))
+            self._add_capture_move(board, move)
             
     def _add_black_pawn_move(self, board, from_square: int, to_square: int) -> None:
         _assert_condition(SqOnBoard(from_square))
         _assert_condition(SqOnBoard(to_square))
+        
+        move = from_square | (to_square << 7)
         if(RanksBrd[from_square] == Ranks.R2): # if a Black pawn captures something from rank 2, then it is promotion move
-            self._add_quite_move(board, MOVE(from_square, to_square,Pieces.EMPTY,Pieces.bQ, 0)) # promoted to Black Queen
-            self._add_quite_move(board, MOVE(from_square, to_square,Pieces.EMPTY,Pieces.bR, 0)) # promoted to Black Rook
-            self._add_quite_move(board, MOVE(from_square, to_square,Pieces.EMPTY,Pieces.bB, 0)) # promoted to Black Bishop
-            self._add_quite_move(board, MOVE(from_square, to_square,Pieces.EMPTY,Pieces.bN, 0)) # promoted to Black Knight
+            self._add_quite_move(board, move | (Pieces.bQ << 20)) # promoted to Black Queen
+            self._add_quite_move(board, move | (Pieces.bR << 20)) # promoted to Black Rook
+            self._add_quite_move(board, move | (Pieces.bB << 20)) # promoted to Black Bishop
+            self._add_quite_move(board, move | (Pieces.bN << 20)) # promoted to Black Knight
         else: # if it is not an promotion move
-            self._add_quite_move(board, MOVE(from_square, to_square, Pieces.EMPTY, Pieces.EMPTY, 0))
+            self._add_quite_move(board, move)
         
     def generate_all_moves(self, board) -> None:
         """
-        Generates a list of all legal moves for the current side in a given board state.
+        Generates a list of all pseudo-legal moves for the current side in a given board state.
         
         This method processes the position based on the current side (White or Black) and adds all 
-        possible legal moves to a move list, taking into account piece types and board conditions. 
+        possible moves to a move list, taking into account piece types and board conditions. 
+        Moves leaving the own king in check are included, `Board.make_move` rejects them.
+    
+        """
+        self._generate_moves(board, captures=True, quiets=True)
+        
+    def generate_legal_moves(self, board) -> None:
+        """
+        Generates a list of all legal moves for the current side in a given board state. Pinned pieces
+        and checkers are found once, so no move leaves the own king in check and the moves can be
+        made with `Board.make_move(move, legal=True)`, skipping its check test.
+    
+        """
+        self._generate_moves(board, captures=True, quiets=True, legal=True)
+            
+    def _generate_capture_moves(self, board, legal: bool = False, pins: tuple = None) -> None:
+        """
+        Generates a list of all **capture** moves for the current side in a given board state.
+        
+        This method processes the position based on the current side (White or Black) and adds all 
+        possible capture moves to a move list, taking into account piece types and board conditions. 
+        
+        Args:
+            board (Board): The current state of the chess board.
+            legal (bool): Whether to generate legal moves only.
+            pins (tuple): Pinned pieces and checkers from `get_pins_and_checkers`, if already known.
+    
+        """
+        self._generate_moves(board, captures=True, quiets=False, legal=legal, pins=pins)
+        
+    def _generate_quiet_moves(self, board, legal: bool = False, pins: tuple = None) -> None:
+        """
+        Generates a list of all **quiet** (non-capture) moves for the current side in a given board state,
+        including castling and non-capturing promotions.
+        
+        Args:
+            board (Board): The current state of the chess board.
+            legal (bool): Whether to generate legal moves only.
+            pins (tuple): Pinned pieces and checkers from `get_pins_and_checkers`, if already known.
     
         """
+        self._generate_moves(board, captures=False, quiets=True, legal=legal, pins=pins)
+        
+    def _enpas_is_legal(self, board, move: int) -> bool:
+        """
+        En passant captures remove two pawns from the board at once, which can expose the king in ways
+        the pins don't show (both pawns between king and rook on the same rank), so they are tried on the board.
+        They are rare enough for that to cost nothing.
+        """
+        if(not board.make_move(move)):
+            return False
+        board.take_move()
+        return True
+        
+    def _generate_moves(self, board, captures: bool, quiets: bool, legal: bool = False, pins: tuple = None) -> None:
+        """
+        Generates the capture and/or quiet moves for the current side in a given board state.
+
+        Args:
+            board (Board): The current state of the chess board.
+            captures (bool): Whether to generate capture moves (including en passant).
+            quiets (bool): Whether to generate quiet moves (including castling).
+            legal (bool): Whether to generate legal moves only, instead of pseudo-legal moves.
+            pins (tuple): Pinned pieces and checkers from `get_pins_and_checkers`, computed here if not given.
+        """
         _assert_condition(board._check_board())
     
         # generating white pawn moves
@@ -328,86 +564,105 @@ class MOVELIST:
         sq = 0
         t_sq = 0
         
+        pinned = {}
+        if(legal):
+            pinned, checkers = pins if pins is not None else get_pins_and_checkers(board, side)
+            if(checkers): # in check, only the moves getting out of it
+                self._generate_evasions(board, captures, quiets, pinned, checkers)
+                return
+        
         if(side == Colors.WHITE):
             # looping to total number of white pawns on the board
             for pceNum in range(0, board.pceNum[Pieces.wP]):
                 sq = board.pList[Pieces.wP][pceNum] # to get the square on which there is a white Pawn
                 _assert_condition(SqOnBoard(sq))
+                pinDir = pinned.get(sq, 0) # a pinned pawn can only move along the pin
                 
                 # if it is a no capture move
-                if(board.pieces[sq + 10] == Pieces.EMPTY):
+                if(quiets and board.pieces[sq + 10] == Pieces.EMPTY and (not pinDir or pinDir == 10 or pinDir == -10)):
                     self._add_white_pawn_move(board, sq, sq+10) # board, fromSq, ToSq
                     
                     if(RanksBrd[sq] == Ranks.R2 and board.pieces[sq + 20] == Pieces.EMPTY):
-                        self._add_quite_move(board, MOVE(sq, sq+20, Pieces.EMPTY, Pieces.EMPTY, MOVE.FLAG_PS)) # added a quite move, because there was no capture, also setted the Pawn Start Flag
+                        self._add_quite_move(board, sq | ((sq+20) << 7) | MOVE.FLAG_PS) # added a quite move, because there was no capture, also setted the Pawn Start Flag
+                
+                if(not captures):
+                    continue
                         
                 # if it is a capture move            
-                if(not SQOFFBOARD(sq + 9) and PieceCol[board.pieces[sq + 9]] == Colors.BLACK): # if the capturing piece is black
+                if(not SQOFFBOARD(sq + 9) and PieceCol[board.pieces[sq + 9]] == Colors.BLACK and (not pinDir or pinDir == 9)): # if the capturing piece is black
                     self._add_white_pawn_cap_move(board, sq, sq+9, board.pieces[sq+9]) # board, fromSq, ToSq, CapturedPiece
                     
-                if(not SQOFFBOARD(sq + 11) and PieceCol[board.pieces[sq + 11]] == Colors.BLACK): # if the capturing piece is black
+                if(not SQOFFBOARD(sq + 11) and PieceCol[board.pieces[sq + 11]] == Colors.BLACK and (not pinDir or pinDir == 11)): # if the capturing piece is black
                     self._add_white_pawn_cap_move(board, sq, sq+11, board.pieces[sq+11]) # board, fromSq, ToSq, CapturedPiece
                 if(board.enPas != Squares.NO_SQ):
-                    if(sq + 9 == board.enPas):
-                        self._add_enpas_move(board, MOVE(sq, sq+9, Pieces.EMPTY, Pieces.EMPTY, MOVE.FLAG_EP))
-                    if(sq + 11 == board.enPas):
-                        self._add_enpas_move(board, MOVE(sq, sq+11, Pieces.EMPTY, Pieces.EMPTY, MOVE.FLAG_EP))
+                    if(sq + 9 == board.enPas and (not legal or self._enpas_is_legal(board, sq | ((sq+9) << 7) | MOVE.FLAG_EP))):
+                        self._add_enpas_move(board, sq | ((sq+9) << 7) | MOVE.FLAG_EP)
+                    if(sq + 11 == board.enPas and (not legal or self._enpas_is_legal(board, sq | ((sq+11) << 7) | MOVE.FLAG_EP))):
+                        self._add_enpas_move(board, sq | ((sq+11) << 7) | MOVE.FLAG_EP)
                     
             # castling for white
             # king side castling
-            if(board.castlePerm & Castling.WKCA): #if white can castle king side
+            if(quiets and board.castlePerm & Castling.WKCA): #if white can castle king side
                 if(board.pieces[Squares.F1] == Pieces.EMPTY and board.pieces[Squares.G1] == Pieces.EMPTY): # if between the king and rook squares are empty
-                    if(not is_sqaure_attacked(Squares.E1, Colors.BLACK, board) and not is_sqaure_attacked(Squares.F1, Colors.BLACK, board)): # if the square F1, E1 are not attacked, only then king can castle, beacause, king cannot castle in between check
+                    if(not is_sqaure_attacked(Squares.E1, Colors.BLACK, board) and not is_sqaure_attacked(Squares.F1, Colors.BLACK, board)
+                       and (not legal or not is_sqaure_attacked(Squares.G1, Colors.BLACK, board))): # if the square F1, E1 are not attacked, only then king can castle, beacause, king cannot castle in between check, the target square is left to make_move unless legal
                         
                         # adding the castle move white king side castle
-                        self._add_quite_move(board, MOVE(Squares.E1, Squares.G1, Pieces.EMPTY, Pieces.EMPTY, MOVE.FLAG_CA))
+                        self._add_quite_move(board, Squares.E1 | (Squares.G1 << 7) | MOVE.FLAG_CA)
                         
-            if(board.castlePerm & Castling.WQCA):
+            if(quiets and board.castlePerm & Castling.WQCA):
                 if(board.pieces[Squares.D1] == Pieces.EMPTY and board.pieces[Squares.C1] == Pieces.EMPTY and board.pieces[Squares.B1] == Pieces.EMPTY): # if between the king and rook squares are empty
-                    if(not is_sqaure_attacked(Squares.E1, Colors.BLACK, board) and not is_sqaure_attacked(Squares.D1, Colors.BLACK, board)): # if the square D1, E1 are not attacked, only then king can castle, beacause, king cannot castle in between check
+                    if(not is_sqaure_attacked(Squares.E1, Colors.BLACK, board) and not is_sqaure_attacked(Squares.D1, Colors.BLACK, board)
+                       and (not legal or not is_sqaure_attacked(Squares.C1, Colors.BLACK, board))): # if the square D1, E1 are not attacked, only then king can castle, beacause, king cannot castle in between check
                         
                         # adding the castle move white queen side castle
-                        self._add_quite_move(board, MOVE(Squares.E1, Squares.C1, Pieces.EMPTY, Pieces.EMPTY, MOVE.FLAG_CA))
+                        self._add_quite_move(board, Squares.E1 | (Squares.C1 << 7) | MOVE.FLAG_CA)
         else: 
             # looping to total number of black pawns on the board
             for pceNum in range(0, board.pceNum[Pieces.bP]):
                 sq = board.pList[Pieces.bP][pceNum] # to get the square on which there is a black Pawn
                 _assert_condition(SqOnBoard(sq))
+                pinDir = pinned.get(sq, 0) # a pinned pawn can only move along the pin
                 
                 # if it is a no capture move
-                if(board.pieces[sq - 10] == Pieces.EMPTY):
+                if(quiets and board.pieces[sq - 10] == Pieces.EMPTY and (not pinDir or pinDir == 10 or pinDir == -10)):
                     self._add_black_pawn_move(board, sq, sq-10) # board, fromSq, ToSq
                     #
                     if(RanksBrd[sq] == Ranks.R7 and board.pieces[sq - 20] == Pieces.EMPTY):
-                        self._add_quite_move(board, MOVE(sq, sq-20, Pieces.EMPTY, Pieces.EMPTY, MOVE.FLAG_PS)) # added a quite move, because there was no capture, also setted the Pawn Start Flag
+                        self._add_quite_move(board, sq | ((sq-20) << 7) | MOVE.FLAG_PS) # added a quite move, because there was no capture, also setted the Pawn Start Flag
+                
+                if(not captures):
+                    continue
                         
                 # if it is a capture move            
-                if(not SQOFFBOARD(sq - 9) and PieceCol[board.pieces[sq - 9]] == Colors.WHITE): # if the capturing piece is WHITE
+                if(not SQOFFBOARD(sq - 9) and PieceCol[board.pieces[sq - 9]] == Colors.WHITE and (not pinDir or pinDir == -9)): # if the capturing piece is WHITE
                     self._add_black_pawn_cap_move(board, sq, sq-9, board.pieces[sq-9]) # board, fromSq, ToSq, CapturedPiece
                     
-                if(not SQOFFBOARD(sq - 11) and PieceCol[board.pieces[sq - 11]] == Colors.WHITE): # if the capturing piece is WHITE
+                if(not SQOFFBOARD(sq - 11) and PieceCol[board.pieces[sq - 11]] == Colors.WHITE and (not pinDir or pinDir == -11)): # if the capturing piece is WHITE
                     self._add_black_pawn_cap_move(board, sq, sq-11, board.pieces[sq-11]) # board, fromSq, ToSq, CapturedPiece
                 if(board.enPas != Squares.NO_SQ):
-                    if(sq - 9 == board.enPas):
-                        self._add_enpas_move(board, MOVE(sq, sq-9, Pieces.EMPTY, Pieces.EMPTY, MOVE.FLAG_EP))
-                    if(sq - 11 == board.enPas):
-                        self._add_enpas_move(board, MOVE(sq, sq-11, Pieces.EMPTY, Pieces.EMPTY, MOVE.FLAG_EP))
+                    if(sq - 9 == board.enPas and (not legal or self._enpas_is_legal(board, sq | ((sq-9) << 7) | MOVE.FLAG_EP))):
+                        self._add_enpas_move(board, sq | ((sq-9) << 7) | MOVE.FLAG_EP)
+                    if(sq - 11 == board.enPas and (not legal or self._enpas_is_legal(board, sq | ((sq-11) << 7) | MOVE.FLAG_EP))):
+                        self._add_enpas_move(board, sq | ((sq-11) << 7) | MOVE.FLAG_EP)
                     
             # castling for black
             # king side castling
-            if(board.castlePerm & Castling.BKCA):
+            if(quiets and board.castlePerm & Castling.BKCA):
                 if(board.pieces[Squares.F8] == Pieces.EMPTY and board.pieces[Squares.G8] == Pieces.EMPTY): # if between the king and rook squares are empty
-                    if(not is_sqaure_attacked(Squares.E8, Colors.WHITE, board) and not is_sqaure_attacked(Squares.F8, Colors.WHITE, board)): # if the square F8, E8 are not attacked, only then king can castle, beacause, king cannot castle in between check
+                    if(not is_sqaure_attacked(Squares.E8, Colors.WHITE, board) and not is_sqaure_attacked(Squares.F8, Colors.WHITE, board)
+                       and (not legal or not is_sqaure_attacked(Squares.G8, Colors.WHITE, board))): # if the square F8, E8 are not attacked, only then king can castle, beacause, king cannot castle in between check
                         
                         # adding the castle move black king side castle
-                        self._add_quite_move(board, MOVE(Squares.E8, Squares.G8, Pieces.EMPTY, Pieces.EMPTY, MOVE.FLAG_CA))
+                        self._add_quite_move(board, Squares.E8 | (Squares.G8 << 7) | MOVE.FLAG_CA)
                         
-            if(board.castlePerm & Castling.BQCA):
+            if(quiets and board.castlePerm & Castling.BQCA):
                 if(board.pieces[Squares.D8] == Pieces.EMPTY and board.pieces[Squares.C8] == Pieces.EMPTY and board.pieces[Squares.B8] == Pieces.EMPTY): # if between the king and rook squares are empty
-                    if(not is_sqaure_attacked(Squares.E8, Colors.WHITE, board) and not is_sqaure_attacked(Squares.D8, Colors.WHITE, board)): # if the square D8, E8 are not attacked, only then king can castle, beacause, king cannot castle in between check
+                    if(not is_sqaure_attacked(Squares.E8, Colors.WHITE, board) and not is_sqaure_attacked(Squares.D8, Colors.WHITE, board)
+                       and (not legal or not is_sqaure_attacked(Squares.C8, Colors.WHITE, board))): # if the square D8, E8 are not attacked, only then king can castle, beacause, king cannot castle in between check
                         
                         # adding the castle move black queen side castle
-                        self._add_quite_move(board, MOVE(Squares.E8, Squares.C8, Pieces.EMPTY, Pieces.EMPTY, MOVE.FLAG_CA))
+                        self._add_quite_move(board, Squares.E8 | (Squares.C8 << 7) | MOVE.FLAG_CA)
 
         # Move generation for sliding pieces (Bishops, Rooks, Queen)
         pceIndex = LoopSlideIndex[side] # WHITE - 0, BLACK - 4
@@ -419,25 +674,31 @@ class MOVELIST:
             for pceNum in range(0, board.pceNum[pce]):
                 sq = board.pList[pce][pceNum] # accesing the square on which that particular piece is
                 _assert_condition(SqOnBoard(sq))
+                pinDir = pinned.get(sq, 0)
                 
-                #generating the moves
-                for index in range(NumDir[pce]): # looping till no of directions for each piece
-                    dir = PceDir[pce][index]
-                    t_sq = sq + dir
-                    
-                    while(not SQOFFBOARD(t_sq)):   # for sliding pieces we need to iterate in that direction till we are offboard 
-                        # capture move, BLACK(1) ^ 1 == WHITE(0)
-                        if(board.pieces[t_sq] != Pieces.EMPTY):
-                            if(PieceCol[board.pieces[t_sq]] == side ^ 1): # opposite color
-                                
-                                # addding a capture move
-                                self._add_capture_move(board, MOVE(sq, t_sq, board.pieces[t_sq], Pieces.EMPTY, 0))
-                                
-                            break #if same color piece is found then break, we can't move further
-                        
-                        # Normal Move
-                        self._add_quite_move(board, MOVE(sq, t_sq, Pieces.EMPTY, Pieces.EMPTY, 0))
-                        t_sq += dir
+                # generating the moves from the attack bitboards, a queen moves like a rook and a bishop
+                sq64 = Sq120ToSq64[sq]
+                attacks = 0
+                if(PieceBishopQueen[pce]):
+                    attacks |= BishopAttacks[sq64][board.colourBB[Colors.BOTH] & BishopMasks[sq64]]
+                if(PieceRookQueen[pce]):
+                    attacks |= RookAttacks[sq64][board.colourBB[Colors.BOTH] & RookMasks[sq64]]
+                if(pinDir): # a pinned piece can only slide along the pin
+                    attacks &= LineMasks[sq64][abs(pinDir)]
+                targets = 0
+                if(captures):
+                    targets |= attacks & board.colourBB[side ^ 1] # capture moves, BLACK(1) ^ 1 == WHITE(0)
+                if(quiets):
+                    targets |= attacks & ~board.colourBB[Colors.BOTH] # normal moves
+                
+                while(targets):
+                    sq64, targets = PopBit(targets)
+                    t_sq = Sq64ToSq120[sq64]
+                    if(board.pieces[t_sq] != Pieces.EMPTY):
+                        # addding a capture move
+                        self._add_capture_move(board, sq | (t_sq << 7) | (board.pieces[t_sq] << 14))
+                    else:
+                        self._add_quite_move(board, sq | (t_sq << 7))
             
             pceIndex += 1
         
@@ -453,142 +714,142 @@ class MOVELIST:
             for pceNum in range(0, board.pceNum[pce]):
                 sq = board.pList[pce][pceNum] # accesing the square on which that particular piece is
                 _assert_condition(SqOnBoard(sq))
+                if(sq in pinned): # a pinned knight can't move at all
+                    continue
                 
-                #generating the moves
-                for index in range(NumDir[pce]): # looping till no of directions for each piece
-                    dir = PceDir[pce][index]
-                    t_sq = sq + dir
-                    if(SQOFFBOARD(t_sq)):
+                # generating the moves from the attack bitboard of the square
+                attacks = KnightAttacks[Sq120ToSq64[sq]] if PieceKnight[pce] else KingAttacks[Sq120ToSq64[sq]]
+                targets = 0
+                if(captures):
+                    targets |= attacks & board.colourBB[side ^ 1] # capture moves, BLACK(1) ^ 1 == WHITE(0)
+                if(quiets):
+                    targets |= attacks & ~board.colourBB[Colors.BOTH] # normal moves
+                
+                while(targets):
+                    sq64, targets = PopBit(targets)
+                    t_sq = Sq64ToSq120[sq64]
+                    if(legal and PieceKing[pce] and is_sqaure_attacked(t_sq, side ^ 1, board)): # the king can't step into check
                         continue
                     
-                    # capture move, BLACK(1) ^ 1 == WHITE(0)
                     if(board.pieces[t_sq] != Pieces.EMPTY):
-                        if(PieceCol[board.pieces[t_sq]] == side ^ 1): # opposite color
-                            # addding a capture move
-                            self._add_capture_move(board, MOVE(sq, t_sq, board.pieces[t_sq], Pieces.EMPTY, 0))
-                        continue #if same color then skip
-                    
-                    # Normal Move
-                    self._add_quite_move(board, MOVE(sq, t_sq, Pieces.EMPTY, Pieces.EMPTY, 0))
+                        # addding a capture move
+                        self._add_capture_move(board, sq | (t_sq << 7) | (board.pieces[t_sq] << 14))
+                    else:
+                        self._add_quite_move(board, sq | (t_sq << 7))
             
             pceIndex += 1
-            
-    def _generate_capture_moves(self, board) -> None:
+
+    def _generate_evasions(self, board, captures: bool, quiets: bool, pinned: dict, checkers: list) -> None:
         """
-        Generates a list of all legal **capture** moves for the current side in a given board state.
-        
-        This method processes the position based on the current side (White or Black) and adds all 
-        possible legal capture moves to a move list, taking into account piece types and board conditions. 
-    
+        Generates the legal moves of a side in check: king moves to safe squares and, against a single checker,
+        moves of unpinned pieces capturing the checker or blocking a sliding check. Instead of generating every
+        move and throwing most of them away, the pieces able to reach the few useful squares are looked up from those squares.
+
+        Args:
+            board (Board): The current state of the chess board.
+            captures (bool): Whether to generate capture moves (including en passant).
+            quiets (bool): Whether to generate quiet moves.
+            pinned (dict): Pinned pieces, from `get_pins_and_checkers`.
+            checkers (list): Checking pieces, from `get_pins_and_checkers`.
         """
-        _assert_condition(board._check_board())
-        
-        # generating white pawn moves
-        self.count = 0
-        pce = Pieces.EMPTY
         side = board.side
-        sq = 0
-        t_sq = 0
+        king = board.king_square[side]
+        pieces = board.pieces
         
-        if(side == Colors.WHITE):
-            # looping to total number of white pawns on the board
-            for pceNum in range(0, board.pceNum[Pieces.wP]):
-                sq = board.pList[Pieces.wP][pceNum] # to get the square on which there is a white Pawn
-                _assert_condition(SqOnBoard(sq))
-                                    
-                # if it is a capture move            
-                if(not SQOFFBOARD(sq + 9) and PieceCol[board.pieces[sq + 9]] == Colors.BLACK): # if the capturing piece is black
-                    self._add_white_pawn_cap_move(board, sq, sq+9, board.pieces[sq+9]) # board, fromSq, ToSq, CapturedPiece, list
-                    
-                if(not SQOFFBOARD(sq + 11) and PieceCol[board.pieces[sq + 11]] == Colors.BLACK): # if the capturing piece is black
-                    self._add_white_pawn_cap_move(board, sq, sq+11, board.pieces[sq+11]) # board, fromSq, ToSq, CapturedPiece, list
-                if(board.enPas != Squares.NO_SQ):
-                    if(sq + 9 == board.enPas):
-                        self._add_enpas_move(board, MOVE(sq, sq+9, Pieces.EMPTY, Pieces.EMPTY, MOVE.FLAG_EP))
-                    if(sq + 11 == board.enPas):
-                        self._add_enpas_move(board, MOVE(sq, sq+11, Pieces.EMPTY, Pieces.EMPTY, MOVE.FLAG_EP))
-                    
-
-        else: 
-            # looping to total number of black pawns on the board
-            for pceNum in range(0, board.pceNum[Pieces.bP]):
-                sq = board.pList[Pieces.bP][pceNum] # to get the square on which there is a black Pawn
-                _assert_condition(SqOnBoard(sq))
-                        
-                # if it is a capture move            
-                if(not SQOFFBOARD(sq - 9) and PieceCol[board.pieces[sq - 9]] == Colors.WHITE): # if the capturing piece is WHITE
-                    self._add_black_pawn_cap_move(board, sq, sq-9, board.pieces[sq-9]) # board, fromSq, ToSq, CapturedPiece, list
-                    
-                if(not SQOFFBOARD(sq - 11) and PieceCol[board.pieces[sq - 11]] == Colors.WHITE): # if the capturing piece is WHITE
-                    self._add_black_pawn_cap_move(board, sq, sq-11, board.pieces[sq-11]) # board, fromSq, ToSq, CapturedPiece, list
-                if(board.enPas != Squares.NO_SQ):
-                    if(sq - 9 == board.enPas):
-                        self._add_enpas_move(board, MOVE(sq, sq-9, Pieces.EMPTY, Pieces.EMPTY, MOVE.FLAG_EP))
-                    if(sq - 11 == board.enPas):
-                        self._add_enpas_move(board, MOVE(sq, sq-11, Pieces.EMPTY, Pieces.EMPTY, MOVE.FLAG_EP))
-                    
-        # Move generation for sliding pieces (Bishops, Rooks, Queen)
-        pceIndex = LoopSlideIndex[side] # WHITE - 0, BLACK - 4
-        pce = LoopSlidePce[pceIndex] # for white First piece is White Bishop
+        # king moves, a square right behind the king on the ray of a sliding checker is attacked once the king steps away
+        for dir in PceDir[pieces[king]]:
+            t_sq = king + dir
+            pce = pieces[t_sq]
+            if(pce == Squares.OFFBOARD or PieceCol[pce] == side):
+                continue
+            if(is_sqaure_attacked(t_sq, side ^ 1, board)):
+                continue
+            if(any(checkDir and t_sq == king - checkDir for _, checkDir in checkers)):
+                continue
+            if(pce != Pieces.EMPTY):
+                if(captures):
+                    self._add_capture_move(board, king | (t_sq << 7) | (pce << 14))
+            elif(quiets):
+                self._add_quite_move(board, king | (t_sq << 7))
+                
+        if(len(checkers) > 1): # double check, only the king can move
+            return
         
-        while(pce != 0):
-            _assert_condition(PieceValid(pce))
-            pce = LoopSlidePce[pceIndex]
-            for pceNum in range(0, board.pceNum[pce]):
-                sq = board.pList[pce][pceNum] # accesing the square on which that particular piece is
-                _assert_condition(SqOnBoard(sq))
+        checker, checkDir = checkers[0]
+        if(captures):
+            self._add_moves_to(board, checker, pinned)
+            if(board.enPas != Squares.NO_SQ): # en passant can capture a checking pawn, or block a check on the en passant square
+                epDir = 10 if side == Colors.WHITE else -10
+                for sq in (board.enPas - epDir - 1, board.enPas - epDir + 1):
+                    move = sq | (board.enPas << 7) | MOVE.FLAG_EP
+                    if(pieces[sq] == (Pieces.wP if side == Colors.WHITE else Pieces.bP) and self._enpas_is_legal(board, move)):
+                        self._add_enpas_move(board, move)
+        if(quiets and checkDir):
+            t_sq = king + checkDir
+            while(t_sq != checker): # the empty squares between the king and the checker
+                self._add_moves_to(board, t_sq, pinned)
+                t_sq += checkDir
                 
-                #generating the moves
-                for index in range(NumDir[pce]): # looping till no of directions for each piece
-                    dir = PceDir[pce][index]
-                    t_sq = sq + dir
-                    
-                    while(not SQOFFBOARD(t_sq)):   # for sliding pieces we need to iterate in that direction till we are offboard 
-                        # capture move, BLACK(1) ^ 1 == WHITE(0)
-                        if(board.pieces[t_sq] != Pieces.EMPTY):
-                            if(PieceCol[board.pieces[t_sq]] == side ^ 1): # opposite color
-                                
-                                # addding a capture move
-                                self._add_capture_move(board, MOVE(sq, t_sq, board.pieces[t_sq], Pieces.EMPTY, 0))
-                                
-                            break #if same color piece is found then break, we can't move further
-                        
-                        # Normal Move
+    def _add_moves_to(self, board, to_square: int, pinned: dict) -> None:
+        """
+        Adds the moves of all unpinned pieces of the side to move (except the king) which can reach `to_square`,
+        a capture if there is a piece on it, a quiet move otherwise. Pinned pieces can never stop a check,
+        they would have to leave the line between their king and the pinner.
 
-                        t_sq += dir
-            
-            pceIndex += 1
+        Args:
+            board (Board): The current state of the chess board.
+            to_square (int): The square the moves have to reach.
+            pinned (dict): Pinned pieces, from `get_pins_and_checkers`.
+        """
+        side = board.side
+        pieces = board.pieces
+        cap = pieces[to_square]
         
+        # pawns
+        if(side == Colors.WHITE):
+            if(cap != Pieces.EMPTY):
+                for sq in (to_square - 9, to_square - 11):
+                    if(pieces[sq] == Pieces.wP and sq not in pinned):
+                        self._add_white_pawn_cap_move(board, sq, to_square, cap)
+            else:
+                if(pieces[to_square - 10] == Pieces.wP and (to_square - 10) not in pinned):
+                    self._add_white_pawn_move(board, to_square - 10, to_square)
+                elif(RanksBrd[to_square] == Ranks.R4 and pieces[to_square - 10] == Pieces.EMPTY and pieces[to_square - 20] == Pieces.wP and (to_square - 20) not in pinned):
+                    self._add_quite_move(board, (to_square - 20) | (to_square << 7) | MOVE.FLAG_PS)
+        else:
+            if(cap != Pieces.EMPTY):
+                for sq in (to_square + 9, to_square + 11):
+                    if(pieces[sq] == Pieces.bP and sq not in pinned):
+                        self._add_black_pawn_cap_move(board, sq, to_square, cap)
+            else:
+                if(pieces[to_square + 10] == Pieces.bP and (to_square + 10) not in pinned):
+                    self._add_black_pawn_move(board, to_square + 10, to_square)
+                elif(RanksBrd[to_square] == Ranks.R5 and pieces[to_square + 10] == Pieces.EMPTY and pieces[to_square + 20] == Pieces.bP and (to_square + 20) not in pinned):
+                    self._add_quite_move(board, (to_square + 20) | (to_square << 7) | MOVE.FLAG_PS)
         
-        # Move generation for non sliding pieces (Knights, King)
-        pceIndex = LoopNonSlideIndex[side] # WHITE - 0, BLACK - 4
-        pce = LoopNonSlidePce[pceIndex] # for white First piece is White Knight
+        # knights
+        knights = KnightAttacks[Sq120ToSq64[to_square]] & board.pieceBB[Pieces.wN if side == Colors.WHITE else Pieces.bN]
+        while(knights):
+            sq64, knights = PopBit(knights)
+            sq = Sq64ToSq120[sq64]
+            if(sq not in pinned):
+                self._add_piece_move(board, sq | (to_square << 7) | (cap << 14))
         
-        while(pce != 0):
-            _assert_condition(PieceValid(pce))
-            pce = LoopNonSlidePce[pceIndex]
-            
-            for pceNum in range(0, board.pceNum[pce]):
-                sq = board.pList[pce][pceNum] # accesing the square on which that particular piece is
-                _assert_condition(SqOnBoard(sq))
-                
-                #generating the moves
-                for index in range(NumDir[pce]): # looping till no of directions for each piece
-                    dir = PceDir[pce][index]
-                    t_sq = sq + dir
-                    if(SQOFFBOARD(t_sq)):
-                        continue
-                    
-                    # capture move, BLACK(1) ^ 1 == WHITE(0)
-                    if(board.pieces[t_sq] != Pieces.EMPTY):
-                        if(PieceCol[board.pieces[t_sq]] == side ^ 1): # opposite color
-                            # addding a capture move
-                            self._add_capture_move(board, MOVE(sq, t_sq, board.pieces[t_sq], Pieces.EMPTY, 0))
-                        continue #if same color then skip
-                    
-                    # Normal Move
-            
-            pceIndex += 1
+        # sliders, the squares a slider on `to_square` would attack hold the sliders reaching it
+        to64 = Sq120ToSq64[to_square]
+        occupancy = board.colourBB[Colors.BOTH]
+        if(side == Colors.WHITE):
+            rooksQueens = board.pieceBB[Pieces.wR] | board.pieceBB[Pieces.wQ]
+            bishopsQueens = board.pieceBB[Pieces.wB] | board.pieceBB[Pieces.wQ]
+        else:
+            rooksQueens = board.pieceBB[Pieces.bR] | board.pieceBB[Pieces.bQ]
+            bishopsQueens = board.pieceBB[Pieces.bB] | board.pieceBB[Pieces.bQ]
+        sliders = RookAttacks[to64][occupancy & RookMasks[to64]] & rooksQueens | BishopAttacks[to64][occupancy & BishopMasks[to64]] & bishopsQueens
+        while(sliders):
+            sq64, sliders = PopBit(sliders)
+            sq = Sq64ToSq120[sq64]
+            if(sq not in pinned):
+                self._add_piece_move(board, sq | (to_square << 7) | (cap << 14))
 
     def _get_move_list(self) -> list:
         """
@@ -600,7 +861,7 @@ class MOVELIST:
         Returns:
             list[str]: A list of move strings in algebraic notation format.
         """
-        return list(map(lambda move: move.alpha_move(), self.moves[:self.count])) 
+        return list(map(alpha_move, self.moves[:self.count]))
     
     def print_move_list(self) -> None:
         """
@@ -610,9 +871,9 @@ class MOVELIST:
         print("Move List: ")
         for i in range(0, self.count):
             move = self.moves[i]
-            score = self.moves[i].score
+            score = self.scores[i]
             
-            print(f"Move: {i+1} --> {move.alpha_move()} (Score: {score})")
+            print(f"Move: {i+1} --> {alpha_move(move)} (Score: {score})")
         print(f"Move List Total {self.count} Moves: \n")
         
     def _pick_next_move(self, movenum: int) -> None:
@@ -629,9 +890,159 @@ class MOVELIST:
         """
         bestScore = 0
         bestNum = movenum
+        scores = self.scores
         for index in range(movenum, self.count): # from given moveNum to end of movelist
-            if(self.moves[index].score > bestScore):
-                bestScore = self.moves[index].score
+            if(scores[index] > bestScore):
+                bestScore = scores[index]
                 bestNum = index
         # swapping it (move ordering)    
-        self.moves[movenum], self.moves[bestNum] = self.moves[bestNum], self.moves[movenum]
\ No newline at end of file
+        self.moves[movenum], self.moves[bestNum] = self.moves[bestNum], self.moves[movenum]
+        scores[movenum], scores[bestNum] = scores[bestNum], scores[movenum]
+        
+    def _sort_moves(self) -> None:
+        """
+        Sorts the whole list by score, highest first, in one go. Cheaper than picking the best
+        move again and again when most of the moves of the list are going to be searched.
+        """
+        packed = sorted([(self.scores[index] << 25) | self.moves[index] for index in range(self.count)], reverse=True) # score and move packed in one int, so they are sorted together
+        for index in range(self.count):
+            self.moves[index] = packed[index] & 0x1FFFFFF
+            self.scores[index] = packed[index] >> 25
+
+# stages of the move picker, moves are generated only when the previous stage is exhausted
+STAGE_HASH = 0
+STAGE_GEN_CAPTURES = 1
+STAGE_CAPTURES = 2
+STAGE_KILLERS = 3
+STAGE_GEN_QUIETS = 4
+STAGE_QUIETS = 5
+STAGE_BAD_CAPTURES = 6
+STAGE_DONE = 7
+
+class MOVEPICKER:
+    """
+    Hands out the moves of a position one by one in stages, generating each stage only when the
+    previous one is exhausted: hash (PV) move, captures in MVV-LVA order, the killers (`board.searchKillers`),
+    then the rest of the quiet moves ordered by `board.searchHistory`, and last the losing captures.
+    A capture of a less valuable piece is checked by the static exchange evaluation (`static_exchange`) when its turn comes,
+    if it loses material it is put aside for the last stage, quiescence (`captures_only`) skips it altogether.
+    At a node which cuts off on the hash move, a capture or a killer, the quiet moves are never generated.
+    The hash move and the killers are checked with `is_pseudo_legal` instead, captures and quiet moves are
+    generated legal, so only the hash move and the killers have to be checked by `Board.make_move` (see `legal`).
+    The board keeps one picker per ply (`Board.movePickers`).
+
+    Attributes:
+        captures (MOVELIST): Capture moves of the position.
+        quiets (MOVELIST): Quiet moves of the position.
+        badCaptures (MOVELIST): Captures losing material, in the order they were put aside.
+        hashMove (int): The move from the transposition table, `NOMOVE` if none.
+        killers (tuple): The two killer moves of the ply.
+        stage (int): The current stage of the picker.
+        index (int): Index of the next move in the list of the current stage.
+        captures_only (bool): If True, only the hash move and captures are returned (quiescence).
+        pins (tuple): Pinned pieces and checkers of the position, found once for both generated stages.
+        legal (bool): Whether the move last returned by `_next_move` was generated legal, False for the hash move and the killers.
+    """
+    def __init__(self):
+        self.captures = MOVELIST()
+        self.quiets = MOVELIST()
+        self.badCaptures = MOVELIST()
+        self.board = None
+        self.hashMove = NOMOVE
+        self.killers = (NOMOVE, NOMOVE)
+        self.stage = STAGE_DONE
+        self.index = 0
+        self.captures_only = False
+        self.pins = None
+        self.legal = False
+        
+    def _init_picker(self, board, hashMove: int, captures_only: bool = False) -> None:
+        """
+        Prepares the picker for a new position.
+
+        Args:
+            board (Board): The current state of the chess board.
+            hashMove (int): The move from the transposition table, searched first if it is valid.
+            captures_only (bool): If True, only the hash move (if a capture not losing material) and captures are returned.
+        """
+        self.board = board
+        self.captures_only = captures_only
+        hashMove = hashMove if (hashMove != NOMOVE and (not captures_only or hashMove & MOVE.FLAG_CAP) and is_pseudo_legal(board, hashMove)) else NOMOVE
+        if(captures_only and hashMove != NOMOVE and PieceVal[(hashMove >> 14) & 0xF] < PieceVal[board.pieces[hashMove & 0x7F]] and static_exchange(board, hashMove) < 0): # quiescence skips a losing hash move like any other losing capture
+            hashMove = NOMOVE
+        self.hashMove = hashMove
+        self.killers = (board.searchKillers[0][board.ply], board.searchKillers[1][board.ply])
+        self.stage = STAGE_HASH
+        self.index = 0
+        self.legal = False
+        
+    def _next_move(self) -> int:
+        """
+        Returns the next move to search, `NOMOVE` once all stages are exhausted.
+        """
+        if(self.stage == STAGE_HASH):
+            self.stage = STAGE_GEN_CAPTURES
+            if(self.hashMove != NOMOVE):
+                self.legal = False
+                return self.hashMove
+            
+        if(self.stage == STAGE_GEN_CAPTURES):
+            self.pins = get_pins_and_checkers(self.board, self.board.side)
+            self.captures._generate_capture_moves(self.board, legal=True, pins=self.pins) # generated moves are legal, only the hash move needs the check test
+            self.badCaptures.count = 0
+            self.index = 0
+            self.stage = STAGE_CAPTURES
+            
+        if(self.stage == STAGE_CAPTURES):
+            while(self.index < self.captures.count):
+                self.captures._pick_next_move(movenum=self.index) # captures are few, picking the best one lazily
+                move = self.captures.moves[self.index]
+                self.index += 1
+                if(move == self.hashMove):
+                    continue
+                if(PieceVal[(move >> 14) & 0xF] < PieceVal[self.board.pieces[move & 0x7F]] and static_exchange(self.board, move) < 0): # only a capture of a less valuable piece can lose material
+                    self.badCaptures.moves[self.badCaptures.count] = move
+                    self.badCaptures.count += 1
+                    continue
+                self.legal = True
+                return move
+            if(self.captures_only):
+                self.stage = STAGE_DONE
+                return NOMOVE
+            self.index = 0
+            self.stage = STAGE_KILLERS
+            
+        if(self.stage == STAGE_KILLERS): # killers may cut off before the quiet moves are generated
+            while(self.index < 2):
+                move = self.killers[self.index]
+                self.index += 1
+                if(move != NOMOVE and move != self.hashMove and not (move & MOVE.FLAG_CAP) and is_pseudo_legal(self.board, move)):
+                    self.legal = False
+                    return move
+            self.stage = STAGE_GEN_QUIETS
+            
+        if(self.stage == STAGE_GEN_QUIETS):
+            self.quiets._generate_quiet_moves(self.board, legal=True, pins=self.pins) # killers are scored above every other quiet move
+            self.quiets._sort_moves()
+            self.index = 0
+            self.stage = STAGE_QUIETS
+            
+        if(self.stage == STAGE_QUIETS):
+            while(self.index < self.quiets.count):
+                move = self.quiets.moves[self.index]
+                self.index += 1
+                if(move != self.hashMove and move != self.killers[0] and move != self.killers[1]):
+                    self.legal = True
+                    return move
+            self.index = 0
+            self.stage = STAGE_BAD_CAPTURES
+
+        if(self.stage == STAGE_BAD_CAPTURES):
+            if(self.index < self.badCaptures.count):
+                move = self.badCaptures.moves[self.index]
+                self.index += 1
+                self.legal = True
+                return move
+            self.stage = STAGE_DONE
+
+        return NOMOVE
@@ -0,0 +1,137 @@
+from pychess_engine.constants import Colors, Pieces, MAXGAMEMOVES
+from pychess_engine.globals import PieceCol, Sq64ToSq120
+from pychess_engine.debug import _assert_condition
+
+try: # numpy is optional, only the network evaluation needs it
+    import numpy as np
+except ImportError:
+    np = None
+
+# quantization of the network, a weights file may store its own values under the same (lower case) names
+QA = 255 # clipped ReLU ceiling of the accumulator, the first layer works in units of 1 / QA
+QB = 64 # the output weights work in units of 1 / QB
+SCALE = 400 # the network output times SCALE is the score in centipawns
+
+NUM_FEATURES = 12 * 64 # one input for every piece on every square
+
+def _feature(piece: int, sq64: int, perspective: int) -> int:
+    """
+    Input of a piece on a square as seen by one side, black sees the board flipped with the colours swapped,
+    so both sides share the same weights.
+    """
+    if(perspective == Colors.BLACK):
+        piece = piece + 6 if PieceCol[piece] == Colors.WHITE else piece - 6
+        sq64 ^= 56 # same file, mirrored rank
+    return (piece - 1) * 64 + sq64
+
+class NNUE:
+    """
+    Evaluates positions with a small NNUE-style network, 768 piece-square inputs for each side's perspective,
+    a hidden layer (the accumulator) of `hiddenSize` neurons and a single output.
+
+    The accumulator is the first layer before its activation, updated by the board for every piece it adds,
+    clears or moves, so a move costs a few vector additions instead of a full first layer product.
+    Every move pushes a copy of it on a stack and taking the move back pops it, restoring it as it was.
+
+    The weights file is a NumPy `.npz` archive with the arrays
+        `ft_weights`  - (768, hiddenSize) int16, first layer weights of every input
+        `ft_bias`     - (hiddenSize,) int16, first layer biases
+        `out_weights` - (2 * hiddenSize,) int16, output weights of the side to move's half followed by the other side's
+        `out_bias`    - int32 scalar, output bias
+    and optionally the `qa`, `qb` and `scale` scalars of its quantization.
+
+    Attributes:
+        path (str): The weights file.
+        hiddenSize (int): Number of neurons of the hidden layer (per perspective).
+        ftWeights (ndarray): First layer weights indexed by input.
+        ftBias (ndarray): First layer biases.
+        outWeights (ndarray): Output weights as int32, split in the side to move's and the other side's half.
+        outBias (int): Output bias.
+        accumulators (ndarray): (MAXGAMEMOVES + 1, 2, hiddenSize) int16 stack of accumulators indexed by [entry][perspective].
+        top (int): Index of the current accumulator on the stack.
+    """
+    def __init__(self, path: str):
+        if(np is None):
+            raise ImportError("the network evaluation needs numpy, install it with `pip install numpy`")
+        self.path = path
+        with np.load(path) as weights:
+            self.ftWeights = np.ascontiguousarray(weights["ft_weights"], dtype=np.int16)
+            self.ftBias = np.ascontiguousarray(weights["ft_bias"], dtype=np.int16)
+            outWeights = np.asarray(weights["out_weights"], dtype=np.int32)
+            self.outBias = int(weights["out_bias"])
+            self.qa = int(weights["qa"]) if "qa" in weights else QA
+            self.qb = int(weights["qb"]) if "qb" in weights else QB
+            self.scale = int(weights["scale"]) if "scale" in weights else SCALE
+
+        self.hiddenSize = self.ftBias.shape[0]
+        if(self.ftWeights.shape != (NUM_FEATURES, self.hiddenSize) or outWeights.shape != (2 * self.hiddenSize,)):
+            raise ValueError(f"{path}: expected (768, H) first layer weights and (2H,) output weights, got {self.ftWeights.shape} and {outWeights.shape}")
+        self.outWeights = (outWeights[:self.hiddenSize], outWeights[self.hiddenSize:])
+
+        self.accumulators = np.zeros((MAXGAMEMOVES + 1, 2, self.hiddenSize), dtype=np.int16)
+        self.top = 0
+
+    def _refresh(self, board) -> None:
+        """
+        Recomputes the accumulator from all the pieces of the board and empties the stack, used after a position is set up.
+
+        Args:
+            board(Board): The board object containing the current position.
+        """
+        self.top = 0
+        self.accumulators[0] = self._compute(board)
+
+    def _compute(self, board):
+        """Computes the accumulator of both perspectives from scratch, as (2, hiddenSize) int16 array."""
+        accumulator = np.empty((2, self.hiddenSize), dtype=np.int16)
+        accumulator[Colors.WHITE] = self.ftBias
+        accumulator[Colors.BLACK] = self.ftBias
+        for sq64 in range(0, 64):
+            piece = board.pieces[Sq64ToSq120[sq64]]
+            if(piece != Pieces.EMPTY):
+                accumulator[Colors.WHITE] += self.ftWeights[_feature(piece, sq64, Colors.WHITE)]
+                accumulator[Colors.BLACK] += self.ftWeights[_feature(piece, sq64, Colors.BLACK)]
+        return accumulator
+
+    def _push(self) -> None:
+        """Saves the current accumulator before a move changes it."""
+        _assert_condition(self.top < MAXGAMEMOVES)
+        self.accumulators[self.top + 1] = self.accumulators[self.top]
+        self.top += 1
+
+    def _pop(self) -> None:
+        """Goes back to the accumulator from before the last move."""
+        _assert_condition(self.top > 0)
+        self.top -= 1
+
+    def _add_piece(self, piece: int, sq64: int) -> None:
+        accumulator = self.accumulators[self.top]
+        accumulator[Colors.WHITE] += self.ftWeights[_feature(piece, sq64, Colors.WHITE)]
+        accumulator[Colors.BLACK] += self.ftWeights[_feature(piece, sq64, Colors.BLACK)]
+
+    def _clear_piece(self, piece: int, sq64: int) -> None:
+        accumulator = self.accumulators[self.top]
+        accumulator[Colors.WHITE] -= self.ftWeights[_feature(piece, sq64, Colors.WHITE)]
+        accumulator[Colors.BLACK] -= self.ftWeights[_feature(piece, sq64, Colors.BLACK)]
+
+    def _move_piece(self, piece: int, from64: int, to64: int) -> None:
+        accumulator = self.accumulators[self.top]
+        ftWeights = self.ftWeights
+        accumulator[Colors.WHITE] += ftWeights[_feature(piece, to64, Colors.WHITE)] - ftWeights[_feature(piece, from64, Colors.WHITE)]
+        accumulator[Colors.BLACK] += ftWeights[_feature(piece, to64, Colors.BLACK)] - ftWeights[_feature(piece, from64, Colors.BLACK)]
+
+    def _evaluate(self, side: int) -> int:
+        """
+        Runs the output layer on the current accumulator, clipped ReLU of both halves and an int32 dot product.
+
+        Args:
+            side (int): Side to move.
+
+        Returns:
+            int: The evaluation score of the position from the side to move's point of view.
+        """
+        accumulator = self.accumulators[self.top]
+        us = np.clip(accumulator[side], 0, self.qa).astype(np.int32)
+        them = np.clip(accumulator[side ^ 1], 0, self.qa).astype(np.int32)
+        output = int(np.dot(us, self.outWeights[0])) + int(np.dot(them, self.outWeights[1])) + self.outBias
+        return int(output * self.scale / (self.qa * self.qb)) # rounding towards 0, so black and white are scored alike
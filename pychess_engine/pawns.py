@@ -0,0 +1,99 @@
+from array import array
+from pychess_engine.constants import Colors
+from pychess_engine.debug import _assert_condition
+from pychess_engine.bitboards import PopBit
+from pychess_engine.globals import FileMasks, IsolatedMasks, PassedMasks, SupportMasks, PawnAttacks
+from pychess_engine.globals import PassedPawnMg, PassedPawnEg, IsolatedPawnMg, IsolatedPawnEg, DoubledPawnMg, DoubledPawnEg, BackwardPawnMg, BackwardPawnEg
+
+PAWN_HASH_ENTRIES = 1 << 14 # a power of 2, the entry of a pawn key is its lowest bits
+
+def evaluate_pawn_structure(whitePawns: int, blackPawns: int) -> tuple[int, int]:
+    """
+    Scores the passed, isolated, doubled and backward pawns of both sides, with the masks of `InitPawnMasks()`.
+    It only depends on the pawns, so the result can be cached by the pawn key.
+
+    Args:
+        whitePawns (int): Bitboard of the white pawns.
+        blackPawns (int): Bitboard of the black pawns.
+
+    Returns:
+        int: Middlegame score, positive for white.
+        int: Endgame score, positive for white.
+    """
+    mg = 0
+    eg = 0
+    for col, own, enemy, sign in ((Colors.WHITE, whitePawns, blackPawns, 1), (Colors.BLACK, blackPawns, whitePawns, -1)):
+        passedMasks = PassedMasks[col]
+        bb = own
+        while(bb):
+            sq64, bb = PopBit(bb)
+            file = sq64 & 7
+            rank = sq64 >> 3 if col == Colors.WHITE else 7 - (sq64 >> 3) # rank as seen from the pawn's own side
+            front = passedMasks[sq64] & FileMasks[file] # the squares in front of the pawn on its file
+
+            if(front & own): # doubled, only the pawns behind are punished
+                mg += sign * DoubledPawnMg
+                eg += sign * DoubledPawnEg
+            elif(not passedMasks[sq64] & enemy): # passed, no enemy pawn can stop or capture it on its way
+                mg += sign * PassedPawnMg[rank]
+                eg += sign * PassedPawnEg[rank]
+
+            if(not IsolatedMasks[sq64] & own):
+                mg += sign * IsolatedPawnMg
+                eg += sign * IsolatedPawnEg
+            elif(not SupportMasks[col][sq64] & own): # no own pawn left behind it on the next files
+                stop64 = sq64 + 8 if col == Colors.WHITE else sq64 - 8
+                if(PawnAttacks[col][stop64] & enemy): # an enemy pawn attacks the square in front, PawnAttacks[col] from there are the squares its attackers stand on
+                    mg += sign * BackwardPawnMg
+                    eg += sign * BackwardPawnEg
+    return mg, eg
+
+class PAWNHASHTABLE:
+    """
+    Caches the pawn structure scores by the pawn key of the board. Pawns move or get captured in few of the
+    positions a search visits, so most evaluations find their pawn structure in the table.
+
+    Entries live in flat arrays, entry `i` takes the key `keys[i]` and the scores `scores[2*i]` (middlegame)
+    and `scores[2*i + 1]` (endgame). A newly computed entry always replaces the old one.
+
+    Attributes:
+        numEntries (int): The number of entries available in the table, a power of 2.
+        keys (array): Pawn key of every entry, the empty entries hold 0, the key of a board without pawns (which scores 0 anyway).
+        scores (array): Middlegame and endgame score of every entry.
+        hit (int): Number of probes which found the pawn structure.
+        miss (int): Number of probes which had to compute it.
+    """
+    def __init__(self, numEntries: int = PAWN_HASH_ENTRIES):
+        _assert_condition(numEntries > 0 and numEntries & (numEntries - 1) == 0)
+        self.numEntries = numEntries
+        self._clear_table()
+
+    def _clear_table(self) -> None:
+        """Clears the table by resetting all entries to empty states."""
+        self.keys = array('Q', bytes(self.numEntries * 8))
+        self.scores = array('i', bytes(self.numEntries * 8))
+        self.hit = 0
+        self.miss = 0
+
+    def _probe_pawn_entry(self, board) -> tuple[int, int]:
+        """
+        Looks the pawn structure of the board up in the table, computing and storing it if it isn't there.
+
+        Args:
+            board(Board): The board object containing the current position.
+
+        Returns:
+            int: Middlegame pawn structure score, positive for white.
+            int: Endgame pawn structure score, positive for white.
+        """
+        index = board.pawnKey & (self.numEntries - 1)
+        if(self.keys[index] == board.pawnKey):
+            self.hit += 1
+            return self.scores[index << 1], self.scores[(index << 1) + 1]
+
+        self.miss += 1
+        mg, eg = evaluate_pawn_structure(board.pawns[Colors.WHITE], board.pawns[Colors.BLACK])
+        self.keys[index] = board.pawnKey
+        self.scores[index << 1] = mg
+        self.scores[(index << 1) + 1] = eg
+        return mg, eg
@@ -1,52 +1,141 @@
+import multiprocessing
 from pychess_engine.board import Board
 from pychess_engine.debug import _assert_condition
-from pychess_engine.move import MOVELIST
+from pychess_engine.move import alpha_move
 from pychess_engine.helper import execution_time
+from pychess_engine.init import initialize
+from pychess_engine.misc import GetTimeMs
 
-leafNodes = 0
+_board = None # board of a divide worker process
+_cache = None # its perft cache
 
-def Perft(depth, board: Board):
-    global leafNodes
+def Perft(depth: int, board: Board, cache: dict = None) -> int:
+    """
+    Counts the leaf nodes of the legal move tree of the board's position to a given depth.
+    Nothing is kept outside the board and the cache, so several boards can be perft'ed at once.
+    At depth 1 the legal moves are counted in bulk instead of being made.
+
+    Args:
+        depth (int): The depth to count the nodes to.
+        board (Board): The board, left in the same position afterwards.
+        cache (dict, optional): Perft cache, `(posKey, depth) -> nodes`, filled while counting.
+            Transpositions are then counted once, pass the same dict again to reuse it for the same position.
+
+    Returns:
+        int: The number of leaf nodes.
+    """
     _assert_condition(board._check_board())
     
     if(depth == 0):
-        leafNodes += 1
-        return 
+        return 1
+    
+    if(cache is not None and depth > 1):
+        nodes = cache.get((board.posKey, depth))
+        if(nodes is not None):
+            return nodes
     
-    list = MOVELIST()
-    list.generate_all_moves(board)
+    mlist = board.moveLists[board.ply]
+    mlist.generate_legal_moves(board)
+    if(depth == 1): # bulk counting, every legal move is a leaf
+        return mlist.count
     
-    for MoveNum in range(0, list.count):
-        if(not board.make_move(list.moves[MoveNum])):
-            continue
-        Perft(depth - 1, board)
+    nodes = 0
+    for MoveNum in range(0, mlist.count):
+        board.make_move(mlist.moves[MoveNum], legal=True)
+        nodes += Perft(depth - 1, board, cache)
         board.take_move()
     
-    return 
+    if(cache is not None):
+        cache[(board.posKey, depth)] = nodes
+    return nodes
+
+def _init_divide_worker(use_cache: bool) -> None:
+    global _board, _cache
+    initialize()
+    _board = Board()
+    _cache = {} if use_cache else None # kept for all root moves the worker gets, the keys tell the positions apart
+
+def _divide_move(job: tuple) -> int:
+    """
+    Counts the nodes below one root move in a worker process, the position is rebuilt from its FEN.
+
+    Args:
+        job (tuple): `(fen, move, depth)`, the position, the encoded root move and the depth below it.
+
+    Returns:
+        int: The number of leaf nodes below the move.
+    """
+    fen, move, depth = job
+    _board.parse_fen(fen)
+    _board.make_move(move, legal=True)
+    return Perft(depth, _board, _cache)
+
+def PerftDivide(depth: int, board: Board, processes: int = 1, use_cache: bool = False) -> dict:
+    """
+    Runs perft on the board's position and returns the node count below every root move (divide),
+    to compare against other engines when looking for move generation bugs.
+
+    Args:
+        depth (int): The depth to count the nodes to, at least 1.
+        board (Board): The board.
+        processes (int, optional): Number of worker processes the root moves are spread over, 1 counts in this process. Default is 1.
+        use_cache (bool, optional): Whether to count transpositions once through a perft cache (one per process).
+
+    Returns:
+        dict: `moves` (the `{move: nodes}` mapping, moves in algebraic notation), the total `nodes`, `time_ms` and `nps`.
+    """
+    _assert_condition(board._check_board())
+    _assert_condition(depth >= 1)
+    
+    startTime = GetTimeMs()
+    mlist = board.moveLists[board.ply]
+    mlist.generate_legal_moves(board)
+    rootMoves = mlist.moves[:mlist.count]
+    
+    if(processes > 1 and len(rootMoves) > 1):
+        fen = board.get_fen()
+        with multiprocessing.Pool(processes=min(processes, len(rootMoves)), initializer=_init_divide_worker, initargs=(use_cache,)) as pool:
+            counts = pool.map(_divide_move, [(fen, move, depth - 1) for move in rootMoves], chunksize=1)
+    else:
+        cache = {} if use_cache else None
+        counts = []
+        for move in rootMoves:
+            board.make_move(move, legal=True)
+            counts.append(Perft(depth - 1, board, cache))
+            board.take_move()
+    
+    timeMs = GetTimeMs() - startTime
+    nodes = sum(counts)
+    return {
+        "moves": {alpha_move(move): count for move, count in zip(rootMoves, counts)},
+        "nodes": nodes,
+        "time_ms": timeMs,
+        "nps": int(nodes * 1000 / timeMs) if timeMs else 0,
+    }
 
 @execution_time
-def PerftTest(depth, board: Board):
-    global leafNodes
+def PerftTest(depth: int, board: Board, use_cache: bool = False, processes: int = 1) -> int:
+    """
+    Runs perft on the board's position, printing the node count below every root move (divide) and the total.
+
+    Args:
+        depth (int): The depth to count the nodes to.
+        board (Board): The board.
+        use_cache (bool, optional): Whether to count transpositions once through a perft cache.
+        processes (int, optional): Number of worker processes the root moves are spread over.
+
+    Returns:
+        int: The number of leaf nodes.
+    """
     _assert_condition(board._check_board())
     
     board.print_board()
     
     print(f"\nStarting Test to Depth: {depth}")
-    leafNodes = 0
-
-    list = MOVELIST()
-    list.generate_all_moves(board)
-    
-    for MoveNum in range(0 , list.count):
-        move = list.moves[MoveNum]
-        if(not board.make_move(move)):
-            continue
-        
-        cumnodes = leafNodes
-        Perft(depth - 1, board)
-        board.take_move()
-        oldnodes = leafNodes - cumnodes
-        print(f"Move {MoveNum+1} is {move.alpha_move()} : {oldnodes}")
+    divide = PerftDivide(depth, board, processes=processes, use_cache=use_cache)
+    
+    for MoveNum, (move, nodes) in enumerate(divide["moves"].items()):
+        print(f"Move {MoveNum+1} is {move} : {nodes}")
     
-    print(f"Test Complete: {leafNodes} nodes")
-    return
\ No newline at end of file
+    print(f"Test Complete: {divide['nodes']} nodes")
+    return divide["nodes"]
@@ -0,0 +1,162 @@
+import os
+import sys
+import json
+import argparse
+import multiprocessing
+from pychess_engine.init import initialize
+from pychess_engine.board import Board
+from pychess_engine.perft import Perft
+from pychess_engine.misc import GetTimeMs
+
+# python -m pychess_engine.perftsuite tests/perftsuite.epd --depth 4 --jobs 8 --json summary.json
+
+_board = None # board of a worker process
+
+def parse_epd(path: str) -> list:
+    """
+    Parses a perft EPD file, one position per line: `FEN ;D1 20 ;D2 400 ...`.
+
+    Args:
+        path (str): Path of the EPD file.
+
+    Returns:
+        list: `(fen, {depth: nodes})` tuples, in the order of the file.
+    """
+    positions = []
+    with open(path, "r") as file:
+        for line in file:
+            fields = [field.strip() for field in line.split(";")]
+            if(not fields[0]):
+                continue
+            expected = {}
+            for field in fields[1:]:
+                if(field[:1] == "D"):
+                    depth, nodes = field[1:].split()
+                    expected[int(depth)] = int(nodes)
+            positions.append((fields[0], expected))
+    return positions
+
+def _init_worker() -> None:
+    global _board
+    initialize()
+    _board = Board()
+
+def _run_position(job: tuple) -> dict:
+    """
+    Runs perft on one position of the suite in a worker process, depth by depth up to the max depth.
+    A deeper perft isn't started if, at the growth of the node count so far, it wouldn't finish before the deadline,
+    and none is started once the deadline has passed. A position where no depth ran is skipped, neither passed nor failed.
+
+    Args:
+        job (tuple): `(index, fen, expected, maxDepth, deadline, useCache)`, the deadline in ms (`GetTimeMs`) or None.
+
+    Returns:
+        dict: The result of the position.
+    """
+    index, fen, expected, maxDepth, deadline, useCache = job
+    _board.parse_fen(fen)
+    cache = {} if useCache else None
+
+    depths = []
+    nodes = 0
+    elapsed = 0
+    for depth in sorted(depth for depth in expected if depth <= maxDepth):
+        if(deadline is not None and not depths and GetTimeMs() > deadline): # the budget ran out before the position was reached
+            break
+        if(deadline is not None and depths):
+            growth = depths[-1]["nodes"] / depths[-2]["nodes"] if len(depths) > 1 and depths[-2]["nodes"] else depths[-1]["nodes"]
+            if(GetTimeMs() + depths[-1]["time_ms"] * growth > deadline):
+                break
+        startTime = GetTimeMs()
+        count = Perft(depth, _board, cache)
+        timeMs = GetTimeMs() - startTime
+        depths.append({"depth": depth, "nodes": count, "expected": expected[depth], "passed": count == expected[depth], "time_ms": timeMs})
+        nodes += count
+        elapsed += timeMs
+
+    return {
+        "index": index,
+        "fen": fen,
+        "depth": depths[-1]["depth"] if depths else 0,
+        "passed": bool(depths) and all(result["passed"] for result in depths),
+        "skipped": not depths, # no expected count up to the max depth, or no time left
+        "nodes": nodes,
+        "time_ms": elapsed,
+        "nps": int(nodes * 1000 / elapsed) if elapsed else 0,
+        "depths": depths,
+    }
+
+def run_perft_suite(path: str, max_depth: int = 4, time_budget: float = None, processes: int = None, use_cache: bool = False, display: bool = True) -> dict:
+    """
+    Runs perft on every position of an EPD file in a process pool, checking the node counts against the expected ones.
+
+    Args:
+        path (str): Path of the EPD file (e.g. `tests/perftsuite.epd`).
+        max_depth (int, optional): The deepest perft run on a position. Default is 4.
+        time_budget (float, optional): Seconds for the whole suite, positions stop going deeper once it would be exceeded. No limit by default.
+        processes (int, optional): Number of worker processes, the number of cores by default.
+        use_cache (bool, optional): Whether to count transpositions once through a perft cache.
+        display (bool, optional): Whether to print the result of every position as it completes.
+
+    Returns:
+        dict: Summary with the aggregate counts and the result of every position (JSON serializable).
+    """
+    positions = parse_epd(path)
+    processes = processes or os.cpu_count() or 1
+    startTime = GetTimeMs()
+    deadline = startTime + int(time_budget * 1000) if time_budget is not None else None
+    jobs = [(index, fen, expected, max_depth, deadline, use_cache) for index, (fen, expected) in enumerate(positions)]
+
+    results = []
+    with multiprocessing.Pool(processes=processes, initializer=_init_worker) as pool:
+        for result in pool.imap_unordered(_run_position, jobs):
+            results.append(result)
+            if(display):
+                status = "SKIP" if result["skipped"] else "PASS" if result["passed"] else "FAIL"
+                print(f"{result['index'] + 1:4} {status} depth {result['depth']} nodes {result['nodes']} time {result['time_ms']}ms nps {result['nps']} {result['fen']}")
+                for failed in (depth for depth in result["depths"] if not depth["passed"]):
+                    print(f"       depth {failed['depth']}: {failed['nodes']} nodes, expected {failed['expected']}")
+    results.sort(key=lambda result: result["index"])
+
+    wallMs = GetTimeMs() - startTime
+    nodes = sum(result["nodes"] for result in results)
+    summary = {
+        "epd": path,
+        "max_depth": max_depth,
+        "time_budget": time_budget,
+        "processes": processes,
+        "positions": len(results),
+        "passed": sum(1 for result in results if result["passed"]),
+        "failed": sum(1 for result in results if not result["passed"] and not result["skipped"]),
+        "skipped": sum(1 for result in results if result["skipped"]),
+        "nodes": nodes,
+        "time_ms": wallMs,
+        "nps": int(nodes * 1000 / wallMs) if wallMs else 0,
+        "results": results,
+    }
+    if(display):
+        print(f"\n{summary['passed']}/{summary['positions']} passed, {summary['failed']} failed, {summary['skipped']} skipped, nodes {nodes} time {wallMs}ms nps {summary['nps']} ({processes} processes)")
+    return summary
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Runs the perft suite of an EPD file in parallel.")
+    parser.add_argument("epd", help="EPD file with the expected node counts, e.g. tests/perftsuite.epd")
+    parser.add_argument("--depth", type=int, default=4, help="deepest perft run on a position (default 4)")
+    parser.add_argument("--time", type=float, default=None, help="time budget of the whole suite in seconds")
+    parser.add_argument("--jobs", type=int, default=None, help="number of worker processes (default: number of cores)")
+    parser.add_argument("--cache", action="store_true", help="count transpositions once through a perft cache")
+    parser.add_argument("--json", default=None, help="file to write the JSON summary to, - for stdout")
+    parser.add_argument("--quiet", action="store_true", help="don't print the result of every position")
+    args = parser.parse_args(argv)
+
+    summary = run_perft_suite(args.epd, max_depth=args.depth, time_budget=args.time, processes=args.jobs, use_cache=args.cache, display=not args.quiet and args.json != "-")
+    if(args.json == "-"):
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    elif(args.json):
+        with open(args.json, "w") as file:
+            json.dump(summary, file, indent=2)
+    return 0 if summary["failed"] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
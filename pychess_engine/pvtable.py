@@ -1,73 +1,256 @@
-from pychess_engine.constants import MAXDEPTH
+from array import array
+from multiprocessing import shared_memory
+from pychess_engine.constants import MAXDEPTH, MATE
 from pychess_engine.debug import _assert_condition
-from pychess_engine.move import MOVE
-from pychess_engine.hashkeys import PositionKey
+from pychess_engine.move import NOMOVE, is_pseudo_legal
 
-MAXPVENTRIES = 131072
+# hash flags, telling us what kind of score is stored in the entry
+HFNONE = 0
+HFALPHA = 1 # upper bound, no move could beat alpha (fail low)
+HFBETA = 2 # lower bound, a move caused a beta cutoff (fail high)
+HFEXACT = 3 # exact score, alpha < score < beta
 
-class PVENTRY:
-    """
-    Represents a Principal Variation Table (PVT) entry, used in storing moves 
-    and position keys for a chess engine's principal variation path.
+ISMATE = MATE - MAXDEPTH # scores above this are mate scores, they are stored relative to the position and not to the root
 
-    Attributes:
-        posKey (PositionKey): The unique key representing a board position.
-        move (MOVE): The best move determined for the current position.
-    """
-    def __init__(self):
-        self.posKey = PositionKey()
-        self.move = MOVE()
+HASHENTRY_SIZE = 16 # every entry takes two 64 bit words, the position key and the packed data
+DEFAULT_HASH_MB = 8
+
+# packed data word of an entry
+#   move  - 25 bits (0 - 24)
+#   score - 16 bits (25 - 40), stored with an offset so it is never negative
+#   depth - 7 bits (41 - 47)
+#   flags - 2 bits (48 - 49)
+#   age   - 8 bits (50 - 57)
+SCORE_OFFSET = 0x8000
+
+def PACK_DATA(move: int, score: int, depth: int, flags: int, age: int) -> int:
+    return move | ((score + SCORE_OFFSET) << 25) | (depth << 41) | (flags << 48) | (age << 50)
+
+def DATA_MOVE(data: int) -> int:
+    return data & 0x1FFFFFF
+
+def DATA_SCORE(data: int) -> int:
+    return ((data >> 25) & 0xFFFF) - SCORE_OFFSET
 
-class PVTABLE:
+def DATA_DEPTH(data: int) -> int:
+    return (data >> 41) & 0x7F
+
+def DATA_FLAGS(data: int) -> int:
+    return (data >> 48) & 0x3
+
+def DATA_AGE(data: int) -> int:
+    return (data >> 50) & 0xFF
+
+class HASHTABLE:
     """
-    Represents a Principal Variation Table (PVT) to store optimal moves for positions in a chess engine.
+    Represents a Transposition (Hash) Table, storing score, depth, bound type and best move of searched positions,
+    so the search can cut off on positions it has already searched deep enough and order the best move first.
+    
+    Entries live in one flat `array('Q')`, entry `i` takes the words `2*i` (position key) and `2*i + 1` (packed data),
+    so the whole table is a single allocation and clearing it is a single bulk operation.
+    The table can also live in a `multiprocessing.shared_memory` block, shared by the processes of a Lazy SMP search.
+    Entries are written without locks, the key word holds `key ^ data`, so an entry torn by two processes writing
+    at the same time doesn't match its position key anymore and is simply ignored.
 
     Attributes:
-        numEntries (int): The number of entries available in the PVT.
-        pTable (list): A list of `PVENTRY` objects storing moves and position keys.
+        MB (int): Size of the table in megabytes.
+        numEntries (int): The number of entries available in the table.
+        hTable (array or memoryview): Flat array of 64 bit words holding the key (xor data) and packed data of every entry.
+        shm (SharedMemory): The shared memory block holding the table, None if the table is local to the process.
+        shmOwner (bool): Whether this process created the shared memory block (and has to unlink it).
+        age (int): Age of the current search, entries of older searches are always replaced.
+        newWrite (int): Number of entries written to an empty slot.
+        overWrite (int): Number of entries written over an existing entry.
+        hit (int): Number of probes which found the position.
+        cut (int): Number of probes which caused a cutoff.
     """
-    def __init__(self):
-        self.numEntries = MAXPVENTRIES - 2
-        self.pTable = [PVENTRY() for _ in range(self.numEntries)] # to store the entry of PVENTRY
+    def __init__(self, MB: int = DEFAULT_HASH_MB):
+        self.MB = MB
+        self.numEntries = 0
+        self.hTable = array('Q')
+        self.shm = None
+        self.shmOwner = False
+        self.age = 0
+        self.init_hash_table(MB)
+
+    def init_hash_table(self, MB: int, shared: bool = False) -> None:
+        """
+        (Re)allocates the table so that it takes `MB` megabytes.
+
+        Args:
+            MB (int): Size of the table in megabytes.
+            shared (bool): If True, the table is placed in a new shared memory block, which other processes can attach to with `_attach_shared_table`.
+        """
+        _assert_condition(MB > 0)
+        self._release_shared()
+        self.MB = MB
+        self.numEntries = max(1, (MB * 1024 * 1024) // HASHENTRY_SIZE)
+        if(shared):
+            self.shm = shared_memory.SharedMemory(create=True, size=self.numEntries * HASHENTRY_SIZE)
+            self.shmOwner = True
+            self.hTable = self.shm.buf.cast('Q')
         self._clear_table()
         
+    def _attach_shared_table(self, name: str, numEntries: int) -> None:
+        """
+        Uses the table another process placed in shared memory, the entries are left untouched.
+
+        Args:
+            name (str): Name of the shared memory block.
+            numEntries (int): The number of entries of the shared table.
+        """
+        self._release_shared()
+        self.shm = shared_memory.SharedMemory(name=name)
+        self.shmOwner = False
+        self.numEntries = numEntries
+        self.MB = (numEntries * HASHENTRY_SIZE) // (1024 * 1024)
+        self.hTable = self.shm.buf.cast('Q')
+        self.age = 0
+        self._reset_stats()
+        
+    def _release_shared(self) -> None:
+        """Detaches the table from its shared memory block (unlinking it if this process created it), leaving an empty local table."""
+        if(self.shm is None):
+            return
+        self.hTable.release() # the view has to be released before the block can be closed
+        self.hTable = array('Q')
+        self.shm.close()
+        if(self.shmOwner):
+            self.shm.unlink()
+        self.shm = None
+        self.shmOwner = False
+
     def _clear_table(self) -> None:
-        """Clears the PVT by resetting all entries to empty states."""
-        for i in range(0, self.numEntries):
-            self.pTable[i].posKey = PositionKey()
-            self.pTable[i].move = MOVE.NOMOVE
-            
-    def _store_pv_move(self, board, move: MOVE) -> None:
+        """Clears the table by resetting all entries to empty states."""
+        if(self.shm is not None):
+            self.shm.buf[:self.numEntries * HASHENTRY_SIZE] = bytes(self.numEntries * HASHENTRY_SIZE) # zeroed in place, other processes keep seeing the same block
+        else:
+            self.hTable = array('Q', bytes(self.numEntries * HASHENTRY_SIZE)) # zeroed in one go
+        self.age = 0
+        self._reset_stats()
+
+    def _new_search(self) -> None:
         """
-        Stores a move in the PVT for a given board position.
+        Prepares the table for a new search without touching the entries, the age is bumped
+        so entries left over from earlier searches can still be probed but are the first to be replaced.
+        """
+        self.age = (self.age + 1) & 0xFF
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        """Resets the probe and store counters."""
+        self.newWrite = 0
+        self.overWrite = 0
+        self.hit = 0
+        self.cut = 0
+
+    def _store_hash_entry(self, board, move: int, score: int, flags: int, depth: int) -> None:
+        """
+        Stores a search result for the board position, using a depth-preferred replacement scheme:
+        an entry of another position from the current search is only replaced by a search of at least the same depth.
+        An entry of the same position keeps its deeper bound (only an exact score of a shallower search replaces it),
+        isn't replaced by a quiescence result if it comes from a real search, and keeps its move when the new one is `NOMOVE`.
 
         Args:
             board(Board): The board object containing the current position.
-            move (MOVE): The move to store as the principal variation for the board position.
+            move (int): The best move found for the position.
+            score (int): The score of the position.
+            flags (int): Bound type of the score (`HFALPHA`, `HFBETA` or `HFEXACT`).
+            depth (int): The depth to which the position was searched.
         """
-        index = board.posKey.key % self.numEntries
-        _assert_condition(index >=0 and index <= self.numEntries-1)
+        index = (board.posKey % self.numEntries) << 1
+        _assert_condition(index >=0 and index <= (self.numEntries-1) << 1)
+        _assert_condition(depth >= 0 and depth < MAXDEPTH)
+        _assert_condition(flags >= HFALPHA and flags <= HFEXACT)
 
-        self.pTable[index].move = move
-        self.pTable[index].posKey.key = board.posKey.key
-        
-    def _probe_pv_table(self, board) -> MOVE:
+        data = self.hTable[index + 1]
+        if(data == 0):
+            self.newWrite += 1
+        elif(self.hTable[index] ^ data != board.posKey):
+            if(DATA_AGE(data) == self.age and DATA_DEPTH(data) > depth): # keeping the deeper search of the other position
+                return
+            self.overWrite += 1
+        else: # the same position again
+            if(depth == 0 and DATA_DEPTH(data) > 0): # a quiescence result never replaces a real search of the position
+                return
+            if(DATA_AGE(data) == self.age and DATA_DEPTH(data) > depth and flags != HFEXACT): # keeping the deeper bound
+                return
+            if(move == NOMOVE): # failing low finds no best move, the stored one is still the best guess
+                move = DATA_MOVE(data)
+            self.overWrite += 1
+
+        # mate scores are stored as distance to mate from this position, not from the root
+        if(score > ISMATE):
+            score += board.ply
+        elif(score < -ISMATE):
+            score -= board.ply
+
+        data = PACK_DATA(move, score, depth, flags, self.age)
+        self.hTable[index] = board.posKey ^ data
+        self.hTable[index + 1] = data
+
+    def _probe_hash_entry(self, board, alpha: int, beta: int, depth: int) -> tuple[bool, int, int]:
         """
-        Retrieves the stored principal variation move for a board position, if available.
+        Looks the board position up in the table.
 
         Args:
-            board: The board object containing the current position.
+            board(Board): The board object containing the current position.
+            alpha (int): The lower bound of the current search window.
+            beta (int): The upper bound of the current search window.
+            depth (int): The depth the caller is going to search.
 
         Returns:
-            MOVE: The stored move if it matches the position key, or a default `MOVE` object if no match is found.
+            bool: True if the stored score can be used directly (cutoff), False otherwise.
+            int: The stored best move, or `NOMOVE` if the position is not in the table.
+            int: The usable score, only meaningful if the first value is True.
         """
-        index = board.posKey.key % self.numEntries
-        _assert_condition(index >=0 and index <= self.numEntries-1)
+        index = (board.posKey % self.numEntries) << 1
+        _assert_condition(index >=0 and index <= (self.numEntries-1) << 1)
+
+        data = self.hTable[index + 1]
+        if(data == 0 or self.hTable[index] ^ data != board.posKey):
+            return False, NOMOVE, 0
+
+        self.hit += 1
+        move = DATA_MOVE(data)
+        if(DATA_DEPTH(data) >= depth):
+            score = DATA_SCORE(data)
+            if(score > ISMATE):
+                score -= board.ply
+            elif(score < -ISMATE):
+                score += board.ply
+
+            flags = DATA_FLAGS(data)
+            if(flags == HFALPHA and score <= alpha):
+                self.cut += 1
+                return True, move, alpha
+            if(flags == HFBETA and score >= beta):
+                self.cut += 1
+                return True, move, beta
+            if(flags == HFEXACT):
+                self.cut += 1
+                return True, move, score
+
+        return False, move, 0
+
+    def _probe_pv_move(self, board) -> int:
+        """
+        Retrieves the stored best move for a board position, if available.
+
+        Args:
+            board(Board): The board object containing the current position.
+
+        Returns:
+            int: The stored move if the position key matches, `NOMOVE` otherwise.
+        """
+        index = (board.posKey % self.numEntries) << 1
+        _assert_condition(index >=0 and index <= (self.numEntries-1) << 1)
+
+        data = self.hTable[index + 1]
+        if(data != 0 and self.hTable[index] ^ data == board.posKey):
+            return DATA_MOVE(data)
+        return NOMOVE
 
-        if(self.pTable[index].posKey.key == board.posKey.key):
-            return self.pTable[index].move
-        return MOVE()
-    
     def _get_pv_line(self, board, depth: int) -> int:
         """
         Generates the principal variation line up to a specified `depth` for a given board position.
@@ -80,22 +263,19 @@ class PVTABLE:
             int: The number of moves found in the principal variation line.
         """
         _assert_condition(depth < MAXDEPTH)
-    
-        move_obj = self._probe_pv_table(board=board) # instance of MOVE()
+
+        move = self._probe_pv_move(board=board)
         count = 0
-        while(move_obj.move != MOVE.NOMOVE and count < depth):
+        while(move != NOMOVE and count < depth):
             _assert_condition(count < depth)
-            if(move_obj.move_exists(board)): # legal move
-                board.make_move(move_obj)
-                board.PvArray[count] = move_obj
+            if(is_pseudo_legal(board, move) and board.make_move(move)): # legal move, make_move takes back a move leaving the king in check
+                board.PvArray[count] = move
                 count += 1
             else:
-                break # we have encountered an illegeal move_obj
-            move_obj = self._probe_pv_table(board=board)
-            
+                break # we have encountered an illegal move
+            move = self._probe_pv_move(board=board)
+
         while(board.ply > 0):
             board.take_move()
-            
-        return count
 
-    
\ No newline at end of file
+        return count
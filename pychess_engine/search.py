@@ -1,12 +1,34 @@
+from math import log
 from pychess_engine.debug import _assert_condition
-from pychess_engine.constants import BRD_SQ_NUM, MAXDEPTH
+from pychess_engine.constants import BRD_SQ_NUM, MAXDEPTH, MAXPOSITIONMOVES, INFINITE, MATE
 from pychess_engine.misc import GetTimeMs
 from pychess_engine.attack import is_sqaure_attacked
 from pychess_engine.board import Board
-from pychess_engine.move import MOVE, MOVELIST
+from pychess_engine.move import MOVE, NOMOVE, FROMSQ, TOSQ, alpha_move
+from pychess_engine.pvtable import HFALPHA, HFBETA, HFEXACT, ISMATE
 
-INFINITE = 30000
-MATE = 29000
+NULL_MOVE_MIN_DEPTH = 4 # null move pruning is only tried at this depth or more, so the reduced search never drops straight into quiescence
+
+# late move reductions, quiet moves ordered late are searched with less depth, reduction = LMR_BASE + log(depth) * log(moveNum) / LMR_DIVISOR
+LMR_MIN_DEPTH = 3 # no reductions below this depth
+LMR_FULL_MOVES = 3 # the first moves of a node are always searched with full depth
+LMR_BASE = 0.75
+LMR_DIVISOR = 2.25
+LmrTable = [[0] * MAXPOSITIONMOVES for _ in range(MAXDEPTH)] # LmrTable[depth][moveNum]
+
+def init_lmr_table(base: float = LMR_BASE, divisor: float = LMR_DIVISOR) -> None:
+    """
+    (Re)fills the late move reduction table, can be called with other values to tune the reductions.
+
+    Args:
+        base (float): Reduction added to every reduced move.
+        divisor (float): The bigger the divisor, the smaller the reductions get with depth and move number.
+    """
+    for depth in range(1, MAXDEPTH):
+        for moveNum in range(1, MAXPOSITIONMOVES):
+            LmrTable[depth][moveNum] = int(base + log(depth) * log(moveNum) / divisor)
+
+init_lmr_table()
 
 class Search:
     """
@@ -23,6 +45,7 @@ class Search:
         _clear_for_search(): Resets search-related data and heuristics.
         _quiescene(alpha, beta): Performs quiescence search to evaluate tactical positions.
         _alpha_beta(alpha, beta, depth, do_null): Implements the alpha-beta pruning algorithm.
+        _aspiration_search(score, depth): Searches the root with a narrow window around the previous score.
         iterative_deepening(): Performs iterative deepening search to find the best move.
     """
     def __init__(self, board: Board, info):
@@ -38,23 +61,25 @@ class Search:
         """
         Resets all search-related data structures and counters to prepare for a new search.
 
-        This method clears heuristics such as search history and killer moves, resets the 
-        principal variation table, and initializes counters like ply, nodes searched, 
+        This method clears heuristics such as search history and killer moves, ages the 
+        transposition table, and initializes counters like ply, nodes searched, 
         and fail-high metrics to their default values.
 
         """
         for index in range(13):
             for index2 in range(BRD_SQ_NUM):
-                self.board.searchHistory[index][index] = MOVE()
+                self.board.searchHistory[index][index2] = 0
                 
         for index in range(2):
             for index2 in range(MAXDEPTH):
-                self.board.searchKillers[index][index2] = MOVE()
+                self.board.searchKillers[index][index2] = NOMOVE
                 
-        self.board.PvTable._clear_table()
+        self.board.HashTable._new_search()
+        self.board.EvalCache._reset_stats()
         self.board.ply = 0
         
         self.info.stopped = 0
+        self.info.completed_depth = 0
         self.info.nodes = 0
         self.info.fh = 0
         self.info.fhf = 0
@@ -66,7 +91,8 @@ class Search:
 
         The quiescence search extends beyond the regular search depth, evaluating only capture moves to
         ensure stable evaluation by avoiding premature conclusions on unstable positions. This method checks for
-        repetitions, the fifty-move rule, and beta cutoffs to improve efficiency.
+        repetitions, the fifty-move rule, and beta cutoffs to improve efficiency. Captures losing material by
+        the static exchange evaluation are skipped, the move picker doesn't hand them out in `captures_only` mode.
 
         Args:
             alpha (int): The lower bound of search value.
@@ -87,6 +113,10 @@ class Search:
         if(self.board.ply > MAXDEPTH - 1):
             return self.board.evaluate_position()
         
+        found, PvMove, Score = self.board.HashTable._probe_hash_entry(board=self.board, alpha=alpha, beta=beta, depth=0)
+        if(found):
+            return Score
+        
         Score = self.board.evaluate_position()
         
         if(Score >= beta):
@@ -95,17 +125,19 @@ class Search:
         if(Score > alpha):
             alpha = Score
         
-        mlist = MOVELIST()
-        mlist._generate_capture_moves(self.board)
+        picker = self.board.movePickers[self.board.ply]
+        picker._init_picker(board=self.board, hashMove=PvMove, captures_only=True)
         
         Legal = 0
         OldAlpha = alpha
-        BestMove = 0
+        BestMove = NOMOVE
         Score = -INFINITE
         
-        for MoveNum in range(mlist.count):
-            mlist._pick_next_move(movenum=MoveNum)
-            if(not self.board.make_move(mlist.moves[MoveNum])):
+        while(True):
+            Move = picker._next_move()
+            if(Move == NOMOVE):
+                break
+            if(not self.board.make_move(Move, legal=picker.legal)): # generated moves are legal already
                 continue
             Legal +=1
             Score = -self._quiescene(alpha=-beta, beta=-alpha)
@@ -118,12 +150,15 @@ class Search:
                     if(Legal == 1):
                         self.info.fhf += 1
                     self.info.fh += 1
+                    self.board.HashTable._store_hash_entry(board=self.board, move=Move, score=beta, flags=HFBETA, depth=0)
                     return beta
                 alpha = Score
-                BestMove = mlist.moves[MoveNum]
+                BestMove = Move
 
         if(alpha != OldAlpha):
-            self.board.PvTable._store_pv_move(board=self.board, move=BestMove)
+            self.board.HashTable._store_hash_entry(board=self.board, move=BestMove, score=alpha, flags=HFEXACT, depth=0)
+        else:
+            self.board.HashTable._store_hash_entry(board=self.board, move=BestMove, score=alpha, flags=HFALPHA, depth=0)
         
         return alpha
     
@@ -164,31 +199,69 @@ class Search:
         if(self.board.ply > MAXDEPTH - 1):
             return self.board.evaluate_position()
         
-        mlist = MOVELIST()
-        mlist.generate_all_moves(self.board)
+        # if we have already searched this position deep enough, we can use the stored score
+        found, PvMove, Score = self.board.HashTable._probe_hash_entry(board=self.board, alpha=alpha, beta=beta, depth=depth)
+        if(found):
+            return Score
+        
+        InCheck = is_sqaure_attacked(self.board.king_square[self.board.side], self.board.side^1, self.board)
+        
+        # null move pruning: if passing the turn still leaves us above beta after a reduced search, the position is good enough to cut off.
+        # not done in check (passing would be illegal), right after another null move, or with only the king and pawns left, where zugzwang is common
+        if(do_null and not InCheck and depth >= NULL_MOVE_MIN_DEPTH and self.board.ply and self.board.bigPce[self.board.side] > 1):
+            R = 3 if depth > 6 else 2 # bigger reduction for deeper searches
+            self.board.make_null_move()
+            Score = -self._alpha_beta(alpha=-beta, beta=-beta+1, depth=max(0, depth-1-R), do_null=False)
+            self.board.take_null_move()
+            if(self.info.stopped):
+                return 0
+            if(Score >= beta and abs(Score) < ISMATE): # a mate found after passing can't be trusted
+                return beta
+        
+        # moves are handed out in stages (hash move, captures, killers, quiets), so a cutoff early on saves generating the rest
+        picker = self.board.movePickers[self.board.ply]
+        picker._init_picker(board=self.board, hashMove=PvMove)
         
         Legal = 0
         OldAlpha = alpha
-        BestMove = 0
+        BestMove = NOMOVE
+        BestScore = -INFINITE
         Score = -INFINITE
-        PvMove = self.board.PvTable._probe_pv_table(board=self.board)
-        
-        if(PvMove != 0):
-            for MoveNum in range(mlist.count):
-                if(mlist.moves[MoveNum].move == PvMove):
-                    mlist.moves[MoveNum].score = 2000000 # will search this first
-                    break
         
-        for MoveNum in range(mlist.count):
-            mlist._pick_next_move(movenum=MoveNum)
-            if(not  self.board.make_move(mlist.moves[MoveNum])):
+        ply = self.board.ply
+        while(True):
+            Move = picker._next_move()
+            if(Move == NOMOVE):
+                break
+            if(not self.board.make_move(Move, legal=picker.legal)): # generated moves are legal already
                 continue
             Legal +=1
-            Score = -self._alpha_beta(alpha=-beta, beta=-alpha, depth=depth-1, do_null=True)
+            
+            if(Legal == 1): # principal variation search, the first move is expected to be the best one and gets the full window
+                Score = -self._alpha_beta(alpha=-beta, beta=-alpha, depth=depth-1, do_null=True)
+            else:
+                # late quiet moves which don't give check and aren't killers are searched with reduced depth, every root move gets a full depth search
+                Reduction = 0
+                if(self.info.lmr and ply and depth >= LMR_MIN_DEPTH and Legal > LMR_FULL_MOVES and not InCheck
+                   and not (Move & (MOVE.FLAG_CAP | MOVE.FLAG_PROM))
+                   and Move != self.board.searchKillers[0][ply] and Move != self.board.searchKillers[1][ply]
+                   and not is_sqaure_attacked(self.board.king_square[self.board.side], self.board.side^1, self.board)):
+                    Reduction = min(LmrTable[depth][min(Legal, MAXPOSITIONMOVES-1)], depth-2) # always leave at least one ply
+                
+                # the rest only have to prove they are not better than alpha, which a zero window search does cheaper
+                Score = -self._alpha_beta(alpha=-alpha-1, beta=-alpha, depth=depth-1-Reduction, do_null=True)
+                if(Score > alpha and Reduction): # the reduced search failed high, verifying with full depth
+                    Score = -self._alpha_beta(alpha=-alpha-1, beta=-alpha, depth=depth-1, do_null=True)
+                if(Score > alpha and Score < beta): # better than alpha after all, searching again for the exact score
+                    Score = -self._alpha_beta(alpha=-beta, beta=-alpha, depth=depth-1, do_null=True)
             self.board.take_move()
             if(self.info.stopped):
                 return 0
             
+            if(Score > BestScore):
+                BestScore = Score
+                BestMove = Move
+            
             if(Score > alpha):
                 if(Score >= beta): # beta cut off
                     """
@@ -206,27 +279,62 @@ class Search:
                         self.info.fhf += 1
                     self.info.fh += 1
                     # killer moves are those which causes beta cutoff and are not captures
-                    if(not (mlist.moves[MoveNum].move & MOVE.FLAG_CAP)): # if not a capture move
+                    if(not (Move & MOVE.FLAG_CAP)): # if not a capture move
                         self.board.searchKillers[1][self.board.ply] = self.board.searchKillers[0][self.board.ply]
-                        self.board.searchKillers[0][self.board.ply] = mlist.moves[MoveNum]
+                        self.board.searchKillers[0][self.board.ply] = Move
+                    self.board.HashTable._store_hash_entry(board=self.board, move=BestMove, score=beta, flags=HFBETA, depth=depth)
                     return beta
                 alpha = Score
-                BestMove = mlist.moves[MoveNum]
-                if(not (mlist.moves[MoveNum].move & MOVE.FLAG_CAP)): # not a capture
-                    self.board.searchHistory[self.board.pieces[BestMove.FROMSQ()]][BestMove.TOSQ()].score += depth
+                if(not (Move & MOVE.FLAG_CAP)): # not a capture
+                    self.board.searchHistory[self.board.pieces[FROMSQ(Move)]][TOSQ(Move)] += depth
         
         if(Legal == 0): # checkmate
-            if(is_sqaure_attacked(self.board.king_square[self.board.side], self.board.side^1, self.board)):
+            if(InCheck):
                 return -MATE + self.board.ply # how many moves it was to mate
             else: # stalemate
                 return 0
             
         if(alpha != OldAlpha):
-            self.board.PvTable._store_pv_move(board=self.board, move=BestMove)
+            self.board.HashTable._store_hash_entry(board=self.board, move=BestMove, score=BestScore, flags=HFEXACT, depth=depth)
+        else:
+            self.board.HashTable._store_hash_entry(board=self.board, move=BestMove, score=alpha, flags=HFALPHA, depth=depth)
         
         return alpha
     
-    def iterative_deepening(self, display_calculation: bool) -> tuple[str, int]:
+    def _aspiration_search(self, score: int, depth: int) -> int:
+        """
+        Searches the root with a narrow window around the score of the previous iteration, which gives many more cutoffs
+        than a full window. If the result falls outside the window (fail low or fail high), only the failing side is
+        widened, following the schedule `info.aspiration_windows`, until the score lands inside the window.
+
+        Args:
+            score (int): The score of the previous iteration.
+            depth (int): The depth to search.
+
+        Returns:
+            int: The score of the position at the given depth.
+        """
+        windows = self.info.aspiration_windows
+        lowStep = 0
+        highStep = 0
+        alpha = max(score - windows[0], -INFINITE) if windows else -INFINITE
+        beta = min(score + windows[0], INFINITE) if windows else INFINITE
+        
+        while(True):
+            Score = self._alpha_beta(alpha=alpha, beta=beta, depth=depth, do_null=True)
+            if(self.info.stopped):
+                return Score
+            
+            if(Score <= alpha and alpha > -INFINITE): # fail low, the true score is alpha or less
+                lowStep += 1
+                alpha = max(score - windows[lowStep], -INFINITE) if lowStep < len(windows) else -INFINITE
+            elif(Score >= beta and beta < INFINITE): # fail high, the true score is beta or more
+                highStep += 1
+                beta = min(score + windows[highStep], INFINITE) if highStep < len(windows) else INFINITE
+            else:
+                return Score
+    
+    def iterative_deepening(self, display_calculation: bool, display_bestmove: bool = True) -> tuple[str, int]:
         """
         Performs iterative deepening search, gradually increasing the search depth from 1 to a maximum depth. This method 
         allows the engine to adjust to time constraints while ensuring progressively better evaluations.
@@ -235,6 +343,10 @@ class Search:
         It allows the engine to maintain a principal variation (PV) for better pruning and move ordering, as well as 
         heuristics like search history and killers.
 
+        Args:
+            display_calculation (bool): Whether to print the info line of every iteration.
+            display_bestmove (bool): Whether to print the final bestmove line (when `display_calculation` is on).
+
         Returns:
             str: The best move found at the final depth.
             int: The best score 
@@ -246,7 +358,7 @@ class Search:
         # ? why don't we just search directly on depth n 
         # * because in iterative deepening first of all we will have our principal variation which will help in pruning more in _alpha_beta & Move Ordering. also we are maitaining the heurisitsc (searchHistory & searchKillers) which will help in move ordering
         
-        bestMove = MOVE()
+        bestMove = NOMOVE
         bestScore = -INFINITE
         pvMoves = 0
         
@@ -254,13 +366,18 @@ class Search:
         
         #iterative deepening
         for currentDepth in range(1, self.info.depth+1):
-            bestScore = self._alpha_beta(alpha=-INFINITE, beta=INFINITE, depth=currentDepth, do_null=True)
+            if(currentDepth >= self.info.aspiration_depth and abs(bestScore) < ISMATE):
+                score = self._aspiration_search(score=bestScore, depth=currentDepth)
+            else:
+                score = self._alpha_beta(alpha=-INFINITE, beta=INFINITE, depth=currentDepth, do_null=True)
             
             # out of time?
             if(self.info.stopped):
                 break
+            bestScore = score # only the score of a completed iteration can be trusted
+            self.info.completed_depth = currentDepth
         
-            pvMoves = self.board.PvTable._get_pv_line(board=self.board, depth=currentDepth)
+            pvMoves = self.board.HashTable._get_pv_line(board=self.board, depth=currentDepth)
             bestMove = self.board.PvArray[0]
             
             if(display_calculation):
@@ -268,15 +385,15 @@ class Search:
             
                 print("pv", end=" ")
                 for pvNum in range(0, pvMoves):
-                    print(f"{self.board.PvArray[pvNum].alpha_move()}", end=" ")
+                    print(f"{alpha_move(self.board.PvArray[pvNum])}", end=" ")
                 print()
                 if(self.info.fh):
                     print(f"Ordering: {(self.info.fhf / self.info.fh):.2f}")
                 else:
                     print("Ordering: NAN")
         
-        bestmove = bestMove.alpha_move()
-        if(bestMove.move == 0):
+        bestmove = alpha_move(bestMove)
+        if(bestMove == NOMOVE):
             bestmove = "-"
-        display_calculation and print(f"bestmove {bestmove}")
+        display_calculation and display_bestmove and print(f"bestmove {bestmove}")
         return (bestmove, bestScore)
\ No newline at end of file
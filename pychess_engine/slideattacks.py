@@ -0,0 +1,127 @@
+import os
+import marshal
+from pychess_engine.constants import Squares
+from pychess_engine.globals import Sq64ToSq120, Sq120ToSq64, FilesBrd, setMask
+from pychess_engine.globals import RookMasks, BishopMasks, RookAttacks, BishopAttacks, LineMasks
+
+# the attack tables only depend on the board geometry, bump the version whenever their layout changes
+SLIDE_CACHE_VERSION = 1
+SLIDE_CACHE_FILE = "slideattacks.marshal"
+
+ROOK_DIRECTIONS = (-1, -10, 1, 10)
+BISHOP_DIRECTIONS = (-9, -11, 11, 9)
+
+def _cache_path() -> str:
+    """
+    Returns the file the sliding attack tables are cached in, inside `$PYCHESS_ENGINE_CACHE` if set,
+    `~/.cache/pychess_engine` otherwise.
+    """
+    cacheDir = os.environ.get("PYCHESS_ENGINE_CACHE") or os.path.join(os.path.expanduser("~"), ".cache", "pychess_engine")
+    return os.path.join(cacheDir, SLIDE_CACHE_FILE)
+
+def _ray_attacks(sq64: int, directions: tuple, occupancy: int) -> int:
+    """
+    Walks from a square along the given directions until the board edge or the first occupied square (which is included).
+
+    Args:
+        sq64 (int): The 64 based square the slider is on.
+        directions (tuple): The 120 based directions of the slider.
+        occupancy (int): Bitboard of the occupied squares.
+
+    Returns:
+        int: Bitboard of the attacked squares.
+    """
+    attacks = 0
+    for dir in directions:
+        t_sq = Sq64ToSq120[sq64] + dir
+        while(FilesBrd[t_sq] != Squares.OFFBOARD):
+            attacks |= setMask[Sq120ToSq64[t_sq]]
+            if(occupancy & setMask[Sq120ToSq64[t_sq]]):
+                break
+            t_sq += dir
+    return attacks
+
+def _relevant_mask(sq64: int, directions: tuple) -> int:
+    """
+    Returns the squares along the directions of a square whose occupancy matters, the last square of each ray
+    is attacked whether something stands on it or not, so it is left out.
+    """
+    mask = 0
+    for dir in directions:
+        t_sq = Sq64ToSq120[sq64] + dir
+        while(FilesBrd[t_sq] != Squares.OFFBOARD and FilesBrd[t_sq + dir] != Squares.OFFBOARD):
+            mask |= setMask[Sq120ToSq64[t_sq]]
+            t_sq += dir
+    return mask
+
+def _generate_tables() -> tuple:
+    """
+    Generates the masks and the attack tables of rooks and bishops, for every square and every
+    subset of its relevant mask, enumerated with the carry-rippler trick `subset = (subset - mask) & mask`.
+
+    Returns:
+        tuple: The rook masks, bishop masks, rook attacks and bishop attacks.
+    """
+    tables = ([], [], [], [])
+    for sq64 in range(0, 64):
+        for masks, attackTable, directions in ((tables[0], tables[2], ROOK_DIRECTIONS), (tables[1], tables[3], BISHOP_DIRECTIONS)):
+            mask = _relevant_mask(sq64, directions)
+            attacks = {}
+            subset = 0
+            while(True):
+                attacks[subset] = _ray_attacks(sq64, directions, subset)
+                subset = (subset - mask) & mask
+                if(subset == 0):
+                    break
+            masks.append(mask)
+            attackTable.append(attacks)
+    return tables
+
+def _load_tables() -> tuple:
+    """
+    Loads the cached attack tables.
+
+    Returns:
+        tuple: The tables as generated by `_generate_tables`, or None if there is no usable cache.
+    """
+    try:
+        with open(_cache_path(), "rb") as file:
+            version, tables = marshal.loads(file.read()) # reading it at once, marshal.load reads a file object in small pieces
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if(version != SLIDE_CACHE_VERSION or len(tables) != 4 or any(len(table) != 64 for table in tables)):
+        return None
+    return tables
+
+def _save_tables(tables: tuple) -> None:
+    """Writes the attack tables to the cache, a read only cache directory just means generating them again next time."""
+    path = _cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmpPath = f"{path}.{os.getpid()}.tmp"
+        with open(tmpPath, "wb") as file:
+            file.write(marshal.dumps((SLIDE_CACHE_VERSION, tables)))
+        os.replace(tmpPath, path) # other processes never see a half written file
+    except OSError:
+        pass
+
+def InitSlideAttacks() -> None:
+    """
+    Fills `RookMasks`, `BishopMasks`, `RookAttacks`, `BishopAttacks` and `LineMasks`. The attack tables are
+    generated on first use and cached to disk, later runs only load them. An attack query then is a single
+    lookup keyed by the occupancy of the relevant squares, the hashing a magic multiplication would do is
+    left to the dict.
+    """
+    if(RookAttacks[0]): # already initialized
+        return
+    
+    tables = _load_tables()
+    if(tables is None):
+        tables = _generate_tables()
+        _save_tables(tables)
+        
+    RookMasks[:], BishopMasks[:], RookAttacks[:], BishopAttacks[:] = tables
+    
+    for sq64 in range(0, 64):
+        for dir in ROOK_DIRECTIONS[2:] + BISHOP_DIRECTIONS[2:]: # the line along a direction and its opposite is the same
+            LineMasks[sq64][dir] = _ray_attacks(sq64, (dir, -dir), 0)
@@ -0,0 +1,139 @@
+import atexit
+import copy
+import multiprocessing
+from pychess_engine.constants import MAXDEPTH
+from pychess_engine.init import initialize
+from pychess_engine.board import Board
+from pychess_engine.search import Search
+from pychess_engine import hashkeys
+from pychess_engine.nnue import NNUE
+
+MAX_THREADS = 64 # the most searching processes, the main one included
+
+def _smp_worker(workerId: int, shmName: str, numEntries: int, zobristSeed: int, jobs, results, stopEvent) -> None:
+    """
+    Main loop of a Lazy SMP worker process. The worker keeps its own board and search, probing and storing
+    into the transposition table shared with the main process, and searches every position it receives
+    until its depth is reached or the main process sets `stopEvent`.
+
+    Args:
+        workerId (int): Number of the worker (1 - N), odd workers search one ply deeper than the main process.
+        shmName (str): Name of the shared memory block holding the transposition table.
+        numEntries (int): The number of entries of the shared table.
+        zobristSeed (int): Seed of the Zobrist keys of the main process, so both compute the same position keys.
+        jobs (Queue): Positions to search (with the weights file of the network the main process evaluates with), `None` ends the worker.
+        results (Queue): Where the worker signals it is ready, and puts `(completed_depth, bestmove, score, nodes)` after each search.
+        stopEvent (Event): Set by the main process once its own search is over.
+    """
+    initialize()
+    if(zobristSeed != hashkeys.Seed):
+        hashkeys.init_hash_keys(zobristSeed)
+
+    board = Board()
+    board.HashTable._attach_shared_table(name=shmName, numEntries=numEntries)
+    search = Search(board, None)
+    results.put(workerId) # attached, the main process may now unlink the block whenever it wants
+
+    while(True):
+        job = jobs.get()
+        if(job is None):
+            break
+        fen, historyKeys, age, nnuePath, controls = job
+
+        if(nnuePath != (board.Nnue.path if board.Nnue is not None else None)): # evaluating like the main process
+            board.Nnue = NNUE(nnuePath) if nnuePath is not None else None
+            board.EvalCache._clear_table()
+        board.parse_fen(fen)
+        # the keys of the positions since the last capture or pawn move, so the worker sees the same repetitions
+        for index, key in enumerate(historyKeys):
+            board.history[index].posKey = key
+            board.keyCount[key] = board.keyCount.get(key, 0) + 1
+        board.hisPly = len(historyKeys)
+        board.fiftyMove = len(historyKeys)
+        board.HashTable.age = age # bumped by the search, like in the main process
+
+        controls.stop_event = stopEvent
+        controls.depth = min(controls.depth + (workerId & 1), MAXDEPTH) # helpers searching a different depth spread out over the tree
+
+        search.update(board=board, info=controls)
+        bestmove, score = search.iterative_deepening(display_calculation=False)
+        results.put((controls.completed_depth, bestmove, score, controls.nodes))
+
+    board.HashTable._release_shared()
+
+class SMPSEARCH:
+    """
+    Lazy SMP search, runs the search of the main process together with worker processes which
+    search the same position and share its transposition table through `multiprocessing.shared_memory`.
+    The workers don't communicate otherwise, they help by filling the table with results the other
+    searches then cut off on. After the search the deepest completed result wins.
+
+    Attributes:
+        board (Board): The board of the main process, its transposition table is moved to shared memory.
+        workers (list of Process): The worker processes.
+        jobs (list of Queue): One job queue per worker.
+        results (Queue): Results of the workers.
+        stopEvent (Event): Stops the workers' searches.
+    """
+    def __init__(self, board: Board, workers: int):
+        self.board = board
+        board.HashTable.init_hash_table(board.HashTable.MB, shared=True)
+
+        self.jobs = [multiprocessing.Queue() for _ in range(workers)]
+        self.results = multiprocessing.Queue()
+        self.stopEvent = multiprocessing.Event()
+
+        self.workers = []
+        for workerId in range(1, workers + 1):
+            worker = multiprocessing.Process(target=_smp_worker, args=(workerId, board.HashTable.shm.name, board.HashTable.numEntries, hashkeys.Seed, self.jobs[workerId - 1], self.results, self.stopEvent), daemon=True)
+            worker.start()
+            self.workers.append(worker)
+        for _ in self.workers:
+            self.results.get() # waiting for every worker to attach to the table
+        atexit.register(self.close)
+
+    def search(self, search: Search, controls, display_calculation: bool) -> tuple[str, int]:
+        """
+        Searches the current position of the board with the main process and all the workers.
+
+        Args:
+            search (Search): The search of the main process.
+            controls (EngineControls): The search settings, the workers get a copy.
+            display_calculation (bool): Whether to display the calculation of the main process.
+
+        Returns:
+            str: The best move of the deepest completed search.
+            int: Its score.
+        """
+        board = self.board
+        historyKeys = [board.history[index].posKey for index in range(board.hisPly - board.fiftyMove, board.hisPly)]
+
+        self.stopEvent.clear()
+        for jobs in self.jobs:
+            jobs.put((board.get_fen(), historyKeys, board.HashTable.age, board.Nnue.path if board.Nnue is not None else None, copy.copy(controls)))
+
+        bestmove, score = search.iterative_deepening(display_calculation=display_calculation, display_bestmove=False)
+        depth = controls.completed_depth
+
+        self.stopEvent.set() # the main search is over, so are the workers'
+        for _ in self.workers:
+            workerDepth, workerMove, workerScore, workerNodes = self.results.get()
+            controls.nodes += workerNodes
+            if(workerDepth > depth and workerMove != "-"):
+                depth, bestmove, score = workerDepth, workerMove, workerScore
+
+        display_calculation and print(f"bestmove {bestmove}")
+        return (bestmove, score)
+
+    def close(self) -> None:
+        """Ends the worker processes and moves the transposition table of the board back into the process."""
+        if(not self.workers):
+            return
+        self.stopEvent.set()
+        for jobs in self.jobs:
+            jobs.put(None)
+        for worker in self.workers:
+            worker.join()
+        self.workers = []
+        self.board.HashTable.init_hash_table(self.board.HashTable.MB)
+        atexit.unregister(self.close)
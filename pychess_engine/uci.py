@@ -3,9 +3,12 @@ from pychess_engine.perft import PerftTest
 from pychess_engine.move import MOVELIST
 from pychess_engine.engine import Engine
 from pychess_engine.fens import START_FEN
+from pychess_engine.pvtable import DEFAULT_HASH_MB
+from pychess_engine.smp import MAX_THREADS
 
 NAME = "UstaadJi"
 AUTHOR = "Vanshu Galhotra"
+MAX_HASH_MB = 1024
 
 test_moves = 0
 
@@ -88,6 +91,32 @@ def ParsePosition(lineIn):
             engine.make_move(move=mov)
             engine.board.ply = 0
     engine.board.print_board()
+    
+# setoption name Hash value 32
+def ParseSetOption(line):
+    global engine
+    tokens = line.split(" ")
+    if("name" not in tokens or "value" not in tokens):
+        return
+    name = " ".join(tokens[tokens.index("name") + 1 : tokens.index("value")])
+    if(tokens.index("value") + 1 >= len(tokens)): # no value given, the option is ignored
+        return
+    value = tokens[tokens.index("value") + 1]
+    
+    if(name == "Hash"):
+        try:
+            MB = int(value)
+        except ValueError: # not a number, the option is ignored
+            return
+        engine.set_hash_size(MB=min(MAX_HASH_MB, max(1, MB)))
+    elif(name == "Threads"):
+        try:
+            threads = int(value)
+        except ValueError: # not a number, the option is ignored
+            return
+        engine.set_threads(threads=threads)
+    elif(name == "EvalCache"):
+        engine.set_eval_cache(enabled=value.lower() == "true")
             
 
 def uci_game():
@@ -95,6 +124,9 @@ def uci_game():
     line = ""
     print(f"id name {NAME}")
     print(f"id author {AUTHOR}")
+    print(f"option name Hash type spin default {DEFAULT_HASH_MB} min 1 max {MAX_HASH_MB}")
+    print(f"option name Threads type spin default 1 min 1 max {MAX_THREADS}")
+    print(f"option name EvalCache type check default true")
     print(f"uciok")
         
     while(True):
@@ -110,6 +142,8 @@ def uci_game():
             continue
         elif(line[:8] == "position"):
             ParsePosition(line)
+        elif(line[:9] == "setoption"):
+            ParseSetOption(line)
         elif(line == "ucinewgame"):
             ParsePosition("position startpos\n")
         elif(line[:2] == "go"):
@@ -120,6 +154,9 @@ def uci_game():
         elif(line == "uci"):
             print(f"id name {NAME}")
             print(f"id author UstaadJi")
+            print(f"option name Hash type spin default {DEFAULT_HASH_MB} min 1 max {MAX_HASH_MB}")
+            print(f"option name Threads type spin default 1 min 1 max {MAX_THREADS}")
+            print(f"option name EvalCache type check default true")
             print(f"uciok")
         elif(line[:6] == "nonuci"):
             coms = line.split()
@@ -131,7 +168,7 @@ def uci_game():
                 PerftTest(int(coms[2]), engine.board)
             elif(move == "movelist"):
                 mlist = MOVELIST()
-                mlist.generate_all_moves(board=engine.board)
+                mlist.generate_legal_moves(board=engine.board)
                 mlist.print_move_list()
             
             elif(move != "take" and move):
@@ -1,10 +1,8 @@
-from pychess_engine.hashkeys import PositionKey
-
 class UNDO:
     def __init__(self):
         self.move = 0 # the move number
         self.castlePerm = 0
         self.enPas = -1
         self.fiftyMove = 0
-        self.posKey = PositionKey() #unqiue position key (object of PositionKey Class)
+        self.posKey = 0 #unqiue position key (Zobrist hash of the position)
         # castling information
\ No newline at end of file
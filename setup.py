@@ -22,6 +22,10 @@ setup(
     ],
     python_requires=">=3.7",
     install_requires=[],
+    extras_require={
+        "batch": ["numpy"], # batch evaluation (pychess_engine.batcheval)
+        "nnue": ["numpy"], # network evaluation (pychess_engine.nnue)
+    },
     entry_points={
         "console_scripts": [
             "pychess_engine=pychess_engine.cli:main", 